@@ -0,0 +1,462 @@
+"""
+AI provider routing for रामा (Raama) backend
+Selects between Gemini, OpenAI and local providers based on health: every
+provider has a circuit breaker and a latency window, slow primaries are hedged
+and failed ones fail over, and the chain ends at the rule-based translator.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+import logging
+
+from transliteration import transliterate
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_PROMPTS = {
+    "english": """
+            i give you shayari in hinglish i want you to translate hinglish shayari to hindi and repond just shayari not any modification nothing just shayari from hinglish to hindi
+            Hindi Shayari:
+            {content}
+
+            Instructions:
+            1. Maintain the poetic flow and rhythm as much as possible
+            2. Preserve the emotional depth and meaning
+            4. Keep the essence and soul of the original shayari
+
+            Please provide only the translation, no additional text or explanations.
+            """,
+    "hindi": """
+            आप एक विशेषज्ञ अनुवादक हैं जो अंग्रेजी कविता को हिंदी शायरी में बदलने में माहिर हैं। कृपया निम्नलिखित अंग्रेजी कविता को हिंदी शायरी में अनुवाद करें।
+
+            English Poetry:
+            {content}
+
+            निर्देश:
+            1. शायरी की भावना और अर्थ को बनाए रखें
+            2. हिंदी की काव्यात्मक भाषा का उपयोग करें
+            3. तुकबंदी और छंद का ध्यान रखें
+            4. मूल भावना को बनाए रखते हुए सुंदर हिंदी में अनुवाद करें
+
+            कृपया केवल हिंदी अनुवाद दें, कोई अतिरिक्त text नहीं।
+            """,
+}
+
+ANALYSIS_PROMPT = """You are an expert critic of Hindi and Urdu poetry.
+Analyze the following shayari and respond with JSON only, no markdown, using exactly this shape:
+{{
+  "sentiment_analysis": {{"emotion": "...", "intensity": "1-10", "mood": "..."}},
+  "quality_score": {{"overall": "1-10", "creativity": "1-10", "language_beauty": "1-10", "emotional_impact": "1-10"}},
+  "tags": ["...", "..."],
+  "appreciation": "..."
+}}
+
+Title: {title}
+Shayari:
+{content}
+"""
+
+FALLBACK_ANALYSIS = {
+    "sentiment_analysis": {
+        "emotion": "भावनात्मक",
+        "intensity": "5",
+        "mood": "शायरी में गहरी भावनाएं हैं"
+    },
+    "quality_score": {
+        "overall": "7",
+        "creativity": "7",
+        "language_beauty": "7",
+        "emotional_impact": "7"
+    },
+    "tags": ["शायरी", "कविता", "भावना"],
+    "appreciation": "यह एक सुंदर शायरी है जिसमें गहरी भावनाएं हैं।"
+}
+
+_JSON_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+class ProviderError(Exception):
+    """Raised when a provider cannot serve a request"""
+
+
+class AllProvidersFailed(ProviderError):
+    """Raised when every provider in the chain failed or was skipped"""
+
+
+# The "english" prompt converts Hinglish (Roman script) shayari to Devanagari; that is the
+# only direction the rule-based fallback can serve without a model
+SCRIPT_CONVERSION_TARGET = "english"
+
+
+def build_translation_prompt(content: str, target_language: str) -> str:
+    template = TRANSLATION_PROMPTS.get(target_language.lower())
+    if template is None:
+        raise ValueError(f"Unsupported target language: {target_language}")
+    return template.format(content=content)
+
+
+def parse_analysis(text: str) -> dict:
+    analysis = json.loads(_JSON_FENCE_RE.sub("", text.strip()))
+    if not isinstance(analysis, dict):
+        raise ProviderError("AI analysis is not a JSON object")
+    return analysis
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker: closed -> open after `failure_threshold`
+    consecutive failures, half-open after `reset_timeout` seconds to let a
+    single trial call through, closed again when the trial succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def release(self):
+        """Give back a half-open trial slot without recording an outcome"""
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            # A failed half-open trial re-opens for another full timeout
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def p95(self) -> Optional[float]:
+        return self.percentile(95)
+
+
+class AIProvider:
+    """Base provider; subclasses implement translate() and analyze()"""
+
+    name = "base"
+
+    def available(self) -> bool:
+        """Called on the event loop for every request, so it must not import or block"""
+        return True
+
+    async def translate(self, content: str, target_language: str) -> str:
+        raise NotImplementedError
+
+    async def analyze(self, title: str, content: str) -> dict:
+        raise NotImplementedError
+
+
+class GeminiProvider(AIProvider):
+    """Google Gemini via the model returned by `model_factory` (None when unavailable; must not block)"""
+
+    name = "gemini"
+
+    def __init__(self, model_factory: Callable):
+        self.model_factory = model_factory
+
+    def available(self) -> bool:
+        return self.model_factory() is not None
+
+    async def _generate(self, prompt: str) -> str:
+        model = self.model_factory()
+        if model is None:
+            raise ProviderError("Gemini AI client not initialized")
+        response = await model.generate_content_async(prompt)
+        if not response or not response.text:
+            raise ProviderError("Empty response from Gemini AI")
+        return response.text.strip()
+
+    async def translate(self, content: str, target_language: str) -> str:
+        return await self._generate(build_translation_prompt(content, target_language))
+
+    async def analyze(self, title: str, content: str) -> dict:
+        return parse_analysis(await self._generate(ANALYSIS_PROMPT.format(title=title, content=content)))
+
+
+class OpenAIProvider(AIProvider):
+    """OpenAI chat completions via the client returned by `client_factory` (must not block)"""
+
+    name = "openai"
+
+    def __init__(self, client_factory: Callable, model: str):
+        self.client_factory = client_factory
+        self.model = model
+
+    def available(self) -> bool:
+        return self.client_factory() is not None
+
+    async def _complete(self, system_prompt: str, user_prompt: str, temperature: float) -> str:
+        client = self.client_factory()
+        if client is None:
+            raise ProviderError("OpenAI client not configured")
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=800,
+            temperature=temperature,
+            top_p=0.9
+        )
+        text = response.choices[0].message.content
+        if not text:
+            raise ProviderError("Empty response from OpenAI")
+        return text.strip()
+
+    async def translate(self, content: str, target_language: str) -> str:
+        return await self._complete(
+            "You are an expert translator of Hindi and Urdu poetry. Return ONLY the translated text.",
+            build_translation_prompt(content, target_language),
+            temperature=0.3
+        )
+
+    async def analyze(self, title: str, content: str) -> dict:
+        return parse_analysis(await self._complete(
+            "You are an expert critic of Hindi and Urdu poetry. Respond with JSON only.",
+            ANALYSIS_PROMPT.format(title=title, content=content),
+            temperature=0.2
+        ))
+
+
+class StubProvider(AIProvider):
+    """Deterministic offline provider for local development, tests and benchmarks"""
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.05, fail: bool = False):
+        self.latency = latency
+        self.fail = fail
+
+    async def translate(self, content: str, target_language: str) -> str:
+        build_translation_prompt(content, target_language)
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise ProviderError("Stub provider configured to fail")
+        return transliterate(content)
+
+    async def analyze(self, title: str, content: str) -> dict:
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise ProviderError("Stub provider configured to fail")
+        digest = hashlib.sha256(f"{title}\n{content}".encode("utf-8")).digest()
+        return {
+            "sentiment_analysis": {
+                "emotion": "भावनात्मक",
+                "intensity": str(1 + digest[1] % 10),
+                "mood": "शायरी में गहरी भावनाएं हैं"
+            },
+            "quality_score": {
+                "overall": str(5 + digest[0] % 5),
+                "creativity": str(5 + digest[2] % 5),
+                "language_beauty": str(5 + digest[3] % 5),
+                "emotional_impact": str(5 + digest[4] % 5)
+            },
+            "tags": ["शायरी", "कविता"],
+            "appreciation": "यह एक सुंदर शायरी है।"
+        }
+
+
+class RuleBasedProvider(AIProvider):
+    """Terminal fallback: Hinglish-to-Devanagari transliteration and a canned analysis"""
+
+    name = "rule_based"
+
+    async def translate(self, content: str, target_language: str) -> str:
+        build_translation_prompt(content, target_language)
+        if target_language.lower() != SCRIPT_CONVERSION_TARGET:
+            # Transliteration is script conversion, not translation
+            raise AllProvidersFailed(f"No AI provider available to translate to {target_language}")
+        return transliterate(content)
+
+    async def analyze(self, title: str, content: str) -> dict:
+        return dict(FALLBACK_ANALYSIS)
+
+
+class ProviderRouter:
+    """
+    Routes translate/analyze calls across providers in priority order.
+
+    A provider is skipped while its breaker is open. When the primary has
+    enough latency samples and a healthy secondary exists, the secondary is
+    started as a hedge once the primary exceeds its own p95; the first
+    success wins and the loser is cancelled. Failures and timeouts fail over
+    to the next provider. The terminal provider is never breaker-gated.
+    """
+
+    def __init__(
+        self,
+        providers: List[AIProvider],
+        terminal: Optional[AIProvider] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        timeout: float = 30.0,
+        hedge: bool = True,
+        hedge_min_samples: int = 20,
+        min_hedge_delay: float = 0.5
+    ):
+        self.providers = providers
+        self.terminal = terminal
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.min_hedge_delay = min_hedge_delay
+        self.breakers: Dict[str, CircuitBreaker] = {
+            p.name: CircuitBreaker(failure_threshold, reset_timeout) for p in providers
+        }
+        self.latency: Dict[str, LatencyTracker] = {p.name: LatencyTracker() for p in providers}
+        self.counters: Dict[str, Dict[str, int]] = {
+            p.name: {"calls": 0, "failures": 0, "hedges": 0, "wins": 0}
+            for p in providers + ([terminal] if terminal else [])
+        }
+
+    async def translate(self, content: str, target_language: str) -> Tuple[str, str]:
+        build_translation_prompt(content, target_language)  # reject unsupported languages up front
+        return await self._route("translate", content, target_language)
+
+    async def analyze(self, title: str, content: str) -> Tuple[dict, str]:
+        return await self._route("analyze", title, content)
+
+    def _eligible(self) -> List[AIProvider]:
+        return [p for p in self.providers if p.available() and self.breakers[p.name].state != "open"]
+
+    def _hedge_delay(self, provider: AIProvider) -> Optional[float]:
+        tracker = self.latency[provider.name]
+        if not self.hedge or len(tracker.samples) < self.hedge_min_samples:
+            return None
+        return max(self.min_hedge_delay, tracker.p95())
+
+    async def _attempt(self, provider: AIProvider, operation: str, *args):
+        self.counters[provider.name]["calls"] += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(getattr(provider, operation)(*args), timeout=self.timeout)
+        except asyncio.CancelledError:
+            # Lost a hedge race; neither a success nor a health signal
+            self.breakers[provider.name].release()
+            raise
+        except Exception as e:
+            self.counters[provider.name]["failures"] += 1
+            self.breakers[provider.name].record_failure()
+            logger.warning(f"AI provider {provider.name} {operation} failed: {str(e) or type(e).__name__}")
+            raise
+        self.latency[provider.name].record(time.monotonic() - started)
+        self.breakers[provider.name].record_success()
+        return result
+
+    async def _route(self, operation: str, *args):
+        candidates = self._eligible()
+        tried = set()
+        errors = []
+        for index, primary in enumerate(candidates):
+            if primary.name in tried or not self.breakers[primary.name].allow():
+                continue
+            tried.add(primary.name)
+
+            secondary = next((p for p in candidates[index + 1:] if p.name not in tried), None)
+            hedge_delay = self._hedge_delay(primary) if secondary else None
+            try:
+                if hedge_delay is None:
+                    result, winner = await self._attempt(primary, operation, *args), primary
+                else:
+                    result, winner = await self._hedged(primary, secondary, hedge_delay, tried, operation, *args)
+                self.counters[winner.name]["wins"] += 1
+                return result, winner.name
+            except Exception as e:
+                errors.append(f"{primary.name}: {str(e) or type(e).__name__}")
+
+        if self.terminal is not None:
+            self.counters[self.terminal.name]["calls"] += 1
+            result = await getattr(self.terminal, operation)(*args)
+            self.counters[self.terminal.name]["wins"] += 1
+            return result, self.terminal.name
+        raise AllProvidersFailed("; ".join(errors) or "No AI provider available")
+
+    async def _hedged(self, primary: AIProvider, secondary: AIProvider, delay: float, tried: set, operation: str, *args):
+        primary_task = asyncio.create_task(self._attempt(primary, operation, *args))
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        if done:
+            return primary_task.result(), primary
+
+        if not self.breakers[secondary.name].allow():
+            return await primary_task, primary
+
+        tried.add(secondary.name)
+        self.counters[secondary.name]["hedges"] += 1
+        secondary_task = asyncio.create_task(self._attempt(secondary, operation, *args))
+        tasks = {primary_task: primary, secondary_task: secondary}
+        pending = set(tasks)
+        first_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), tasks[task]
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        report = {}
+        for provider in self.providers:
+            tracker = self.latency[provider.name]
+            p50 = tracker.percentile(50)
+            p95 = tracker.p95()
+            report[provider.name] = {
+                "available": provider.available(),
+                "circuit": self.breakers[provider.name].state,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                **self.counters[provider.name]
+            }
+        if self.terminal is not None:
+            report[self.terminal.name] = {"available": True, "circuit": "n/a", **self.counters[self.terminal.name]}
+        return report
@@ -0,0 +1,258 @@
+"""
+Transactional email outbox for रामा (Raama) backend
+Request handlers write the email to send into the `email_outbox` collection and
+return; a background sender claims due messages one at a time, sends them
+through a rate limiter, and retries transient failures with exponential
+backoff. Each message carries an idempotency key (unique index), so enqueuing
+the same logical email twice stores it once. Claims are leases: a message left
+in "sending" by a crashed worker becomes due again when its lease runs out, so
+delivery is at-least-once. Finished messages get a completedAt date for TTL
+cleanup.
+
+Messages that stop being useful at some point (an OTP past its expiry) carry
+expiresAt: they are not retried past it and fail as expired instead of being
+sent late.
+
+The rate limiter is per process, so with several workers the effective send
+rate toward the provider is the configured rate times the number of workers.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+import asyncio
+import logging
+import random
+import time
+import uuid
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+
+class EmailDeliveryError(Exception):
+    """A send attempt failed; retryable errors are tried again after a backoff"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class TokenBucket:
+    """Allows `rate` sends per second on average with bursts of up to `capacity` (per process)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class EmailOutbox:
+    """Durable email queue in MongoDB with a background sender"""
+
+    def __init__(
+        self,
+        collection,
+        send: Callable[[dict], Awaitable[None]],
+        rate_per_second: float = 1,
+        burst: int = 5,
+        max_attempts: int = 6,
+        base_delay: float = 5,
+        max_delay: float = 900,
+        lease_seconds: float = 60,
+        poll_interval: float = 30,
+    ):
+        self.collection = collection
+        self.send = send
+        self.limiter = TokenBucket(rate_per_second, burst)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def enqueue(
+        self,
+        kind: str,
+        to: str,
+        template_params: dict,
+        idempotency_key: str,
+        expires_at: Optional[datetime] = None,
+    ) -> dict:
+        """Store an email for background delivery; an existing message with the same key is returned instead
+
+        A message with `expires_at` is never sent or retried after that time.
+        """
+        existing = await self.collection.find_one({"idempotencyKey": idempotency_key}, {"_id": 0})
+        if existing:
+            return existing
+        now = datetime.now(timezone.utc)
+        message = {
+            "id": str(uuid.uuid4()),
+            "idempotencyKey": idempotency_key,
+            "kind": kind,
+            "to": to,
+            "templateParams": template_params,
+            "status": "pending",
+            "attempts": 0,
+            "nextAttemptAt": now,
+            "createdAt": now,
+        }
+        if expires_at is not None:
+            message["expiresAt"] = expires_at
+        try:
+            await self.collection.insert_one(message)
+        except DuplicateKeyError:
+            return await self.collection.find_one({"idempotencyKey": idempotency_key}, {"_id": 0})
+        message.pop("_id", None)
+        self._wake.set()
+        return message
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                message = await self._claim()
+                if message is None:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), await self._idle_seconds())
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self.limiter.acquire()
+                await self._deliver(message)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Email outbox sender error: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _idle_seconds(self) -> float:
+        """Sleep until the earliest scheduled retry, at most poll_interval"""
+        upcoming = await self.collection.find_one(
+            {"status": "pending"}, {"_id": 0, "nextAttemptAt": 1}, sort=[("nextAttemptAt", 1)]
+        )
+        if upcoming is None:
+            return self.poll_interval
+        due = upcoming["nextAttemptAt"]
+        if due.tzinfo is None:
+            due = due.replace(tzinfo=timezone.utc)
+        return min(self.poll_interval, max(0.05, (due - datetime.now(timezone.utc)).total_seconds()))
+
+    async def _claim(self) -> Optional[dict]:
+        """Lease the next due message (pending, or sending with an expired lease)"""
+        now = datetime.now(timezone.utc)
+        message = await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "nextAttemptAt": {"$lte": now}},
+                {"status": "sending", "leaseUntil": {"$lte": now}},
+            ]},
+            {
+                "$set": {"status": "sending", "leaseUntil": now + timedelta(seconds=self.lease_seconds)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("nextAttemptAt", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if message is not None:
+            message.pop("_id", None)
+        return message
+
+    async def _deliver(self, message: dict):
+        query = {"id": message["id"], "status": "sending"}
+        now = datetime.now(timezone.utc)
+        expires_at = message.get("expiresAt")
+        if expires_at is not None and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at is not None and expires_at <= now:
+            await self._fail(message, query, now, "expired before it could be sent")
+            return
+        try:
+            await self.send(message)
+        except EmailDeliveryError as e:
+            error, retryable = str(e), e.retryable
+        except Exception as e:
+            error, retryable = f"{type(e).__name__}: {e}", True
+        else:
+            self.sent += 1
+            # Template parameters hold the OTP or verification link; nothing needs them once sent
+            await self.collection.update_one(query, {
+                "$set": {"status": "sent", "sentAt": now, "completedAt": now},
+                "$unset": {"leaseUntil": "", "templateParams": "", "lastError": ""},
+            })
+            logger.info(f"📧 Sent {message['kind']} email {message['id']}")
+            return
+
+        attempts = message.get("attempts", 1)
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.5, 1)
+        next_attempt = now + timedelta(seconds=delay)
+        if expires_at is not None and next_attempt >= expires_at:
+            # The retry would deliver an OTP that no longer works
+            retryable = False
+            error = f"{error} (expires before the next attempt)"
+        if retryable and attempts < self.max_attempts:
+            self.retried += 1
+            await self.collection.update_one(query, {
+                "$set": {"status": "pending", "nextAttemptAt": next_attempt, "lastError": error},
+                "$unset": {"leaseUntil": ""},
+            })
+            logger.warning(f"⚠️ {message['kind']} email {message['id']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+        else:
+            await self._fail(message, query, now, error)
+
+    async def _fail(self, message: dict, query: dict, now: datetime, error: str):
+        self.failed += 1
+        await self.collection.update_one(query, {
+            "$set": {"status": "failed", "failedAt": now, "completedAt": now, "lastError": error},
+            "$unset": {"leaseUntil": "", "templateParams": ""},
+        })
+        logger.error(f"❌ {message['kind']} email {message['id']} failed after {message.get('attempts', 1)} attempts: {error}")
+
+    async def stats(self) -> dict:
+        by_status = {}
+        async for row in self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            by_status[row["_id"]] = row["count"]
+        oldest = await self.collection.find_one(
+            {"status": "pending"}, {"_id": 0, "createdAt": 1}, sort=[("createdAt", 1)]
+        )
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "byStatus": by_status,
+            "oldestPendingAt": oldest["createdAt"].isoformat() if oldest else None,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            # Per process: the provider sees this times the number of workers
+            "ratePerSecond": self.limiter.rate,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
@@ -0,0 +1,151 @@
+"""
+Shared outbound HTTP client for रामा (Raama) backend
+One aiohttp session lives for the whole application: created on startup,
+closed on shutdown, and used by every outbound integration (EmailJS, web push,
+self-ping). Connections are kept alive and reused, DNS answers are cached, and
+the pool is capped overall and per host. A TraceConfig counts new versus
+reused connections, DNS cache hits and request latency per host.
+"""
+
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Optional
+import logging
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.latencies = deque(maxlen=500)
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        connections = self.new_connections + self.reused_connections
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "newConnections": self.new_connections,
+            "reusedConnections": self.reused_connections,
+            "reuseRatio": round(self.reused_connections / connections, 3) if connections else None,
+            "latencyP50Ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+            "latencyP95Ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+        }
+
+
+class SharedHTTPClient:
+    """Application-lifetime aiohttp session with pooling limits and connection metrics"""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 50,
+        dns_cache_seconds: int = 300,
+        keepalive_seconds: float = 30,
+        timeout_seconds: float = 30,
+        connect_timeout_seconds: float = 10,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_seconds = dns_cache_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds, connect=connect_timeout_seconds)
+        self.hosts = defaultdict(HostStats)
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+        self.sessions_created = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session (created on first use if startup has not run, e.g. in scripts)"""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        self.sessions_created += 1
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_seconds,
+            keepalive_timeout=self.keepalive_seconds,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            trace_configs=[self._trace_config()],
+        )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace())
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = params.url.host
+            ctx.started = time.perf_counter()
+            self.hosts[ctx.host].requests += 1
+
+        async def on_request_end(session, ctx, params):
+            self.hosts[ctx.host].latencies.append(time.perf_counter() - ctx.started)
+
+        async def on_request_exception(session, ctx, params):
+            self.hosts[ctx.host].errors += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.hosts[ctx.host].new_connections += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.hosts[ctx.host].reused_connections += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.dns_cache_misses += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    async def start(self) -> aiohttp.ClientSession:
+        session = self.session
+        logger.info(f"Shared HTTP client ready (pool {self.limit}, {self.limit_per_host} per host)")
+        return session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> dict:
+        hosts = {host: stats.to_dict() for host, stats in self.hosts.items()}
+        new = sum(stats.new_connections for stats in self.hosts.values())
+        reused = sum(stats.reused_connections for stats in self.hosts.values())
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "sessionsCreated": self.sessions_created,
+            "limit": self.limit,
+            "limitPerHost": self.limit_per_host,
+            "requests": sum(stats.requests for stats in self.hosts.values()),
+            "errors": sum(stats.errors for stats in self.hosts.values()),
+            "newConnections": new,
+            "reusedConnections": reused,
+            "reuseRatio": round(reused / (new + reused), 3) if new + reused else None,
+            "dnsCacheHits": self.dns_cache_hits,
+            "dnsCacheMisses": self.dns_cache_misses,
+            "hosts": hosts,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
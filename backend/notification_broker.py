@@ -0,0 +1,83 @@
+"""
+In-process notification pub/sub for रामा (Raama) backend
+Every open SSE connection subscribes a bounded asyncio queue for its user;
+publishing a stored notification puts it on that user's queues without
+blocking. A slow client never holds up the publisher: when its queue is full
+the oldest pending event is dropped.
+"""
+
+import asyncio
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 100
+
+
+class NotificationBroker:
+    """Per-user fan-out of notification events to local SSE subscribers"""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self.subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[user_id]
+
+    @contextmanager
+    def subscription(self, user_id: str) -> Iterator[asyncio.Queue]:
+        """Subscribe for the lifetime of a `with` block (one SSE connection)"""
+        queue = self.subscribe(user_id)
+        try:
+            yield queue
+        finally:
+            self.unsubscribe(user_id, queue)
+
+    def is_connected(self, user_id: str) -> bool:
+        return user_id in self.subscribers
+
+    def publish(self, notification: dict) -> int:
+        """Queue a notification for its recipient's connections; returns how many received it"""
+        self.published += 1
+        queues = self.subscribers.get(notification.get("userId"))
+        if not queues:
+            return 0
+
+        # Mongo adds _id on insert; it is not JSON serializable and not part of the API
+        event = {k: v for k, v in notification.items() if k != "_id"}
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+        self.delivered += len(queues)
+        return len(queues)
+
+    def publish_many(self, notifications: Iterable[dict]) -> int:
+        return sum(self.publish(notification) for notification in notifications)
+
+    def stats(self) -> dict:
+        return {
+            "connectedUsers": len(self.subscribers),
+            "connections": sum(len(queues) for queues in self.subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "queueSize": self.queue_size,
+        }
@@ -0,0 +1,226 @@
+"""
+Unread notification counters for रामा (Raama) backend
+Keeps one document per user in `notification_state` with an unreadCount that
+is incremented when notifications are stored and decremented when they are
+read or deleted, so badge fetches are a single keyed read instead of a
+count_documents over the user's whole backlog. A user's first counter is
+seeded from a recount, so notifications from before counters existed are
+included. A periodic reconciliation recounts from the notifications
+collection and corrects drift with a delta that only applies if the counter
+did not move in the meantime.
+
+The same document holds the user's read watermark, notificationsReadUpTo: a
+notification is unread only if it was created after the watermark and has not
+been marked read individually, so "mark all read" is one document update.
+Maintenance stamps a readAt date on notifications that fell below the
+watermark so the TTL index on readAt can expire them.
+"""
+
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+import logging
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+def is_unread(notification: dict, read_up_to: Optional[str]) -> bool:
+    """Read state of a notification under the user's watermark (ISO timestamps compare as strings)"""
+    if notification.get("isRead"):
+        return False
+    if read_up_to is None:
+        return True
+    created_at = notification.get("createdAt", "")
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    return created_at > read_up_to
+
+
+class UnreadCounters:
+    """Per-user unread notification counts stored in the notification_state collection"""
+
+    def __init__(self, state_collection, notifications_collection):
+        self.state = state_collection
+        self.notifications = notifications_collection
+
+    async def increment_for(self, notif_docs: Iterable[dict]):
+        """Count newly stored unread notifications, one write per recipient
+
+        Must run after the notifications are inserted: recipients without a
+        counter yet are seeded from a recount that includes them.
+        """
+        counts = Counter(doc["userId"] for doc in notif_docs if not doc.get("isRead"))
+        if not counts:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        if len(counts) == 1:
+            (user_id, count), = counts.items()
+            result = await self.state.update_one(
+                {"userId": user_id},
+                {"$inc": {"unreadCount": count}, "$set": {"updatedAt": now}}
+            )
+            if not result.matched_count:
+                await self._seed(user_id, count, now)
+            return
+        existing = set(await self.state.distinct("userId", {"userId": {"$in": list(counts)}}))
+        if existing:
+            await self.state.bulk_write([
+                UpdateOne(
+                    {"userId": user_id},
+                    {"$inc": {"unreadCount": count}, "$set": {"updatedAt": now}}
+                )
+                for user_id, count in counts.items() if user_id in existing
+            ], ordered=False)
+        for user_id in counts.keys() - existing:
+            await self._seed(user_id, counts[user_id], now)
+
+    async def _seed(self, user_id: str, count: int, now: str):
+        """Create a user's counter from a recount; if another writer created it first, add `count` instead"""
+        unread = await self.recount(user_id)
+        result = await self.state.update_one(
+            {"userId": user_id},
+            {"$setOnInsert": {"unreadCount": unread, "updatedAt": now}},
+            upsert=True
+        )
+        if result.upserted_id is None:
+            await self.state.update_one(
+                {"userId": user_id},
+                {"$inc": {"unreadCount": count}, "$set": {"updatedAt": now}}
+            )
+
+    async def decrement(self, user_id: str, count: int = 1):
+        if count <= 0:
+            return
+        await self.state.update_one(
+            {"userId": user_id},
+            {"$inc": {"unreadCount": -count}, "$set": {"updatedAt": datetime.now(timezone.utc).isoformat()}}
+        )
+
+    async def get(self, user_id: str) -> int:
+        """Unread count for a user, seeding the counter from a recount the first time"""
+        return (await self.get_state(user_id))["unreadCount"]
+
+    async def get_state(self, user_id: str) -> dict:
+        """Unread count and read watermark for a user"""
+        state = await self.state.find_one(
+            {"userId": user_id},
+            {"_id": 0, "unreadCount": 1, "notificationsReadUpTo": 1}
+        )
+        if state is None:
+            # Users with notifications from before counters existed
+            count = await self.recount(user_id)
+            await self.state.update_one(
+                {"userId": user_id},
+                {"$setOnInsert": {"unreadCount": count, "updatedAt": datetime.now(timezone.utc).isoformat()}},
+                upsert=True
+            )
+            state = {"unreadCount": count}
+        return {
+            "unreadCount": max(0, state.get("unreadCount", 0)),
+            "notificationsReadUpTo": state.get("notificationsReadUpTo")
+        }
+
+    async def read_watermark(self, user_id: str) -> Optional[str]:
+        state = await self.state.find_one({"userId": user_id}, {"_id": 0, "notificationsReadUpTo": 1})
+        return state.get("notificationsReadUpTo") if state else None
+
+    async def mark_all_read(self, user_id: str) -> int:
+        """Move the watermark to now in one update; returns how many were unread"""
+        now = datetime.now(timezone.utc).isoformat()
+        previous = await self.state.find_one_and_update(
+            {"userId": user_id},
+            {"$set": {"notificationsReadUpTo": now, "unreadCount": 0, "updatedAt": now}},
+            projection={"_id": 0, "unreadCount": 1},
+            upsert=True
+        )
+        return max(0, previous.get("unreadCount", 0)) if previous else 0
+
+    async def recount(self, user_id: str, read_up_to: Optional[str] = None) -> int:
+        query = {"userId": user_id, "isRead": False}
+        if read_up_to:
+            query["createdAt"] = {"$gt": read_up_to}
+        return await self.notifications.count_documents(query)
+
+    async def delete(self, user_id: str):
+        await self.state.delete_one({"userId": user_id})
+
+    async def stamp_read(self) -> dict:
+        """Set readAt on notifications below each moved watermark, for TTL expiry"""
+        read_at = datetime.now(timezone.utc)
+        users = stamped = 0
+        async for state in self.state.find(
+            {"notificationsReadUpTo": {"$exists": True}},
+            {"_id": 0, "userId": 1, "notificationsReadUpTo": 1, "readStampedUpTo": 1}
+        ):
+            read_up_to = state["notificationsReadUpTo"]
+            if state.get("readStampedUpTo") and state["readStampedUpTo"] >= read_up_to:
+                continue
+            result = await self.notifications.update_many(
+                {"userId": state["userId"], "createdAt": {"$lte": read_up_to}, "readAt": {"$exists": False}},
+                {"$set": {"readAt": read_at}}
+            )
+            await self.state.update_one(
+                {"userId": state["userId"]},
+                {"$set": {"readStampedUpTo": read_up_to}}
+            )
+            users += 1
+            stamped += result.modified_count
+        if users:
+            logger.info(f"Stamped readAt on {stamped} notifications for {users} users")
+        return {"users": users, "stamped": stamped}
+
+    async def reconcile(self) -> dict:
+        """Recount unread notifications for every user and fix counters that drifted"""
+        actual = {}
+        async for row in self.notifications.aggregate([
+            {"$match": {"isRead": False}},
+            {"$group": {"_id": "$userId", "count": {"$sum": 1}}}
+        ]):
+            actual[row["_id"]] = row["count"]
+
+        now = datetime.now(timezone.utc).isoformat()
+        suspects = []
+        checked = 0
+        async for state in self.state.find({}, {"_id": 0, "userId": 1, "unreadCount": 1, "notificationsReadUpTo": 1}):
+            checked += 1
+            user_id = state["userId"]
+            flagged = actual.pop(user_id, 0)
+            # Flags alone over-count when there is a watermark; _correct recounts exactly
+            if state.get("unreadCount", 0) != flagged or (flagged and state.get("notificationsReadUpTo")):
+                suspects.append(user_id)
+        # Users with unread notifications but no counter yet
+        suspects.extend(actual)
+
+        corrected = 0
+        for user_id in suspects:
+            corrected += await self._correct(user_id, now)
+        logger.info(f"Unread counter reconciliation: {checked} counters checked, {corrected} corrected")
+        return {"checked": checked, "corrected": corrected, "reconciledAt": now}
+
+    async def _correct(self, user_id: str, now: str) -> bool:
+        """Recount one user and apply the difference, unless the counter or watermark moved meanwhile"""
+        state = await self.state.find_one(
+            {"userId": user_id}, {"_id": 0, "unreadCount": 1, "notificationsReadUpTo": 1}
+        )
+        if state is None:
+            unread = await self.recount(user_id)
+            result = await self.state.update_one(
+                {"userId": user_id},
+                {"$setOnInsert": {"unreadCount": unread, "updatedAt": now, "reconciledAt": now}},
+                upsert=True
+            )
+            return result.upserted_id is not None
+        observed = state.get("unreadCount")
+        read_up_to = state.get("notificationsReadUpTo")
+        delta = await self.recount(user_id, read_up_to) - (observed or 0)
+        if not delta:
+            return False
+        # A concurrent increment, decrement or mark-all-read changes one of these and
+        # skips the fix; the next run recounts against the new value
+        result = await self.state.update_one(
+            {"userId": user_id, "unreadCount": observed, "notificationsReadUpTo": read_up_to},
+            {"$inc": {"unreadCount": delta}, "$set": {"updatedAt": now, "reconciledAt": now}}
+        )
+        return result.modified_count > 0
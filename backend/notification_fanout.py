@@ -0,0 +1,186 @@
+"""
+Notification fan-out for रामा (Raama) backend
+Delivers one notification to many recipients (followers of a writer, every
+user for a broadcast) in the background: recipients are streamed from a
+cursor, documents are built and written in chunks with insert_many, and each
+job records progress so large fan-outs can be observed.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import AsyncIterable, Awaitable, Callable, Deque, List, Optional, Set
+import logging
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Called with each chunk of inserted notification documents (push delivery, pub/sub)
+ChunkCallback = Callable[[List[dict]], Awaitable[None]]
+
+
+class FanoutJob:
+    """Progress of a single fan-out"""
+
+    def __init__(self, kind: str, source_id: Optional[str] = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.source_id = source_id
+        self.status = "pending"
+        self.recipients = 0
+        self.inserted = 0
+        self.failed = 0
+        self.chunks = 0
+        self.error: Optional[str] = None
+        # Last recipient of the newest written chunk; recipients stream in a stable order, so a job can resume after it
+        self.last_recipient: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def to_dict(self) -> dict:
+        duration = self.duration
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "sourceId": self.source_id,
+            "status": self.status,
+            "recipients": self.recipients,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "error": self.error,
+            "createdAt": self.created_at.isoformat(),
+            "durationSeconds": round(duration, 3) if duration is not None else None,
+            "insertsPerSecond": round(self.inserted / duration, 1) if duration else None,
+        }
+
+
+class FanoutTracker:
+    """Running fan-out tasks plus metrics for recently finished jobs"""
+
+    def __init__(self, history: int = 50):
+        self.jobs: Deque[FanoutJob] = deque(maxlen=history)
+        self.tasks: Set[asyncio.Task] = set()
+        self.totals = {"jobs": 0, "failed_jobs": 0, "recipients": 0, "inserted": 0, "failed": 0}
+
+    def start(self, job: FanoutJob, coro: Awaitable) -> FanoutJob:
+        """Run a fan-out coroutine in the background, keeping a reference until it finishes"""
+        self.jobs.append(job)
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return job
+
+    def record(self, job: FanoutJob):
+        self.totals["jobs"] += 1
+        self.totals["recipients"] += job.recipients
+        self.totals["inserted"] += job.inserted
+        self.totals["failed"] += job.failed
+        if job.status == "failed":
+            self.totals["failed_jobs"] += 1
+
+    def stats(self) -> dict:
+        return {
+            "running": sum(1 for job in self.jobs if job.status == "running"),
+            "totals": dict(self.totals),
+            "recent": [job.to_dict() for job in reversed(self.jobs)],
+        }
+
+    async def shutdown(self, timeout: float = 10):
+        """Give in-flight fan-outs a chance to finish, then cancel the rest"""
+        if not self.tasks:
+            return
+        _, pending = await asyncio.wait(set(self.tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+
+def build_notification_docs(template: dict, user_ids: List[str]) -> List[dict]:
+    """Copy a notification template once per recipient with a fresh id and timestamp"""
+    created_at = datetime.now(timezone.utc).isoformat()
+    return [
+        {**template, "id": str(uuid.uuid4()), "userId": user_id, "isRead": False, "createdAt": created_at}
+        for user_id in user_ids
+    ]
+
+
+async def fan_out(
+    collection,
+    recipients: AsyncIterable[str],
+    template: dict,
+    job: FanoutJob,
+    tracker: Optional[FanoutTracker] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk: Optional[ChunkCallback] = None,
+):
+    """Insert `template` for every recipient id, `chunk_size` documents per insert_many"""
+    job.status = "running"
+    job.started_at = time.monotonic()
+
+    async def flush(user_ids: List[str]):
+        docs = build_notification_docs(template, user_ids)
+        try:
+            await collection.insert_many(docs, ordered=False)
+            inserted_docs = docs
+        except BulkWriteError as e:
+            failed_indexes = {err["index"] for err in e.details.get("writeErrors", [])}
+            inserted_docs = [doc for i, doc in enumerate(docs) if i not in failed_indexes]
+            job.failed += len(docs) - len(inserted_docs)
+            logger.error(f"Fan-out {job.id}: {len(failed_indexes)} inserts failed in chunk {job.chunks + 1}")
+        job.inserted += len(inserted_docs)
+        job.chunks += 1
+        job.last_recipient = user_ids[-1]
+        if on_chunk and inserted_docs:
+            try:
+                await on_chunk(inserted_docs)
+            except Exception as e:
+                logger.error(f"Fan-out {job.id}: chunk callback failed: {str(e)}")
+
+    try:
+        chunk: List[str] = []
+        async for user_id in recipients:
+            chunk.append(user_id)
+            job.recipients += 1
+            if len(chunk) >= chunk_size:
+                await flush(chunk)
+                chunk = []
+        if chunk:
+            await flush(chunk)
+        job.status = "completed"
+    except asyncio.CancelledError:
+        job.status = "cancelled"
+        raise
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        logger.error(f"Fan-out {job.id} ({job.kind}) failed after {job.inserted} inserts: {str(e)}")
+    finally:
+        job.finished_at = time.monotonic()
+        if tracker:
+            tracker.record(job)
+
+    logger.info(
+        f"Fan-out {job.id} ({job.kind}) {job.status}: {job.inserted}/{job.recipients} notifications "
+        f"in {job.chunks} chunks, {job.duration:.2f}s"
+    )
+    return job
+
+
+async def field_values(cursor, field: str):
+    """Yield one field from every document of a Motor cursor"""
+    async for doc in cursor:
+        value = doc.get(field)
+        if value:
+            yield value
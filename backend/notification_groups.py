@@ -0,0 +1,153 @@
+"""
+Coalesced notifications for रामा (Raama) backend
+Likes and follows are aggregated per recipient, type and shayari within a time
+window: the first event inserts a notification and later ones update it,
+bumping an actor count and keeping the last few actor names. A viral shayari
+then produces one "A, B and 1,203 others liked your shayari" row per window
+instead of one row per like. The message is rendered from the counts at read
+time.
+
+Which actors a group has counted lives in `notification_group_actors`, one
+small row per (recipient, group, actor) under a unique index, so an actor who
+likes, unlikes and likes again within the window is only counted once while
+the group row itself stays the same size however many actors it has. The rows
+expire shortly after their window closes.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import uuid
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+MAX_RECENT_ACTORS = 3
+
+ACTIONS = {
+    "like": "liked your shayari",
+    "follow": "started following you!",
+}
+
+
+def group_key(notification_type: str, shayari_id: Optional[str], now: datetime, window_seconds: int) -> str:
+    """Aggregation key: one group per type and target in each fixed time window"""
+    bucket = int(now.timestamp() // window_seconds)
+    return f"{notification_type}:{shayari_id or '-'}:{bucket}"
+
+
+def format_message(notification: dict) -> str:
+    """Render 'A liked…', 'A and B liked…' or 'A, B and N others liked…' from the stored counts"""
+    action = ACTIONS.get(notification.get("type"), "interacted with you")
+    count = notification.get("actorCount") or 1
+    # Most recent actor first
+    names = [actor.get("name") for actor in reversed(notification.get("recentActors") or [])]
+    names = [name for name in names if name] or [notification.get("senderName") or "Someone"]
+
+    if count == 1:
+        return f"{names[0]} {action}"
+    if count == 2 and len(names) >= 2:
+        return f"{names[0]} and {names[1]} {action}"
+    shown = names[:2] if count > 2 else names[:1]
+    others = count - len(shown)
+    return f"{', '.join(shown)} and {others:,} {'other' if others == 1 else 'others'} {action}"
+
+
+def present(notification: dict) -> dict:
+    """Fill in the rendered message of a grouped notification for clients"""
+    if notification.get("actorCount"):
+        notification["message"] = format_message(notification)
+    return notification
+
+
+async def ensure_indexes(collection, actors):
+    """Create the indexes grouping relies on: one group per recipient and key, one row per counted actor"""
+    await collection.create_index(
+        [("userId", 1), ("groupKey", 1)],
+        unique=True,
+        partialFilterExpression={"groupKey": {"$exists": True}},
+        name="idx_notifications_group"
+    )
+    await actors.create_index(
+        [("userId", 1), ("groupKey", 1), ("actorId", 1)], unique=True, name="idx_group_actors_unique"
+    )
+    await actors.create_index("expiresAt", expireAfterSeconds=0, name="idx_group_actors_ttl")
+
+
+async def upsert_grouped(
+    collection,
+    actors,
+    user_id: str,
+    notification_type: str,
+    actor_id: str,
+    actor_name: str,
+    now: datetime,
+    window_seconds: int,
+    shayari_id: Optional[str] = None,
+    shayari_title: Optional[str] = None,
+) -> Optional[Tuple[Optional[dict], dict]]:
+    """Add an actor to the recipient's open group; returns (document before, document after)
+
+    `before` is None when this created the group. Returns None when the actor
+    is already counted in the group.
+    """
+    key = group_key(notification_type, shayari_id, now, window_seconds)
+    member = {"userId": user_id, "groupKey": key, "actorId": actor_id}
+    try:
+        await actors.insert_one({**member, "expiresAt": now + timedelta(seconds=window_seconds)})
+    except DuplicateKeyError:
+        return None
+
+    created_at = now.isoformat()
+    actor = {"id": actor_id, "name": actor_name}
+    update = {
+        "$inc": {"actorCount": 1},
+        "$push": {"recentActors": {"$each": [actor], "$slice": -MAX_RECENT_ACTORS}},
+        # Latest activity moves the group to the top of the inbox and makes it unread again
+        "$set": {
+            "senderId": actor_id,
+            "senderName": actor_name,
+            "isRead": False,
+            "createdAt": created_at,
+        },
+        # A group that was read (and scheduled for TTL expiry) is active again
+        "$unset": {"readAt": ""},
+        "$setOnInsert": {
+            "id": str(uuid.uuid4()),
+            "type": notification_type,
+            "shayariId": shayari_id,
+            "shayariTitle": shayari_title,
+            "title": None,
+            "viewCount": None,
+            "message": f"{actor_name} {ACTIONS.get(notification_type, '')}".strip(),
+            "firstCreatedAt": created_at,
+        },
+    }
+    query = {"userId": user_id, "groupKey": key}
+    projection = {"_id": 0}
+
+    try:
+        try:
+            before = await collection.find_one_and_update(
+                query, update, projection=projection, upsert=True, return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # Another request created the group between our match and insert
+            before = await collection.find_one_and_update(
+                query, update, projection=projection, return_document=ReturnDocument.BEFORE
+            )
+    except Exception:
+        # Not counted after all; let a retry count the actor
+        await actors.delete_one(member)
+        raise
+
+    if before is None:
+        after = {**query, **update["$setOnInsert"], **update["$set"], "actorCount": 1, "recentActors": [actor]}
+    else:
+        recent = (before.get("recentActors") or []) + [actor]
+        after = {
+            **{k: v for k, v in before.items() if k != "readAt"},
+            **update["$set"],
+            "actorCount": (before.get("actorCount") or 1) + 1,
+            "recentActors": recent[-MAX_RECENT_ACTORS:],
+        }
+    return before, present(after)
@@ -0,0 +1,202 @@
+"""
+Cross-worker notification propagation for रामा (Raama) backend
+Each process runs one MongoDB change stream on the notifications collection
+(inserts, plus updates that add an actor to a coalesced notification, projected
+to the fields clients render) and publishes every
+new notification to its local broker, so a notification written by any worker
+reaches SSE connections held by this one. The resume token is persisted so a
+restart continues from the last delivered event instead of dropping the gap.
+
+Change streams need a replica set; on a standalone server the watcher reports
+itself unavailable and the caller keeps publishing directly.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+import logging
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Fields of a notification delivered to clients (everything but Mongo's _id)
+STREAM_FIELDS = (
+    "id", "userId", "senderId", "senderName", "message", "type", "shayariId",
+    "shayariTitle", "title", "viewCount", "isRead", "createdAt", "actorCount", "recentActors",
+)
+
+# Server error codes meaning change streams can never work against this deployment
+CHANGE_STREAMS_UNSUPPORTED = {
+    40573,  # The $changeStream stage is only supported on replica sets
+    20,     # IllegalOperation (e.g. standalone in some server versions)
+}
+# The stored resume token has fallen off the oplog
+CHANGE_STREAM_HISTORY_LOST = {286, 280}
+
+
+class NotificationChangeWatcher:
+    """Tails notification inserts and publishes them to the local broker"""
+
+    def __init__(
+        self,
+        collection,
+        state_collection,
+        broker,
+        watcher_id: str,
+        transform: Optional[Callable[[dict], dict]] = None,
+        save_interval: float = 1.0,
+        max_await_ms: int = 1000,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+    ):
+        self.collection = collection
+        self.state_collection = state_collection
+        self.broker = broker
+        self.watcher_id = watcher_id
+        self.transform = transform
+        self.save_interval = save_interval
+        self.max_await_ms = max_await_ms
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.active = False
+        self.unavailable_reason: Optional[str] = None
+        self.events = 0
+        self.delivered = 0
+        self.restarts = 0
+        self.last_event_at: Optional[str] = None
+
+        self._resume_token = None
+        self._token_dirty = False
+        self._token_saved_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pipeline(self) -> list:
+        projection = {"_id": 1, "operationType": 1}
+        projection.update({f"fullDocument.{field}": 1 for field in STREAM_FIELDS})
+        return [
+            {"$match": {"$or": [
+                {"operationType": "insert"},
+                {"operationType": "update", "updateDescription.updatedFields.actorCount": {"$exists": True}},
+            ]}},
+            {"$project": projection},
+        ]
+
+    def start(self) -> asyncio.Task:
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._token_dirty:
+            await self._save_token(force=True)
+        self.active = False
+
+    async def run(self):
+        """Watch until cancelled, reconnecting with backoff on transient errors"""
+        self._resume_token = await self._load_token()
+        delay = self.retry_delay
+        while True:
+            try:
+                await self._watch()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self.active = False
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    self.unavailable_reason = str(e)
+                    logger.warning(f"Notification change stream unavailable, using direct publish: {str(e)}")
+                    return
+                if e.code in CHANGE_STREAM_HISTORY_LOST:
+                    logger.error("Notification resume token expired - restarting change stream from now")
+                    self._resume_token = None
+                    await self._save_token(force=True)
+                    continue
+                logger.error(f"Notification change stream failed: {str(e)}")
+            except PyMongoError as e:
+                self.active = False
+                logger.error(f"Notification change stream disconnected: {str(e)}")
+
+            self.restarts += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    async def _watch(self):
+        async with self.collection.watch(
+            self.pipeline,
+            full_document="updateLookup",
+            resume_after=self._resume_token,
+            max_await_time_ms=self.max_await_ms,
+        ) as stream:
+            self.active = True
+            self.unavailable_reason = None
+            logger.info(f"📡 Notification change stream started (watcher {self.watcher_id})")
+            while stream.alive:
+                change = await stream.try_next()
+                if change is not None:
+                    self._handle(change)
+                # Advances on idle batches too, so the saved token tracks the oplog
+                token = stream.resume_token
+                if token is not None and token != self._resume_token:
+                    self._resume_token = token
+                    self._token_dirty = True
+                await self._save_token()
+
+    def _handle(self, change: dict):
+        notification = change.get("fullDocument")
+        if not notification:
+            return
+        self.events += 1
+        self.last_event_at = datetime.now(timezone.utc).isoformat()
+        # Only users with a connection on this worker have queues; others are skipped
+        if self.broker.is_connected(notification.get("userId")):
+            if self.transform:
+                notification = self.transform(notification)
+            self.delivered += self.broker.publish(notification)
+
+    async def _load_token(self):
+        try:
+            state = await self.state_collection.find_one({"_id": self.watcher_id})
+        except PyMongoError as e:
+            logger.error(f"Could not load notification resume token: {str(e)}")
+            return None
+        return state.get("resumeToken") if state else None
+
+    async def _save_token(self, force: bool = False):
+        if not self._token_dirty and not force:
+            return
+        now = time.monotonic()
+        if not force and now - self._token_saved_at < self.save_interval:
+            return
+        try:
+            await self.state_collection.update_one(
+                {"_id": self.watcher_id},
+                {"$set": {
+                    "resumeToken": self._resume_token,
+                    "updatedAt": datetime.now(timezone.utc).isoformat()
+                }},
+                upsert=True
+            )
+            self._token_dirty = False
+            self._token_saved_at = now
+        except PyMongoError as e:
+            logger.error(f"Could not save notification resume token: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "watcherId": self.watcher_id,
+            "active": self.active,
+            "unavailableReason": self.unavailable_reason,
+            "events": self.events,
+            "delivered": self.delivered,
+            "restarts": self.restarts,
+            "lastEventAt": self.last_event_at,
+        }
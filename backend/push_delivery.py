@@ -0,0 +1,342 @@
+"""
+Web Push delivery for रामा (Raama) backend
+Notifications are handed to a background worker through a bounded queue, so
+storing a notification never waits on push services. The worker looks up the
+recipients' subscriptions in one query per batch of queued jobs, encrypts each
+payload (RFC 8291, aes128gcm), signs the request with a VAPID token (RFC 8292)
+and POSTs it over one pooled HTTP session with a cap on requests in flight.
+Subscriptions the push service reports as gone (404/410) are deleted in
+batches.
+"""
+
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+
+import aiohttp
+import jwt
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+logger = logging.getLogger(__name__)
+
+RECORD_SIZE = 4096
+# Record size minus the padding delimiter and the AES-GCM tag
+MAX_PAYLOAD_BYTES = RECORD_SIZE - 17
+VAPID_TOKEN_LIFETIME = 12 * 3600
+GONE_STATUSES = (404, 410)
+
+
+def b64url_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def b64url_encode(value: bytes) -> str:
+    return base64.urlsafe_b64encode(value).rstrip(b"=").decode("ascii")
+
+
+def public_key_bytes(key: ec.EllipticCurvePublicKey) -> bytes:
+    """Uncompressed P-256 point (65 bytes), the form used by Web Push keys"""
+    return key.public_bytes(serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint)
+
+
+def load_private_key(value: str) -> ec.EllipticCurvePrivateKey:
+    """VAPID private key from PEM or from the base64url raw scalar most tooling prints"""
+    value = value.strip()
+    if value.startswith("-----BEGIN"):
+        return serialization.load_pem_private_key(value.encode(), password=None)
+    return ec.derive_private_key(int.from_bytes(b64url_decode(value), "big"), ec.SECP256R1())
+
+
+def generate_vapid_keys() -> Tuple[str, str]:
+    """New (private, public) VAPID key pair, both base64url encoded"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    private = key.private_numbers().private_value.to_bytes(32, "big")
+    return b64url_encode(private), b64url_encode(public_key_bytes(key.public_key()))
+
+
+def hkdf_sha256(salt: bytes, info: bytes, length: int, ikm: bytes) -> bytes:
+    return HKDF(algorithm=hashes.SHA256(), length=length, salt=salt, info=info).derive(ikm)
+
+
+def encrypt_payload(payload: bytes, p256dh: str, auth: str) -> bytes:
+    """Encrypt a push message for one subscription as a single aes128gcm record"""
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"Push payload of {len(payload)} bytes exceeds {MAX_PAYLOAD_BYTES}")
+    ua_public = b64url_decode(p256dh)
+    auth_secret = b64url_decode(auth)
+    ua_key = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), ua_public)
+
+    # Fresh sender key and salt per message
+    as_key = ec.generate_private_key(ec.SECP256R1())
+    as_public = public_key_bytes(as_key.public_key())
+    salt = os.urandom(16)
+
+    shared_secret = as_key.exchange(ec.ECDH(), ua_key)
+    ikm = hkdf_sha256(auth_secret, b"WebPush: info\x00" + ua_public + as_public, 32, shared_secret)
+    cek = hkdf_sha256(salt, b"Content-Encoding: aes128gcm\x00", 16, ikm)
+    nonce = hkdf_sha256(salt, b"Content-Encoding: nonce\x00", 12, ikm)
+
+    # \x02 marks the last (and only) record
+    ciphertext = AESGCM(cek).encrypt(nonce, payload + b"\x02", None)
+    header = salt + RECORD_SIZE.to_bytes(4, "big") + bytes([len(as_public)]) + as_public
+    return header + ciphertext
+
+
+class VapidSigner:
+    """Signs VAPID tokens per push service origin and caches them until close to expiry"""
+
+    def __init__(self, private_key: str, subject: str):
+        self.key = load_private_key(private_key)
+        self.subject = subject
+        self.public_key = b64url_encode(public_key_bytes(self.key.public_key()))
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+
+    def authorization(self, endpoint: str) -> str:
+        parts = urlsplit(endpoint)
+        audience = f"{parts.scheme}://{parts.netloc}"
+        now = time.time()
+        cached = self._tokens.get(audience)
+        if cached is None or cached[1] - now < VAPID_TOKEN_LIFETIME / 4:
+            expires = now + VAPID_TOKEN_LIFETIME
+            token = jwt.encode(
+                {"aud": audience, "exp": int(expires), "sub": self.subject},
+                self.key,
+                algorithm="ES256"
+            )
+            cached = self._tokens[audience] = (token, expires)
+        return f"vapid t={cached[0]}, k={self.public_key}"
+
+
+class PushDeliveryWorker:
+    """Queue-fed Web Push sender with bounded concurrency and batched pruning"""
+
+    def __init__(
+        self,
+        subscriptions,
+        signer: Optional[VapidSigner],
+        concurrency: int = 50,
+        queue_size: int = 10000,
+        ttl: int = 86400,
+        timeout: float = 10,
+        lookup_batch: int = 100,
+        prune_batch_size: int = 100,
+        prune_interval: float = 5,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        self.subscriptions = subscriptions
+        self.signer = signer
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.timeout = timeout
+        self.lookup_batch = lookup_batch
+        self.prune_batch_size = prune_batch_size
+        self.prune_interval = prune_interval
+        self.session = session
+        self._owns_session = session is None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._inflight = set()
+        self._gone: List[str] = []
+        self._prune_lock = asyncio.Lock()
+        self._prune_task: Optional[asyncio.Task] = None
+        self._tasks: List[asyncio.Task] = []
+        self.latencies = deque(maxlen=1000)
+        self.counts = defaultdict(int)
+
+    @property
+    def enabled(self) -> bool:
+        return self.signer is not None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, session: Optional[aiohttp.ClientSession] = None):
+        """Start sending; pass the application's shared session to reuse its connection pool"""
+        if not self.enabled or self.running:
+            return
+        if session is not None:
+            self.session, self._owns_session = session, False
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        self._tasks = [
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._prune_periodically()),
+        ]
+        logger.info(f"Push delivery worker started (concurrency {self.concurrency})")
+
+    async def stop(self, drain_timeout: float = 5):
+        """Send what is already queued (up to drain_timeout), then stop and prune"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Push queue not drained on shutdown: {self.queue.qsize()} jobs dropped")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._inflight:
+            await asyncio.wait(self._inflight, timeout=drain_timeout)
+        await self.flush_pruned()
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def submit(self, payloads: Dict[str, dict]) -> bool:
+        """Queue push payloads keyed by recipient user id without waiting; False if not accepted"""
+        if not payloads or not self.running:
+            return False
+        try:
+            self.queue.put_nowait(payloads)
+        except asyncio.QueueFull:
+            self.counts["dropped"] += len(payloads)
+            return False
+        self.counts["queued"] += len(payloads)
+        return True
+
+    async def _dispatch(self):
+        while True:
+            jobs = [await self.queue.get()]
+            # Coalesce whatever else is waiting into the same subscription lookup
+            while len(jobs) < self.lookup_batch and not self.queue.empty():
+                jobs.append(self.queue.get_nowait())
+            try:
+                await self._deliver(jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Push dispatch failed: {str(e)}")
+            finally:
+                for _ in jobs:
+                    self.queue.task_done()
+
+    async def _deliver(self, jobs: List[Dict[str, dict]]):
+        pending = defaultdict(list)
+        for job in jobs:
+            for user_id, payload in job.items():
+                pending[user_id].append(payload)
+
+        subscriptions = await self.subscriptions.find(
+            {"userId": {"$in": list(pending)}},
+            {"_id": 0, "id": 1, "userId": 1, "endpoint": 1, "p256dh": 1, "auth": 1}
+        ).to_list(None)
+
+        for subscription in subscriptions:
+            for payload in pending[subscription["userId"]]:
+                await self._slots.acquire()
+                task = asyncio.create_task(self._send(subscription, payload))
+                self._inflight.add(task)
+                task.add_done_callback(self._sent)
+
+    def _sent(self, task: asyncio.Task):
+        self._inflight.discard(task)
+        self._slots.release()
+
+    async def _send(self, subscription: dict, payload: dict):
+        endpoint = subscription.get("endpoint")
+        try:
+            body = encrypt_payload(
+                json.dumps(payload, default=str).encode("utf-8"),
+                subscription.get("p256dh") or "",
+                subscription.get("auth") or ""
+            )
+            headers = {
+                "Authorization": self.signer.authorization(endpoint),
+                "Content-Encoding": "aes128gcm",
+                "Content-Type": "application/octet-stream",
+                "TTL": str(self.ttl),
+            }
+        except (ValueError, TypeError) as e:
+            # Missing or malformed keys can never be delivered to
+            logger.warning(f"Invalid push subscription {subscription.get('id')}: {str(e)}")
+            self.counts["invalid"] += 1
+            self._mark_gone(subscription)
+            return
+        except Exception as e:
+            self.counts["failed"] += 1
+            logger.error(f"❌ Preparing push {subscription.get('id')} failed: {str(e)}")
+            return
+
+        started = time.perf_counter()
+        try:
+            async with self.session.post(
+                endpoint, data=body, headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
+                status = response.status
+                await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.counts["failed"] += 1
+            logger.warning(f"Push to {endpoint[:50]} failed: {type(e).__name__}")
+            return
+        except Exception as e:
+            # Anything else (e.g. a malformed endpoint URL) would otherwise vanish with the task
+            self.counts["failed"] += 1
+            logger.error(f"❌ Push to {str(endpoint)[:50]} failed: {type(e).__name__}: {str(e)}")
+            return
+        self.latencies.append(time.perf_counter() - started)
+
+        if status < 300:
+            self.counts["sent"] += 1
+        elif status in GONE_STATUSES:
+            self.counts["gone"] += 1
+            self._mark_gone(subscription)
+        else:
+            self.counts["failed"] += 1
+            logger.warning(f"Push service returned {status} for {endpoint[:50]}")
+
+    def _mark_gone(self, subscription: dict):
+        if subscription.get("id"):
+            self._gone.append(subscription["id"])
+        if len(self._gone) >= self.prune_batch_size and (self._prune_task is None or self._prune_task.done()):
+            self._prune_task = asyncio.create_task(self.flush_pruned())
+
+    async def flush_pruned(self) -> int:
+        """Delete subscriptions reported gone since the last flush in one query"""
+        async with self._prune_lock:
+            ids, self._gone = list(set(self._gone)), []
+            if not ids:
+                return 0
+            try:
+                result = await self.subscriptions.delete_many({"id": {"$in": ids}})
+            except Exception as e:
+                logger.error(f"Failed to prune push subscriptions: {str(e)}")
+                self._gone.extend(ids)
+                return 0
+            self.counts["pruned"] += result.deleted_count
+            logger.info(f"Pruned {result.deleted_count} expired push subscriptions")
+            return result.deleted_count
+
+    async def _prune_periodically(self):
+        while True:
+            await asyncio.sleep(self.prune_interval)
+            await self.flush_pruned()
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "queued": self.queue.qsize(),
+            "inFlight": len(self._inflight),
+            "concurrency": self.concurrency,
+            "counts": dict(self.counts),
+            "pendingPrune": len(self._gone),
+            "latencyP50Ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+            "latencyP95Ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
@@ -0,0 +1,303 @@
+"""
+Search-as-you-type completions for रामा (Raama) backend
+Writer names and usernames, popular tags and shayari titles are kept in one
+sorted list of (key, kind, ref) tuples. A prefix lookup is a binary search to
+the first key at or after the prefix followed by a short scan, so completions
+never touch MongoDB. Multi-word names and titles are also indexed from every
+word, so "baat" completes "Dil ki baat".
+
+Like the search engine, the list is built from Mongo at startup and rebuilt
+periodically (picking up other workers' writes), and is kept current between
+rebuilds by the write endpoints.
+"""
+
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import heapq
+import logging
+import re
+import time
+
+from search_engine import normalize
+
+logger = logging.getLogger(__name__)
+
+WRITER_ROLES = ("writer", "admin")
+SPACES_RE = re.compile(r"\s+")
+MAX_WORD_KEYS = 6  # word-start keys per title or name
+
+
+def completion_key(text: str) -> str:
+    return SPACES_RE.sub(" ", normalize(text)).strip()
+
+
+def word_keys(text: str) -> List[str]:
+    """The whole text plus the suffixes starting at each later word"""
+    key = completion_key(text)
+    if not key:
+        return []
+    words = key.split(" ")
+    return [" ".join(words[i:]) for i in range(min(len(words), MAX_WORD_KEYS))]
+
+
+class CompletionIndex:
+    """One generation of the sorted completion keys and the items they point to"""
+
+    def __init__(self):
+        self.entries: List[Tuple[str, str, str]] = []  # sorted (key, kind, ref)
+        self.items: Dict[Tuple[str, str], dict] = {}
+        self.item_keys: Dict[Tuple[str, str], List[str]] = {}
+        # Keys that are a whole name, username, title or tag rather than a later-word suffix
+        self.whole_keys: Dict[Tuple[str, str], frozenset] = {}
+        self.tag_counts: Counter = Counter()
+        self.author_counts: Counter = Counter()
+        self.shayaris: Dict[str, Tuple[str, Tuple[str, ...]]] = {}  # id -> (authorId, tags)
+
+    def _put(self, kind: str, ref: str, item: dict, texts: Iterable[str], sort: bool = True):
+        """Index an item under the word keys of each of its texts"""
+        self._drop(kind, ref)
+        key_lists = [word_keys(text or "") for text in texts]
+        keys = list(dict.fromkeys(key for key_list in key_lists for key in key_list))
+        self.items[(kind, ref)] = item
+        self.item_keys[(kind, ref)] = keys
+        self.whole_keys[(kind, ref)] = frozenset(key_list[0] for key_list in key_lists if key_list)
+        for key in keys:
+            if sort:
+                insort(self.entries, (key, kind, ref))
+            else:
+                self.entries.append((key, kind, ref))
+
+    def _drop(self, kind: str, ref: str):
+        keys = self.item_keys.pop((kind, ref), None)
+        if keys is None:
+            return
+        del self.items[(kind, ref)]
+        del self.whole_keys[(kind, ref)]
+        for key in keys:
+            position = bisect_left(self.entries, (key, kind, ref))
+            if position < len(self.entries) and self.entries[position] == (key, kind, ref):
+                del self.entries[position]
+
+    def set_writer(self, user: dict, sort: bool = True):
+        if user.get("role") not in WRITER_ROLES:
+            self._drop("writer", user["id"])
+            return
+        name = f"{user.get('firstName') or ''} {user.get('lastName') or ''}".strip()
+        self._put(
+            "writer", user["id"],
+            {"id": user["id"], "username": user.get("username"), "name": name},
+            [user.get("username"), name],
+            sort
+        )
+
+    def remove_writer(self, user_id: str):
+        self._drop("writer", user_id)
+
+    def add_shayari(self, shayari: dict, sort: bool = True):
+        """Index a shayari's title and count its tags; an indexed version is replaced"""
+        self.remove_shayari(shayari["id"], sort)
+        tags = tuple(dict.fromkeys(tag for tag in shayari.get("tags") or () if tag))
+        self.shayaris[shayari["id"]] = (shayari.get("authorId"), tags)
+        self.author_counts[shayari.get("authorId")] += 1
+        for tag in tags:
+            self._count_tag(tag, 1, sort)
+        self._put(
+            "title", shayari["id"],
+            {
+                "id": shayari["id"],
+                "title": shayari.get("title"),
+                "authorName": shayari.get("authorName"),
+                "score": (shayari.get("likes") or 0) + 2 * (shayari.get("shares") or 0),
+            },
+            [shayari.get("title")],
+            sort
+        )
+
+    def remove_shayari(self, shayari_id: str, sort: bool = True):
+        indexed = self.shayaris.pop(shayari_id, None)
+        if indexed is None:
+            return
+        author_id, tags = indexed
+        self.author_counts[author_id] -= 1
+        for tag in tags:
+            self._count_tag(tag, -1, sort)
+        self._drop("title", shayari_id)
+
+    def remove_author(self, author_id: str):
+        for shayari_id in [key for key, (author, _) in self.shayaris.items() if author == author_id]:
+            self.remove_shayari(shayari_id)
+        self.remove_writer(author_id)
+
+    def _count_tag(self, tag: str, delta: int, sort: bool):
+        self.tag_counts[tag] += delta
+        count = self.tag_counts[tag]
+        if count <= 0:
+            del self.tag_counts[tag]
+            self._drop("tag", tag)
+        elif ("tag", tag) in self.items:
+            self.items[("tag", tag)]["count"] = count
+        else:
+            self._put("tag", tag, {"tag": tag, "count": count}, [tag], sort)
+
+    def finish_build(self):
+        self.entries.sort()
+
+    def complete(self, prefix: str, limit: int, max_scan: int) -> dict:
+        """Ranked completions per kind: whole-text matches first, then by popularity"""
+        results = {"writers": [], "tags": [], "titles": []}
+        prefix = completion_key(prefix)
+        if not prefix:
+            return results
+        best: Dict[Tuple[str, str], tuple] = {}
+        entries = self.entries
+        position = bisect_left(entries, (prefix,))
+        end = min(len(entries), position + max_scan)
+        while position < end:
+            key, kind, ref = entries[position]
+            if not key.startswith(prefix):
+                break
+            position += 1
+            whole = key in self.whole_keys[(kind, ref)]
+            if whole or (kind, ref) not in best:
+                best[(kind, ref)] = (whole, self._score(kind, ref), -len(key))
+
+        grouped: Dict[str, list] = {"writer": [], "tag": [], "title": []}
+        for (kind, ref), rank in best.items():
+            grouped[kind].append((rank, ref))
+        for kind, field in (("writer", "writers"), ("tag", "tags"), ("title", "titles")):
+            for _, ref in heapq.nlargest(limit, grouped[kind]):
+                item = dict(self.items[(kind, ref)])
+                item.pop("score", None)
+                results[field].append(item)
+        return results
+
+    def _score(self, kind: str, ref: str) -> int:
+        if kind == "writer":
+            return self.author_counts.get(ref, 0)
+        if kind == "tag":
+            return self.tag_counts.get(ref, 0)
+        return self.items[(kind, ref)].get("score", 0)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "writers": sum(1 for kind, _ in self.items if kind == "writer"),
+            "tags": len(self.tag_counts),
+            "titles": len(self.shayaris),
+        }
+
+
+class Autocomplete:
+    """The live completion index plus rebuilds from Mongo; writes during a rebuild are replayed onto the new index"""
+
+    USER_PROJECTION = {"_id": 0, "id": 1, "username": 1, "firstName": 1, "lastName": 1, "role": 1}
+    SHAYARI_PROJECTION = {"_id": 0, "id": 1, "title": 1, "tags": 1, "authorId": 1, "authorName": 1, "likes": 1, "shares": 1}
+
+    def __init__(self, users, shayaris, rebuild_interval: float = 900, max_scan: int = 2000):
+        self.users = users
+        self.shayaris = shayaris
+        self.rebuild_interval = rebuild_interval
+        self.max_scan = max_scan
+        self.index = CompletionIndex()
+        self.ready = False
+        self.built_at: Optional[str] = None
+        self.build_seconds: Optional[float] = None
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+        self._journal: Optional[list] = None
+        self._rebuild_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def set_writer(self, user: dict):
+        self._apply("set_writer", user)
+
+    def remove_writer(self, user_id: str):
+        self._apply("remove_writer", user_id)
+
+    def add_shayari(self, shayari: dict):
+        self._apply("add_shayari", shayari)
+
+    def remove_shayari(self, shayari_id: str):
+        self._apply("remove_shayari", shayari_id)
+
+    def remove_author(self, author_id: str):
+        self._apply("remove_author", author_id)
+
+    def _apply(self, operation: str, *args):
+        getattr(self.index, operation)(*args)
+        if self._journal is not None:
+            self._journal.append((operation, args))
+
+    def complete(self, prefix: str, limit: int) -> dict:
+        started = time.perf_counter()
+        results = self.index.complete(prefix, limit, self.max_scan)
+        self.lookups += 1
+        self.lookup_seconds += time.perf_counter() - started
+        return results
+
+    async def rebuild(self) -> dict:
+        async with self._rebuild_lock:
+            started = time.perf_counter()
+            self._journal = []
+            try:
+                writers = await self.users.find({"role": {"$in": list(WRITER_ROLES)}}, self.USER_PROJECTION).to_list(None)
+                shayaris = await self.shayaris.find({}, self.SHAYARI_PROJECTION).to_list(None)
+                index = await asyncio.to_thread(self._build, writers, shayaris)
+                for operation, args in self._journal:
+                    getattr(index, operation)(*args)
+            finally:
+                self._journal = None
+            self.index = index
+            self.ready = True
+            self.build_seconds = round(time.perf_counter() - started, 3)
+            self.built_at = datetime.now(timezone.utc).isoformat()
+            logger.info(f"🔤 Autocomplete built: {len(index.entries)} keys in {self.build_seconds}s")
+            return self.stats()
+
+    @staticmethod
+    def _build(writers: List[dict], shayaris: List[dict]) -> CompletionIndex:
+        index = CompletionIndex()
+        for writer in writers:
+            index.set_writer(writer, sort=False)
+        for shayari in shayaris:
+            if shayari.get("id"):
+                index.add_shayari(shayari, sort=False)
+        index.finish_build()
+        return index
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.rebuild()
+                await asyncio.sleep(self.rebuild_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Autocomplete rebuild failed: {str(e)}")
+                await asyncio.sleep(min(60, self.rebuild_interval))
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "builtAt": self.built_at,
+            "buildSeconds": self.build_seconds,
+            "lookups": self.lookups,
+            "averageLookupMs": round(self.lookup_seconds / self.lookups * 1000, 3) if self.lookups else None,
+            **self.index.stats(),
+        }
@@ -0,0 +1,132 @@
+"""
+Search result cache for रामा (Raama) backend
+Popular searches repeat constantly, so /api/search/shayaris keeps the ranked
+shayari ids of recent searches, keyed by the normalized query, author, tags,
+sort and limit, for a short TTL. Hits are hydrated from a per-document cache,
+so a repeated search usually does no MongoDB work at all.
+
+Invalidation is deliberately coarse: creating, editing or deleting a shayari
+drops every cached result list (and the edited document), while engagement
+changes only drop the affected document so counts stay fresh. The cache is
+per process; other workers' writes show up once the TTL expires.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import time
+
+from search_autocomplete import completion_key
+
+SORT_OPTIONS = ("relevance", "date", "likes", "views")
+
+
+class TTLCache:
+    """Size-bounded LRU whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+class SearchResultCache:
+    """Result id lists per normalized search plus the shayari documents they point to"""
+
+    def __init__(self, ttl_seconds: float = 30, max_results: int = 2000, max_documents: int = 10000):
+        self.results = TTLCache(max_results, ttl_seconds)
+        self.documents = TTLCache(max_documents, ttl_seconds)
+        self.generation = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(q: str, author: str, tags: Iterable[str], sort_by: str, limit: int) -> tuple:
+        return (
+            completion_key(q),
+            completion_key(author),
+            tuple(sorted({completion_key(tag) for tag in tags if tag})),
+            sort_by if sort_by in SORT_OPTIONS else "relevance",
+            limit,
+        )
+
+    def get_ids(self, key: tuple) -> Optional[List[str]]:
+        return self.results.get(key)
+
+    def put_results(self, key: tuple, shayaris: List[dict], generation: int):
+        """Cache a search computed while `generation` was current; dropped if a write invalidated it since"""
+        if generation != self.generation:
+            return
+        self.results.put(key, [shayari["id"] for shayari in shayaris])
+        self.put_documents(shayaris)
+
+    def get_documents(self, ids: Iterable[str]) -> Dict[str, dict]:
+        """Cached documents by id (copies, safe for the caller to modify)"""
+        found = {}
+        for shayari_id in ids:
+            document = self.documents.get(shayari_id)
+            if document is not None:
+                found[shayari_id] = dict(document)
+        return found
+
+    def put_documents(self, shayaris: Iterable[dict]):
+        for shayari in shayaris:
+            self.documents.put(shayari["id"], dict(shayari))
+
+    def forget(self, shayari_id: str):
+        """A document's counters changed: drop it, keep the result lists"""
+        self.documents.pop(shayari_id)
+
+    def invalidate(self, shayari_id: Optional[str] = None):
+        """Shayaris were added, edited or removed: drop every result list (and the document, if given)"""
+        self.generation += 1
+        self.invalidations += 1
+        self.results.clear()
+        if shayari_id is None:
+            self.documents.clear()
+        else:
+            self.documents.pop(shayari_id)
+
+    def stats(self) -> dict:
+        return {
+            "results": self.results.stats(),
+            "documents": self.documents.stats(),
+            "invalidations": self.invalidations,
+        }
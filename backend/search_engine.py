@@ -0,0 +1,478 @@
+"""
+In-process shayari search engine for रामा (Raama) backend
+MongoDB text search splits Devanagari words apart at their vowel signs and
+knows nothing about Urdu spelling variants, so the backend keeps its own
+inverted index over the searchable fields of every shayari:
+
+- Tokens are runs of letters, digits and combining marks (so matras and
+  harakat stay inside words), normalized with NFKC and casefolding. Nukta and
+  chandrabindu are folded, Arabic/Persian letter variants and diacritics are
+  unified for Urdu, and Hinglish letter stretching ("pyaaaar") is collapsed.
+- Postings are delta-encoded document numbers and term frequencies packed as
+  varints in one bytearray per term, appended to on every write. The postings
+  of frequently queried terms are also kept decoded in a bounded LRU.
+- Roman and Devanagari words are also indexed under their phonetic key
+  (transliteration.phonetic_key), so "baatein" matches "बातें".
+- Documents are ranked with BM25 over field-weighted term frequencies, then
+  boosted by engagement like the Mongo text search.
+
+The index is built from Mongo at startup and rebuilt periodically (which also
+drops deleted documents and picks up writes made by other workers); in between
+it is updated in place from the write endpoints.
+"""
+
+from array import array
+from datetime import datetime, timezone
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import asyncio
+import heapq
+import logging
+import math
+import re
+import time
+import unicodedata
+
+from transliteration import KEY_WORD_RE, phonetic_key
+
+logger = logging.getLogger(__name__)
+
+FIELD_WEIGHTS = {"title": 3, "authorName": 2, "authorUsername": 2, "tags": 2, "content": 1}
+K1 = 1.2
+B = 0.75
+
+# Combining marks (Devanagari matras, Arabic harakat, ...) are part of words
+_MARKS = "".join(
+    re.escape(chr(code)) for code in range(0x300, 0x10000) if unicodedata.category(chr(code)).startswith("M")
+)
+TOKEN_RE = re.compile(f"(?:[^\\W_]|[{_MARKS}])+")
+STRETCHED_RE = re.compile(r"(.)\1{2,}")
+
+CHAR_FOLDS = str.maketrans({
+    "‌": None,  # zero-width non-joiner
+    "‍": None,  # zero-width joiner
+    "़": None,  # Devanagari nukta: ज़ -> ज
+    "ँ": "ं",  # chandrabindu -> anusvara
+    "ي": "ی",  # Arabic yeh -> Farsi/Urdu yeh
+    "ى": "ی",  # alef maksura -> yeh
+    "ك": "ک",  # Arabic kaf -> keheh
+    "ه": "ہ",  # heh -> heh goal
+    "آ": "ا",  # alef madda -> alef
+    "أ": "ا",
+    "إ": "ا",
+    **{chr(code): None for code in range(0x064b, 0x0653)},  # harakat
+    "ٰ": None,  # superscript alef
+})
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold().translate(CHAR_FOLDS)
+    # Strip Latin accents only; Indic and Arabic marks carry meaning
+    decomposed = unicodedata.normalize("NFD", text)
+    text = unicodedata.normalize("NFC", "".join(ch for ch in decomposed if not "̀" <= ch <= "ͯ"))
+    return STRETCHED_RE.sub(r"\1\1", text)
+
+
+def name_key(text: str) -> str:
+    """Normalized, single-spaced name; the same key search_autocomplete.completion_key builds"""
+    return " ".join(normalize(text).split()) if text else ""
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(normalize(text)) if text else []
+
+
+def terms(text: str) -> List[str]:
+    """Tokens followed by their phonetic keys ("~"-prefixed so they never collide with a token)"""
+    tokens = tokenize(text)
+    for token in tokens[:]:
+        if KEY_WORD_RE.fullmatch(token):
+            key = phonetic_key(token)
+            if key:
+                tokens.append("~" + key)
+    return tokens
+
+
+def _write_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(data) -> List[int]:
+    values = []
+    append = values.append
+    value = shift = 0
+    for byte in data:
+        if byte < 0x80:
+            append(value | (byte << shift))
+            value = shift = 0
+        else:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+    return values
+
+
+class PostingList:
+    """Delta-encoded (document number, weighted term frequency) pairs, appended in document order"""
+
+    __slots__ = ("data", "last_doc", "count")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.last_doc = 0
+        self.count = 0
+
+    def append(self, doc: int, frequency: int):
+        # Document numbers only grow, so deltas are non-negative
+        _write_varint(doc - self.last_doc, self.data)
+        _write_varint(frequency, self.data)
+        self.last_doc = doc
+        self.count += 1
+
+
+class DecodedPostings:
+    """Decoded copy of a hot postings list; appends are decoded incrementally from `offset`"""
+
+    __slots__ = ("docs", "frequencies", "offset")
+
+    def __init__(self):
+        self.docs = array("I")
+        self.frequencies = array("I")
+        self.offset = 0
+
+    def catch_up(self, postings: PostingList):
+        if self.offset == len(postings.data):
+            return
+        values = _read_varints(memoryview(postings.data)[self.offset:])
+        doc = self.docs[-1] if self.docs else 0
+        for delta in values[0::2]:
+            doc += delta
+            self.docs.append(doc)
+        self.frequencies.extend(values[1::2])
+        self.offset = len(postings.data)
+
+
+class InvertedIndex:
+    """Postings, document lengths and ranking attributes for one generation of the index"""
+
+    META_FIELDS = ("authorId", "authorName", "authorUsername", "tags", "createdAt", "likes", "views", "shares")
+    COUNTER_FIELDS = ("likes", "views", "shares")
+
+    def __init__(self, engagement_weight: float = 0.25, decoded_budget: int = 2_000_000):
+        self.postings: Dict[str, PostingList] = {}
+        self.keys: List[Optional[str]] = [None]  # document number -> shayari id; 0 is unused
+        self.numbers: Dict[str, int] = {}
+        self.lengths = array("I", [0])
+        self.meta: List[Optional[dict]] = [None]
+        self.total_length = 0
+        # Relevance multiplier from likes/shares/views per document; 0 for deleted documents
+        self.engagement_weight = engagement_weight
+        self.boosts = array("d", [0.0])
+        # BM25 length normalization per document, against the average length when the index was built
+        self.average_length = 0.0
+        self.norms = array("d", [0.0])
+        # Query terms' postings stay decoded (LRU, bounded by total postings) so hot terms skip varint decoding
+        self.decoded_budget = decoded_budget
+        self.decoded: "OrderedDict[str, DecodedPostings]" = OrderedDict()
+        self.decoded_postings = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.numbers)
+
+    def add(self, shayari: dict):
+        """Index a shayari; an already indexed version is replaced"""
+        self.remove(shayari["id"])
+        frequencies: Dict[str, int] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = shayari.get(field)
+            if isinstance(value, list):
+                value = " ".join(str(item) for item in value)
+            for token in terms(value or ""):
+                frequencies[token] = frequencies.get(token, 0) + weight
+
+        doc = len(self.keys)
+        self.keys.append(shayari["id"])
+        self.numbers[shayari["id"]] = doc
+        length = sum(frequencies.values())
+        self.lengths.append(length)
+        self.norms.append(self._norm(length))
+        self.total_length += length
+        meta = {field: shayari.get(field) for field in self.META_FIELDS}
+        # Leading space so a word-start match is a substring test for " " + prefix
+        meta["authorNameKeys"] = tuple(
+            " " + name_key(meta.get(field) or "") for field in ("authorName", "authorUsername")
+        )
+        self.meta.append(meta)
+        self.boosts.append(self._boost(meta))
+        for token, frequency in frequencies.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = PostingList()
+            postings.append(doc, frequency)
+
+    def _boost(self, meta: dict) -> float:
+        engagement = 1 + (meta.get("likes") or 0) + 2 * (meta.get("shares") or 0) + 0.1 * (meta.get("views") or 0)
+        return 1 + self.engagement_weight * math.log10(engagement)
+
+    def _norm(self, length: int) -> float:
+        return K1 * (1 - B + B * length / (self.average_length or length or 1))
+
+    def finish_build(self):
+        """Fix the average document length after a bulk build and recompute every norm against it"""
+        self.average_length = self.total_length / self.size if self.size else 0.0
+        self.norms = array("d", (self._norm(length) for length in self.lengths))
+
+    def _decoded(self, token: str, postings: PostingList) -> DecodedPostings:
+        decoded = self.decoded.get(token)
+        if decoded is None:
+            decoded = self.decoded[token] = DecodedPostings()
+        else:
+            self.decoded.move_to_end(token)
+        before = len(decoded.docs)
+        decoded.catch_up(postings)
+        self.decoded_postings += len(decoded.docs) - before
+        while self.decoded_postings > self.decoded_budget and len(self.decoded) > 1:
+            _, evicted = self.decoded.popitem(last=False)
+            self.decoded_postings -= len(evicted.docs)
+        return decoded
+
+    def remove(self, shayari_id: str) -> bool:
+        """Tombstone a document; its postings are dropped at the next rebuild"""
+        doc = self.numbers.pop(shayari_id, None)
+        if doc is None:
+            return False
+        self.keys[doc] = None
+        self.meta[doc] = None
+        self.boosts[doc] = 0.0
+        self.total_length -= self.lengths[doc]
+        return True
+
+    def remove_author(self, author_id: str) -> int:
+        shayari_ids = [key for key, doc in self.numbers.items() if self.meta[doc]["authorId"] == author_id]
+        for shayari_id in shayari_ids:
+            self.remove(shayari_id)
+        return len(shayari_ids)
+
+    def adjust(self, shayari_id: str, field: str, delta: int):
+        """Keep engagement counters used for ranking in step with likes, views and shares"""
+        doc = self.numbers.get(shayari_id)
+        if doc is not None:
+            meta = self.meta[doc]
+            meta[field] = max(0, (meta.get(field) or 0) + delta)
+            self.boosts[doc] = self._boost(meta)
+
+    def set_counters(self, shayari_id: str, counters: dict):
+        """Overwrite the engagement counters with values read from Mongo"""
+        doc = self.numbers.get(shayari_id)
+        if doc is not None:
+            meta = self.meta[doc]
+            for field in self.COUNTER_FIELDS:
+                meta[field] = counters.get(field) or 0
+            self.boosts[doc] = self._boost(meta)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        author: str = "",
+        tags: Optional[List[str]] = None,
+        sort_by: str = "relevance",
+    ) -> List[str]:
+        """Shayari ids matching any query term, best first"""
+        if not self.numbers:
+            return []
+        scores: Dict[int, float] = {}
+        get_score = scores.get
+        norms = self.norms
+        live = len(self.numbers)
+        for token in set(terms(query)):
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            # df counts tombstoned postings too until the next rebuild
+            idf = math.log(1 + (max(live - postings.count, 0) + 0.5) / (postings.count + 0.5))
+            decoded = self._decoded(token, postings)
+            for doc, frequency in zip(decoded.docs, decoded.frequencies):
+                scores[doc] = get_score(doc, 0.0) + idf * frequency * (K1 + 1) / (frequency + norms[doc])
+
+        keys = self.keys
+        meta = self.meta
+        if author or tags or sort_by in ("date", "likes", "views"):
+            author = " " + name_key(author) if name_key(author) else ""
+            wanted_tags = set(tags) if tags else None
+            candidates = [
+                doc for doc in scores
+                if keys[doc] is not None and self._matches(meta[doc], author, wanted_tags)
+            ]
+        else:
+            # Deleted documents have a zero boost, so they can only fill up a short result list
+            candidates = scores
+
+        if sort_by == "date":
+            ranked = heapq.nlargest(limit, candidates, key=lambda doc: str(meta[doc].get("createdAt") or ""))
+        elif sort_by in ("likes", "views"):
+            ranked = heapq.nlargest(limit, candidates, key=lambda doc: meta[doc].get(sort_by) or 0)
+        else:
+            boosts = self.boosts
+            ranked = heapq.nlargest(limit, candidates, key=lambda doc: scores[doc] * boosts[doc])
+        return [keys[doc] for doc in ranked if keys[doc] is not None]
+
+    @staticmethod
+    def _matches(meta: dict, author: str, wanted_tags: Optional[set]) -> bool:
+        # Word prefix of the name or username, like the authorKeys filter in search_queries
+        if author and not any(author in key for key in meta["authorNameKeys"]):
+            return False
+        return not wanted_tags or bool(wanted_tags.intersection(meta.get("tags") or ()))
+
+    def stats(self) -> dict:
+        return {
+            "documents": self.size,
+            "tombstones": len(self.keys) - 1 - self.size,
+            "terms": len(self.postings),
+            "postingsBytes": sum(len(postings.data) for postings in self.postings.values()),
+            "decodedTerms": len(self.decoded),
+            "decodedPostings": self.decoded_postings,
+        }
+
+
+class SearchEngine:
+    """The live index plus rebuilds from Mongo; writes during a rebuild are caught up on the new index"""
+
+    PROJECTION = {"_id": 0, "id": 1, **{field: 1 for field in FIELD_WEIGHTS}, **{f: 1 for f in InvertedIndex.META_FIELDS}}
+    BUILD_BATCH_SIZE = 1000
+    # Counter re-reads after a scan before writes still racing with them are left to the next rebuild
+    REFRESH_ROUNDS = 3
+
+    def __init__(self, collection, engagement_weight: float = 0.25, rebuild_interval: float = 900):
+        self.collection = collection
+        self.engagement_weight = engagement_weight
+        self.rebuild_interval = rebuild_interval
+        self.index = InvertedIndex(engagement_weight)
+        self.ready = False
+        self.built_at: Optional[str] = None
+        self.build_seconds: Optional[float] = None
+        self.searches = 0
+        self.search_seconds = 0.0
+        self._journal: Optional[list] = None
+        self._rebuild_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, shayari: dict):
+        self._apply("add", shayari)
+
+    def remove(self, shayari_id: str):
+        self._apply("remove", shayari_id)
+
+    def remove_author(self, author_id: str):
+        self._apply("remove_author", author_id)
+
+    def adjust(self, shayari_id: str, field: str, delta: int):
+        self._apply("adjust", shayari_id, field, delta)
+
+    def _apply(self, operation: str, *args):
+        getattr(self.index, operation)(*args)
+        if self._journal is not None:
+            self._journal.append((operation, args))
+
+    def search(self, query: str, limit: int, author: str = "", tags: Optional[List[str]] = None,
+               sort_by: str = "relevance") -> List[str]:
+        started = time.perf_counter()
+        ids = self.index.search(query, limit, author, tags, sort_by)
+        self.searches += 1
+        self.search_seconds += time.perf_counter() - started
+        return ids
+
+    async def rebuild(self) -> dict:
+        """Build a fresh index from Mongo off the event loop and swap it in"""
+        async with self._rebuild_lock:
+            started = time.perf_counter()
+            self._journal = []
+            try:
+                # Stream the collection in batches; each batch is indexed off the event loop
+                index = InvertedIndex(self.engagement_weight)
+                batch = []
+                async for shayari in self.collection.find({}, self.PROJECTION).batch_size(self.BUILD_BATCH_SIZE):
+                    batch.append(shayari)
+                    if len(batch) >= self.BUILD_BATCH_SIZE:
+                        await asyncio.to_thread(self._index_batch, index, batch)
+                        batch = []
+                await asyncio.to_thread(self._index_batch, index, batch)
+                await asyncio.to_thread(index.finish_build)
+                await self._catch_up(index)
+            finally:
+                self._journal = None
+            self.index = index
+            self.ready = True
+            self.build_seconds = round(time.perf_counter() - started, 3)
+            self.built_at = datetime.now(timezone.utc).isoformat()
+            logger.info(f"🔎 Search index built: {index.size} shayaris, {len(index.postings)} terms in {self.build_seconds}s")
+            return self.stats()
+
+    async def _catch_up(self, index: InvertedIndex):
+        """Apply writes that raced with the scan to the new index
+
+        Adds and removals are replayed. Counter changes are not: the scan may
+        already have read them, so the counters of adjusted shayaris are read
+        again instead, repeating while new changes arrive during the read.
+        """
+        replayed = 0
+        for round_number in range(self.REFRESH_ROUNDS + 1):
+            entries = self._journal[replayed:]
+            replayed += len(entries)
+            adjusted = set()
+            for operation, args in entries:
+                if operation == "adjust":
+                    adjusted.add(args[0])
+                else:
+                    getattr(index, operation)(*args)
+            if not adjusted or round_number == self.REFRESH_ROUNDS:
+                return
+            adjusted = list(adjusted)
+            projection = {"_id": 0, "id": 1, **{field: 1 for field in index.COUNTER_FIELDS}}
+            for start in range(0, len(adjusted), self.BUILD_BATCH_SIZE):
+                batch = adjusted[start:start + self.BUILD_BATCH_SIZE]
+                async for row in self.collection.find({"id": {"$in": batch}}, projection):
+                    index.set_counters(row["id"], row)
+
+    @staticmethod
+    def _index_batch(index: InvertedIndex, shayaris: List[dict]):
+        for shayari in shayaris:
+            if shayari.get("id"):
+                index.add(shayari)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.rebuild()
+                await asyncio.sleep(self.rebuild_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Search index rebuild failed: {str(e)}")
+                await asyncio.sleep(min(60, self.rebuild_interval))
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "builtAt": self.built_at,
+            "buildSeconds": self.build_seconds,
+            "searches": self.searches,
+            "averageSearchMs": round(self.search_seconds / self.searches * 1000, 3) if self.searches else None,
+            **self.index.stats(),
+        }
@@ -0,0 +1,167 @@
+"""
+Search history for रामा (Raama) backend
+Each user has one `user_search_history` document holding their most recent
+searches, newest first, at most one entry per normalized query and capped
+with $push/$slice. Reading history or recent searches is a single-document
+lookup.
+
+Searches are recorded off the request path: the search endpoint queues them
+and a background worker writes batches - the search activity rows, the
+history lists (one $pull + $push pair per user in the batch) and the
+popular-search counters (backend/search_stats.py).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import asyncio
+import logging
+
+from pymongo import InsertOne, UpdateOne
+
+from search_autocomplete import completion_key
+
+logger = logging.getLogger(__name__)
+
+
+class SearchHistoryRecorder:
+    """Queue-fed writer for search activity, per-user recent searches and popular-search counters"""
+
+    def __init__(
+        self,
+        history,
+        activities,
+        query_stats=None,
+        max_entries: int = 50,
+        queue_size: int = 10000,
+        batch_size: int = 200,
+    ):
+        self.history = history
+        self.activities = activities
+        self.query_stats = query_stats
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self.counts = defaultdict(int)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch())
+
+    async def stop(self, drain_timeout: float = 5):
+        """Write what is already queued (up to drain_timeout), then stop"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Search history queue not drained on shutdown: {self.queue.qsize()} searches dropped")
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def submit(self, activity: dict, user_id: str, query: str, filters: dict, results_count: int) -> bool:
+        """Queue one search without waiting; False if the queue is full or the worker is not running"""
+        if not self.running:
+            return False
+        entry = None
+        key = completion_key(query)
+        if key:
+            entry = {
+                "query": " ".join(query.split()),
+                "key": key,
+                "filters": filters,
+                "resultsCount": results_count,
+                "createdAt": datetime.now(timezone.utc).isoformat(),
+            }
+        try:
+            self.queue.put_nowait((activity, user_id, entry))
+        except asyncio.QueueFull:
+            self.counts["dropped"] += 1
+            return False
+        self.counts["queued"] += 1
+        return True
+
+    async def _dispatch(self):
+        while True:
+            searches = [await self.queue.get()]
+            # Coalesce whatever else is waiting into the same bulk writes
+            while len(searches) < self.batch_size and not self.queue.empty():
+                searches.append(self.queue.get_nowait())
+            try:
+                await self._write(searches)
+                self.counts["written"] += len(searches)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counts["failed"] += len(searches)
+                logger.error(f"❌ Search history write failed: {str(e)}")
+            finally:
+                for _ in searches:
+                    self.queue.task_done()
+
+    async def _write(self, searches: List[tuple]):
+        activities = [InsertOne(activity) for activity, _, _ in searches if activity]
+        if activities:
+            await self.activities.bulk_write(activities, ordered=False)
+
+        # Newest entry per (user, normalized query)
+        latest: Dict[str, Dict[str, dict]] = defaultdict(dict)
+        for _, user_id, entry in searches:
+            if entry:
+                latest[user_id].pop(entry["key"], None)
+                latest[user_id][entry["key"]] = entry
+        if latest:
+            now = datetime.now(timezone.utc)
+            operations = []
+            for user_id, entries in latest.items():
+                # $pull and $push cannot touch the same array in one update; ordered keeps them in sequence
+                operations.append(UpdateOne(
+                    {"userId": user_id},
+                    {"$pull": {"entries": {"key": {"$in": list(entries)}}}}
+                ))
+                operations.append(UpdateOne(
+                    {"userId": user_id},
+                    {
+                        "$push": {"entries": {
+                            "$each": list(reversed(entries.values())),
+                            "$position": 0,
+                            "$slice": self.max_entries,
+                        }},
+                        "$set": {"updatedAt": now},
+                    },
+                    upsert=True
+                ))
+            await self.history.bulk_write(operations, ordered=True)
+
+        if self.query_stats is not None:
+            for _, _, entry in searches:
+                if entry:
+                    await self.query_stats.record(entry["query"])
+
+    async def recent(self, user_id: str, limit: Optional[int] = None) -> List[dict]:
+        """The user's searches, newest first"""
+        projection = {"_id": 0, "entries": 1}
+        if limit is not None:
+            projection["entries"] = {"$slice": limit}
+        document = await self.history.find_one({"userId": user_id}, projection)
+        entries = (document or {}).get("entries") or []
+        for entry in entries:
+            entry.pop("key", None)
+        return entries
+
+    async def clear(self, user_id: str):
+        await self.history.delete_one({"userId": user_id})
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self.queue.qsize(),
+            "maxEntries": self.max_entries,
+            "counts": dict(self.counts),
+        }
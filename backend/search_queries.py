@@ -0,0 +1,117 @@
+"""
+Shayari search queries for रामा (Raama) backend
+Query shapes shared by the search endpoints and scripts/benchmark_search.py.
+Text queries use the weighted text index created by scripts/create_indexes.py
+and rank by text score blended with log-scaled engagement; the regex query is
+the unindexed fallback for databases without that index. Phonetic queries match
+the searchKeys stored on every shayari (see transliteration.search_keys), so a
+Hinglish spelling finds Devanagari text and vice versa.
+
+User input never reaches a regex unescaped. Writer and author filters are
+compiled to anchored prefix matches on nameKeys/authorKeys, the normalized
+word-start keys stored on users and shayaris, so they are index range scans;
+filters are always combined with $and so no clause can replace another.
+scripts/explain_search_queries.py checks the plan of every shape.
+"""
+
+from typing import Iterable, List, Optional
+import re
+
+from search_autocomplete import WRITER_ROLES, completion_key, word_keys
+
+# Internal fields that never leave the search endpoints
+SEARCH_PROJECTION = {"_id": 0, "searchKeys": 0, "authorKeys": 0}
+MAX_TERM_LENGTH = 100
+
+
+def name_keys(*names: Optional[str]) -> List[str]:
+    """Normalized keys starting at every word of the names (stored as nameKeys/authorKeys)"""
+    keys = set()
+    for name in names:
+        keys.update(word_keys(name or ""))
+    return sorted(keys)
+
+
+def user_name_keys(user: dict) -> List[str]:
+    return name_keys(user.get("username"), f"{user.get('firstName') or ''} {user.get('lastName') or ''}")
+
+
+def prefix_match(field: str, text: str) -> Optional[dict]:
+    """Escaped, anchored prefix regex on a normalized key field - a bounded index scan; None for blank input"""
+    key = completion_key(text)[:MAX_TERM_LENGTH]
+    if not key:
+        return None
+    return {field: {"$regex": "^" + re.escape(key)}}
+
+
+def and_query(*clauses: Optional[dict]) -> dict:
+    """Combine filter clauses with $and, skipping empty ones"""
+    clauses = [clause for clause in clauses if clause]
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def shayari_filters(author: str = "", tags: Iterable[str] = ()) -> dict:
+    """Author (word prefix of the name or username) and any-of-tags filters"""
+    tags = [tag for tag in tags if tag]
+    return and_query(
+        prefix_match("authorKeys", author),
+        {"tags": {"$in": tags}} if tags else None
+    )
+
+
+def writer_query(term: str) -> Optional[dict]:
+    """Writers whose username or name has a word starting with `term`"""
+    match = prefix_match("nameKeys", term)
+    return and_query(match, {"role": {"$in": list(WRITER_ROLES)}}) if match else None
+
+
+def sort_order(sort_by: str) -> list:
+    """find() sort for date/likes/views; anything else ranks by engagement"""
+    return {
+        "date": [("createdAt", -1)], "likes": [("likes", -1)], "views": [("views", -1)]
+    }.get(sort_by, [("likes", -1), ("views", -1), ("createdAt", -1)])
+
+
+def regex_shayari_query(term: str) -> dict:
+    """Unindexed fallback used when the text index has not been created yet"""
+    pattern = re.escape(term.strip()[:MAX_TERM_LENGTH])
+    clauses = [
+        {"title": {"$regex": pattern, "$options": "i"}},
+        {"content": {"$regex": pattern, "$options": "i"}}
+    ]
+    author = prefix_match("authorKeys", term)
+    if author:
+        clauses.append(author)
+    return {"$or": clauses}
+
+
+def phonetic_shayari_query(keys: List[str]) -> dict:
+    """Every query word's phonetic key, answered from the multikey searchKeys index"""
+    return {"searchKeys": {"$all": keys}}
+
+
+def text_search_pipeline(q: str, filters: dict, sort_by: str, limit: int, engagement_weight: float = 0.25) -> list:
+    """$text match ranked by textScore blended with engagement (or by date/likes/views)"""
+    pipeline = [{"$match": {"$text": {"$search": q}, **filters}}]
+    if sort_by == "date":
+        pipeline.append({"$sort": {"createdAt": -1}})
+    elif sort_by in ("likes", "views"):
+        pipeline.append({"$sort": {sort_by: -1}})
+    else:
+        engagement = {"$add": [
+            1,
+            {"$ifNull": ["$likes", 0]},
+            {"$multiply": [2, {"$ifNull": ["$shares", 0]}]},
+            {"$multiply": [0.1, {"$ifNull": ["$views", 0]}]}
+        ]}
+        pipeline += [
+            {"$addFields": {"relevance": {"$multiply": [
+                {"$meta": "textScore"},
+                {"$add": [1, {"$multiply": [engagement_weight, {"$log10": engagement}]}]}
+            ]}}},
+            {"$sort": {"relevance": -1, "createdAt": -1}}
+        ]
+    pipeline += [{"$limit": limit}, {"$project": {**SEARCH_PROJECTION, "relevance": 0}}]
+    return pipeline
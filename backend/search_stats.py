@@ -0,0 +1,121 @@
+"""
+Popular search counters for रामा (Raama) backend
+Every recorded search increments one document per normalized query in
+`search_query_stats`: a total, a per-day bucket and a decayed popularity
+score. "Popular searches" is then a top-N read on the score index instead of
+a $group over the whole search history.
+
+The score uses forward decay: a search at time t adds 2^(t / half_life), so
+comparing stored scores at any moment is the same as comparing exponentially
+decayed counts, and nothing has to be rewritten as time passes. To keep the
+weights inside float range, time is split into generations of
+GENERATION_HALF_LIVES half-lives; weights restart at 1 in each generation, and
+a query's score is rescaled into the current generation the first time it is
+searched there.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+import logging
+
+from pymongo.errors import DuplicateKeyError
+
+from search_autocomplete import completion_key
+
+logger = logging.getLogger(__name__)
+
+DECAY_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+GENERATION_HALF_LIVES = 64
+MAX_QUERY_LENGTH = 100
+
+
+class SearchQueryStats:
+    """Time-bucketed, decayed counters per normalized search query"""
+
+    def __init__(self, collection, half_life_hours: float = 72, window_days: int = 7):
+        self.collection = collection
+        self.half_life_seconds = half_life_hours * 3600
+        self.window_days = window_days
+
+    def _clock(self, now: datetime) -> Tuple[int, float]:
+        """(generation, weight of a search made now within that generation)"""
+        half_lives = (now - DECAY_EPOCH).total_seconds() / self.half_life_seconds
+        generation = int(half_lives // GENERATION_HALF_LIVES)
+        return generation, 2.0 ** (half_lives - generation * GENERATION_HALF_LIVES)
+
+    async def record(self, query: str, now: Optional[datetime] = None):
+        """Count one search for `query`"""
+        key = completion_key(query)[:MAX_QUERY_LENGTH]
+        if not key:
+            return
+        now = now or datetime.now(timezone.utc)
+        generation, weight = self._clock(now)
+        day = now.strftime("%Y-%m-%d")
+        seen = {"query": " ".join(query.split())[:MAX_QUERY_LENGTH], "lastSearchedAt": now}
+
+        result = await self.collection.update_one(
+            {"key": key, "generation": generation},
+            {"$inc": {"score": weight, "count": 1, f"daily.{day}": 1}, "$set": seen}
+        )
+        if result.matched_count:
+            return
+
+        # First search of this query in the current generation (or ever)
+        for _ in range(3):
+            existing = await self.collection.find_one(
+                {"key": key}, {"_id": 0, "generation": 1, "score": 1, "daily": 1}
+            )
+            if existing is None:
+                try:
+                    await self.collection.insert_one({
+                        "key": key, **seen, "generation": generation, "score": weight,
+                        "count": 1, "daily": {day: 1}, "createdAt": now,
+                    })
+                    return
+                except DuplicateKeyError:
+                    continue
+            if existing["generation"] == generation:
+                await self.collection.update_one(
+                    {"key": key},
+                    {"$inc": {"score": weight, "count": 1, f"daily.{day}": 1}, "$set": seen}
+                )
+                return
+            carried = existing.get("score", 0.0) * 2.0 ** (
+                -GENERATION_HALF_LIVES * (generation - existing["generation"])
+            )
+            # Drop day buckets that left the window while we are rewriting the document anyway
+            cutoff = (now - timedelta(days=self.window_days)).strftime("%Y-%m-%d")
+            daily = {d: n for d, n in (existing.get("daily") or {}).items() if d >= cutoff}
+            daily[day] = daily.get(day, 0) + 1
+            result = await self.collection.update_one(
+                {"key": key, "generation": existing["generation"]},
+                {"$set": {**seen, "generation": generation, "score": carried + weight, "daily": daily},
+                 "$inc": {"count": 1}}
+            )
+            if result.matched_count:
+                return
+        logger.warning(f"⚠️ Search stats for '{key}' not recorded after repeated conflicts")
+
+    async def popular(self, limit: int = 10, now: Optional[datetime] = None) -> List[dict]:
+        """Most searched queries over the window, most popular first"""
+        now = now or datetime.now(timezone.utc)
+        generation, _ = self._clock(now)
+        cutoff = now - timedelta(days=self.window_days)
+        ranked = []
+        # Queries not searched since the generation changed still hold scores in the previous one
+        for gen, scale in ((generation, 1.0), (generation - 1, 2.0 ** -GENERATION_HALF_LIVES)):
+            rows = await self.collection.find(
+                {"generation": gen, "lastSearchedAt": {"$gte": cutoff}},
+                {"_id": 0, "query": 1, "score": 1, "daily": 1}
+            ).sort("score", -1).limit(limit).to_list(limit)
+            ranked += [(row["score"] * scale, row) for row in rows]
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        first_day = cutoff.strftime("%Y-%m-%d")
+        return [
+            {
+                "query": row["query"],
+                "searches": sum(n for d, n in (row.get("daily") or {}).items() if d >= first_day),
+            }
+            for _, row in ranked[:limit]
+        ]
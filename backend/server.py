@@ -14,11 +14,40 @@ from datetime import datetime, timezone, timedelta, timedelta
 from passlib.context import CryptContext
 import jwt
 import aiohttp
+from pymongo.errors import OperationFailure
 import json
+import re
 import secrets
 import random
 import asyncio
+import base64
+import socket
+import threading
 from contextlib import asynccontextmanager
+from transliteration import transliterate, phonetic_keys, search_keys
+from search_queries import (
+    MAX_TERM_LENGTH, SEARCH_PROJECTION, and_query, name_keys, phonetic_shayari_query, regex_shayari_query,
+    shayari_filters, sort_order, text_search_pipeline, user_name_keys, writer_query
+)
+from search_engine import SearchEngine
+from search_autocomplete import Autocomplete
+from search_cache import SearchResultCache
+from search_stats import SearchQueryStats
+from search_history import SearchHistoryRecorder
+from tag_stats import TagStats
+from notification_fanout import FanoutJob, FanoutTracker, fan_out, field_values
+from notification_broker import NotificationBroker
+from notification_watcher import NotificationChangeWatcher
+from notification_counters import UnreadCounters, is_unread
+from notification_groups import (
+    ensure_indexes as ensure_notification_group_indexes, present as present_notification, upsert_grouped
+)
+from push_delivery import PushDeliveryWorker, VapidSigner
+from http_client import SharedHTTPClient
+from email_outbox import EmailDeliveryError, EmailOutbox
+from ai_providers import (
+    AllProvidersFailed, ProviderRouter, GeminiProvider, OpenAIProvider, StubProvider, RuleBasedProvider
+)
 
 # Configure logging first
 logging.basicConfig(
@@ -27,36 +56,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Try to import OpenAI client
-try:
-    from openai import AsyncOpenAI
-except ImportError:
-    logger.warning("OpenAI package not installed. Translation features will be limited.")
-    AsyncOpenAI = None
-
-# Try to import Gemini AI client with multiple fallback attempts
-try:
-    import google.generativeai as genai
-    logger.info("Google Generative AI package imported successfully")
-except ImportError as e:
-    try:
-        # Try alternative import path
-        from google import generativeai as genai
-        logger.info("Google Generative AI package imported via alternative path")
-    except ImportError:
-        try:
-            # Try installing and importing
-            import subprocess
-            import sys
-            logger.info("Attempting to install google-generativeai package...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "google-generativeai>=0.8.0"])
-            import google.generativeai as genai
-            logger.info("Google Generative AI package installed and imported successfully")
-        except Exception as install_error:
-            logger.error(f"Failed to install/import Google Generative AI: {str(install_error)}")
-            logger.error("AI features will be limited. Please ensure google-generativeai is in requirements.txt")
-            genai = None
-
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -85,16 +84,15 @@ async def manual_ping():
         server_url = os.environ.get('RENDER_EXTERNAL_URL', 'http://localhost:8000')
         health_url = f"{server_url}/health"
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(health_url, timeout=30) as response:
-                result = await response.json()
-                return {
-                    "ping_status": "success",
-                    "target_url": health_url,
-                    "response_status": response.status,
-                    "response_data": result,
-                    "timestamp": datetime.now(timezone.utc).isoformat()
-                }
+        async with http_client.session.get(health_url) as response:
+            result = await response.json()
+            return {
+                "ping_status": "success",
+                "target_url": health_url,
+                "response_status": response.status,
+                "response_data": result,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
     except Exception as e:
         return {
             "ping_status": "failed",
@@ -102,8 +100,70 @@ async def manual_ping():
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
 
+# One pooled HTTP session for all outbound calls (EmailJS, web push, self-ping)
+http_client = SharedHTTPClient(
+    limit=int(os.environ.get('HTTP_POOL_LIMIT', '100')),
+    limit_per_host=int(os.environ.get('HTTP_POOL_LIMIT_PER_HOST', '50')),
+    dns_cache_seconds=int(os.environ.get('HTTP_DNS_CACHE_SECONDS', '300')),
+    keepalive_seconds=float(os.environ.get('HTTP_KEEPALIVE_SECONDS', '30')),
+    timeout_seconds=float(os.environ.get('HTTP_TIMEOUT_SECONDS', '30')),
+    connect_timeout_seconds=float(os.environ.get('HTTP_CONNECT_TIMEOUT_SECONDS', '10'))
+)
+
 # Global variable to store the background task
 background_task = None
+ai_warmup_task = None
+
+# Background fan-out of notifications to many recipients (followers, broadcasts)
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(os.environ.get('NOTIFICATION_FANOUT_CHUNK_SIZE', '500'))
+notification_fanout = FanoutTracker()
+# Broadcasts save their last recipient after every chunk; one whose progress stalled this long lost its
+# worker and is resumed by another (or the restarted) worker. Checked at this interval too.
+BROADCAST_STALE_SECONDS = int(os.environ.get('BROADCAST_STALE_SECONDS', '300'))
+broadcast_recovery_task = None
+
+# Real-time delivery: stored notifications are published to the recipient's open SSE streams
+NOTIFICATION_STREAM_QUEUE_SIZE = int(os.environ.get('NOTIFICATION_STREAM_QUEUE_SIZE', '100'))
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = float(os.environ.get('NOTIFICATION_STREAM_HEARTBEAT_SECONDS', '30'))
+notification_broker = NotificationBroker(queue_size=NOTIFICATION_STREAM_QUEUE_SIZE)
+
+# Cross-worker delivery: each process tails notification inserts from a change stream (replica sets only).
+# Give every worker its own NOTIFICATION_WATCHER_ID when several run on one host.
+NOTIFICATION_CHANGE_STREAM = os.environ.get('NOTIFICATION_CHANGE_STREAM', 'true').lower() == 'true'
+NOTIFICATION_WATCHER_ID = os.environ.get('NOTIFICATION_WATCHER_ID') or socket.gethostname()
+notification_watcher = None
+
+# Per-user unread counters (notification_state), recounted periodically to correct drift
+NOTIFICATION_RECONCILE_INTERVAL_SECONDS = int(os.environ.get('NOTIFICATION_RECONCILE_INTERVAL_SECONDS', '3600'))
+unread_counters = UnreadCounters(db.notification_state, db.notifications)
+notification_maintenance_task = None
+
+# Likes and follows coalesce into one notification per recipient and target within this window
+NOTIFICATION_GROUP_WINDOW_SECONDS = int(os.environ.get('NOTIFICATION_GROUP_WINDOW_SECONDS', '86400'))
+
+# Web Push: encrypted, VAPID-signed messages sent by a background worker with bounded concurrency
+VAPID_PRIVATE_KEY = os.environ.get('VAPID_PRIVATE_KEY', '')
+VAPID_SUBJECT = os.environ.get('VAPID_SUBJECT') or f"mailto:{os.environ.get('FROM_EMAIL', 'noreply@raama.app')}"
+PUSH_CONCURRENCY = int(os.environ.get('PUSH_CONCURRENCY', '50'))
+PUSH_QUEUE_SIZE = int(os.environ.get('PUSH_QUEUE_SIZE', '10000'))
+PUSH_TTL_SECONDS = int(os.environ.get('PUSH_TTL_SECONDS', '86400'))
+
+def load_vapid_signer() -> Optional[VapidSigner]:
+    if not VAPID_PRIVATE_KEY:
+        return None
+    try:
+        return VapidSigner(VAPID_PRIVATE_KEY, VAPID_SUBJECT)
+    except (ValueError, TypeError) as e:
+        logger.error(f"❌ Invalid VAPID_PRIVATE_KEY: {str(e)}")
+        return None
+
+push_worker = PushDeliveryWorker(
+    db.push_subscriptions,
+    load_vapid_signer(),
+    concurrency=PUSH_CONCURRENCY,
+    queue_size=PUSH_QUEUE_SIZE,
+    ttl=PUSH_TTL_SECONDS
+)
 
 async def self_ping():
     """Background task to ping the server every 10 minutes to keep it alive"""
@@ -115,12 +175,11 @@ async def self_ping():
             server_url = os.environ.get('RENDER_EXTERNAL_URL', 'http://localhost:8000')
             health_url = f"{server_url}/health"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(health_url, timeout=30) as response:
-                    if response.status == 200:
-                        logger.info(f"✅ Self-ping successful: {health_url}")
-                    else:
-                        logger.warning(f"⚠️ Self-ping returned status {response.status}")
+            async with http_client.session.get(health_url) as response:
+                if response.status == 200:
+                    logger.info(f"✅ Self-ping successful: {health_url}")
+                else:
+                    logger.warning(f"⚠️ Self-ping returned status {response.status}")
                         
         except asyncio.CancelledError:
             logger.info("Self-ping task cancelled")
@@ -132,26 +191,90 @@ async def self_ping():
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    global background_task
+    global background_task, ai_warmup_task, notification_watcher, notification_maintenance_task, broadcast_recovery_task
     
     logger.info("Starting up Raama backend...")
+    await http_client.start()
     logger.info(f"Gemini API Key configured: {bool(GEMINI_API_KEY)}")
-    logger.info(f"Gemini package available: {genai is not None}")
     
-    # Try to initialize Gemini client
-    if genai and GEMINI_API_KEY:
-        client = get_gemini_client()
-        if client:
-            logger.info("✅ Gemini AI initialized successfully on startup")
-        else:
-            logger.error("❌ Failed to initialize Gemini AI on startup")
+    # Load AI SDKs in a worker thread so they don't delay the first request
+    if GEMINI_API_KEY or OPENAI_API_KEY:
+        ai_warmup_task = asyncio.create_task(warm_up_ai_clients())
     else:
-        logger.warning("⚠️ Gemini AI not available - missing package or API key")
+        logger.warning("⚠️ AI providers not configured - missing API keys")
+    
+    # Deliver notifications written by any worker to this worker's SSE connections
+    if NOTIFICATION_CHANGE_STREAM:
+        notification_watcher = NotificationChangeWatcher(
+            db.notifications,
+            db.notification_stream_state,
+            notification_broker,
+            NOTIFICATION_WATCHER_ID,
+            transform=present_notification
+        )
+        notification_watcher.start()
+    
+    # Grouped like/follow notifications rely on these unique indexes to count each actor once
+    try:
+        await ensure_notification_group_indexes(db.notifications, db.notification_group_actors)
+    except Exception as e:
+        logger.error(f"❌ Could not create notification group indexes: {str(e)}")
+    
+    notification_maintenance_task = asyncio.create_task(notification_maintenance())
+    broadcast_recovery_task = asyncio.create_task(recover_broadcasts())
+    email_outbox.start()
+    
+    # Build the in-process search indexes in the background; searches use Mongo until they are ready.
+    # Autocomplete is small and always on; SEARCH_ENGINE_ENABLED only controls the full-text index.
+    if SEARCH_ENGINE_ENABLED:
+        search_engine.start()
+    autocomplete.start()
+    tag_stats.start()
+    search_history.start()
+    
+    if push_worker.enabled:
+        push_worker.start(http_client.session)
+    else:
+        logger.warning("⚠️ Web push disabled - VAPID_PRIVATE_KEY not configured")
     
     # Start the self-ping background task
     background_task = asyncio.create_task(self_ping())
     logger.info("🔄 Self-ping cron job started - server will ping itself every 10 minutes")
 
+async def notification_maintenance():
+    """Periodically stamp read notifications for TTL expiry and reconcile unread counters"""
+    while True:
+        try:
+            await asyncio.sleep(NOTIFICATION_RECONCILE_INTERVAL_SECONDS)
+            await unread_counters.stamp_read()
+            await unread_counters.reconcile()
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"❌ Notification maintenance failed: {str(e)}")
+
+async def recover_broadcasts():
+    """Resume interrupted broadcasts at startup and whenever one goes stale"""
+    while True:
+        try:
+            await resume_broadcasts()
+            await asyncio.sleep(BROADCAST_STALE_SECONDS)
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"❌ Broadcast recovery failed: {str(e)}")
+            await asyncio.sleep(BROADCAST_STALE_SECONDS)
+
+async def warm_up_ai_clients():
+    """Import and initialize the configured AI SDK clients off the event loop"""
+    if GEMINI_API_KEY:
+        if await asyncio.to_thread(get_gemini_client):
+            logger.info("✅ Gemini AI initialized successfully on startup")
+        else:
+            logger.error("❌ Failed to initialize Gemini AI on startup")
+    if OPENAI_API_KEY:
+        await asyncio.to_thread(get_openai_client)
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
@@ -164,6 +287,25 @@ async def shutdown_event():
         except asyncio.CancelledError:
             pass
         logger.info("🛑 Self-ping cron job stopped")
+    
+    await notification_fanout.shutdown()
+    
+    if notification_maintenance_task:
+        notification_maintenance_task.cancel()
+    
+    if broadcast_recovery_task:
+        broadcast_recovery_task.cancel()
+    
+    if notification_watcher:
+        await notification_watcher.stop()
+    
+    await push_worker.stop()
+    await email_outbox.stop()
+    await search_engine.stop()
+    await autocomplete.stop()
+    await tag_stats.stop()
+    await search_history.stop()
+    await http_client.close()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -182,59 +324,147 @@ FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
 # Gemini AI configuration
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 
+# OpenAI configuration (keeping for backward compatibility)
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+
+# AI SDKs are optional and slow to import, so they load on first use instead of
+# at module import. A missing package disables that provider; it is never installed
+# at runtime - add it to requirements.txt instead.
+# warm_up_ai_clients loads them in a worker thread at startup; request handlers only
+# read the loaded state (current_*_client) and never import on the event loop.
+_NOT_LOADED = object()
+_genai_module = _NOT_LOADED
+_async_openai_class = _NOT_LOADED
+_ai_client_lock = threading.RLock()
+
+def load_genai():
+    """Import google.generativeai on first use, None if it is not installed (blocking)"""
+    global _genai_module
+    if _genai_module is _NOT_LOADED:
+        with _ai_client_lock:
+            if _genai_module is _NOT_LOADED:
+                try:
+                    import google.generativeai as genai_module
+                    _genai_module = genai_module
+                    logger.info("Google Generative AI package imported successfully")
+                except ImportError:
+                    logger.error("google-generativeai is not installed - Gemini features disabled")
+                    _genai_module = None
+    return _genai_module
+
+def genai_imported() -> bool:
+    """Whether google.generativeai has been imported, without importing it"""
+    return _genai_module is not _NOT_LOADED and _genai_module is not None
+
+def load_async_openai():
+    """Import openai.AsyncOpenAI on first use, None if it is not installed (blocking)"""
+    global _async_openai_class
+    if _async_openai_class is _NOT_LOADED:
+        with _ai_client_lock:
+            if _async_openai_class is _NOT_LOADED:
+                try:
+                    from openai import AsyncOpenAI
+                    _async_openai_class = AsyncOpenAI
+                except ImportError:
+                    logger.warning("OpenAI package not installed. Translation features will be limited.")
+                    _async_openai_class = None
+    return _async_openai_class
+
 # Initialize Gemini AI
 gemini_model = None
 
 def get_gemini_client():
-    """Initialize Gemini AI client"""
+    """Initialize Gemini AI client (blocking - call through asyncio.to_thread)"""
     global gemini_model
-    if gemini_model is None and GEMINI_API_KEY and genai:
-        try:
-            logger.info(f"Initializing Gemini AI with API key: {GEMINI_API_KEY[:10]}...")
-            genai.configure(api_key=GEMINI_API_KEY)
-            # Try different model names in order of preference (latest first)
-            model_names = ['gemini-2.5-flash', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
-            
-            for model_name in model_names:
-                try:
-                    gemini_model = genai.GenerativeModel(model_name)
-                    logger.info(f"Gemini AI client initialized successfully with model: {model_name}")
-                    break
-                except Exception as model_error:
-                    logger.warning(f"Failed to initialize model {model_name}: {str(model_error)}")
-                    continue
-            
+    if gemini_model is None and GEMINI_API_KEY:
+        with _ai_client_lock:
             if gemini_model is None:
-                logger.error("Failed to initialize any Gemini model")
-                gemini_model = False
-                
-        except Exception as e:
-            logger.error(f"Failed to initialize Gemini AI client: {str(e)}")
-            gemini_model = False  # Mark as failed to avoid retrying
+                genai = load_genai()
+                if genai is None:
+                    gemini_model = False
+                    return None
+                try:
+                    logger.info(f"Initializing Gemini AI with API key: {GEMINI_API_KEY[:10]}...")
+                    genai.configure(api_key=GEMINI_API_KEY)
+                    # Try different model names in order of preference (latest first)
+                    model_names = ['gemini-2.5-flash', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
+                    
+                    for model_name in model_names:
+                        try:
+                            gemini_model = genai.GenerativeModel(model_name)
+                            logger.info(f"Gemini AI client initialized successfully with model: {model_name}")
+                            break
+                        except Exception as model_error:
+                            logger.warning(f"Failed to initialize model {model_name}: {str(model_error)}")
+                            continue
+                    
+                    if gemini_model is None:
+                        logger.error("Failed to initialize any Gemini model")
+                        gemini_model = False
+                        
+                except Exception as e:
+                    logger.error(f"Failed to initialize Gemini AI client: {str(e)}")
+                    gemini_model = False  # Mark as failed to avoid retrying
     
     return gemini_model if gemini_model is not False else None
 
-# OpenAI configuration (keeping for backward compatibility)
-OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
-OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+def current_gemini_client():
+    """The Gemini model if it is already initialized, else None; never imports or blocks"""
+    return gemini_model if gemini_model is not None and gemini_model is not False else None
 
 # OpenAI client will be initialized lazily when needed
 openai_client = None
 
 def get_openai_client():
-    """Lazy initialization of OpenAI client"""
+    """Lazy initialization of OpenAI client (blocking - call through asyncio.to_thread)"""
     global openai_client
-    if openai_client is None and OPENAI_API_KEY and AsyncOpenAI:
-        try:
-            openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-        except Exception as e:
-            logger.warning(f"Failed to initialize OpenAI client: {str(e)}")
-            openai_client = False  # Mark as failed to avoid retrying
+    if openai_client is None and OPENAI_API_KEY:
+        with _ai_client_lock:
+            if openai_client is None:
+                AsyncOpenAI = load_async_openai()
+                if AsyncOpenAI is None:
+                    openai_client = False
+                    return None
+                try:
+                    openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+                except Exception as e:
+                    logger.warning(f"Failed to initialize OpenAI client: {str(e)}")
+                    openai_client = False  # Mark as failed to avoid retrying
     return openai_client if openai_client is not False else None
 
-# OpenAI configuration
-OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
-openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY and AsyncOpenAI else None
+def current_openai_client():
+    """The OpenAI client if it is already initialized, else None; never imports or blocks"""
+    return openai_client if openai_client is not None and openai_client is not False else None
+
+# AI provider routing: comma separated priority order, always ending at rule-based
+AI_PROVIDERS = os.environ.get('AI_PROVIDERS', 'gemini,openai')
+AI_TIMEOUT_SECONDS = float(os.environ.get('AI_TIMEOUT_SECONDS', '30'))
+AI_HEDGE_ENABLED = os.environ.get('AI_HEDGE_ENABLED', 'true').lower() == 'true'
+
+def build_ai_router() -> ProviderRouter:
+    """Build the provider router from AI_PROVIDERS"""
+    available_providers = {
+        # Providers only see clients warm_up_ai_clients has finished initializing
+        "gemini": lambda: GeminiProvider(current_gemini_client),
+        "openai": lambda: OpenAIProvider(current_openai_client, OPENAI_MODEL),
+        "stub": lambda: StubProvider(),
+    }
+    providers = []
+    for name in AI_PROVIDERS.split(','):
+        name = name.strip().lower()
+        if name in available_providers:
+            providers.append(available_providers[name]())
+        elif name:
+            logger.warning(f"Unknown AI provider '{name}' in AI_PROVIDERS, skipping")
+    return ProviderRouter(
+        providers,
+        terminal=RuleBasedProvider(),
+        timeout=AI_TIMEOUT_SECONDS,
+        hedge=AI_HEDGE_ENABLED
+    )
+
+ai_router = build_ai_router()
 
 def generate_otp():
     """Generate 6-digit OTP"""
@@ -244,327 +474,165 @@ def get_otp_expiry():
     """Get OTP expiry time (10 minutes from now)"""
     return datetime.now(timezone.utc) + timedelta(minutes=10)
 
-async def send_otp_email(email: str, otp: str, name: str):
-    """Send OTP email using EmailJS"""
+EMAILJS_SEND_URL = "https://api.emailjs.com/api/v1.0/email/send"
+
+def otp_email_params(email: str, otp: str, name: str) -> dict:
+    return {
+        "to_email": email,
+        "user_name": name,
+        "otp_code": otp,
+        "from_name": "रामा Team",
+        "from_email": FROM_EMAIL,
+        "expiry_time": "10 minutes"
+    }
+
+def verification_email_params(email: str, token: str, name: str) -> dict:
+    return {
+        "to_email": email,
+        "user_name": name,
+        "verification_link": f"{FRONTEND_URL}/verify-email?token={token}",
+        "from_name": "रामा Team",
+        "from_email": FROM_EMAIL
+    }
+
+async def send_emailjs(template_params: dict):
+    """Send one templated email through the EmailJS API; raises EmailDeliveryError on failure"""
+    if not EMAILJS_SERVICE_ID or not EMAILJS_TEMPLATE_ID or not EMAILJS_PUBLIC_KEY:
+        raise EmailDeliveryError("EmailJS credentials not configured", retryable=False)
+    
+    email_data = {
+        "service_id": EMAILJS_SERVICE_ID,
+        "template_id": EMAILJS_TEMPLATE_ID,
+        "user_id": EMAILJS_PUBLIC_KEY,
+        "template_params": template_params
+    }
+    # Private key if available for API calls
+    if EMAILJS_PRIVATE_KEY:
+        email_data["accessToken"] = EMAILJS_PRIVATE_KEY
+    
     try:
-        logger.info(f"Attempting to send OTP email to {email}")
-        
-        if not EMAILJS_SERVICE_ID or not EMAILJS_TEMPLATE_ID or not EMAILJS_PUBLIC_KEY:
-            logger.warning("EmailJS credentials not configured, logging OTP instead")
-            logger.info(f"🔐 OTP for {email}: {otp} (Valid for 10 minutes)")
-            return True
-            
-        # EmailJS API endpoint
-        emailjs_url = "https://api.emailjs.com/api/v1.0/email/send"
-        
-        # Prepare email data for EmailJS
-        email_data = {
-            "service_id": EMAILJS_SERVICE_ID,
-            "template_id": EMAILJS_TEMPLATE_ID,
-            "user_id": EMAILJS_PUBLIC_KEY,
-            "template_params": {
-                "to_email": email,
-                "user_name": name,
-                "otp_code": otp,
-                "from_name": "रामा Team",
-                "from_email": FROM_EMAIL,
-                "expiry_time": "10 minutes"
-            }
-        }
-        
-        # Add private key if available for API calls
-        if EMAILJS_PRIVATE_KEY:
-            email_data["accessToken"] = EMAILJS_PRIVATE_KEY
-        
-        logger.info("Sending OTP email via EmailJS API...")
-        logger.info(f"Email data being sent: {json.dumps(email_data, indent=2)}")
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                emailjs_url,
-                json=email_data,
-                headers={
-                    "Content-Type": "application/json"
-                }
-            ) as response:
-                response_text = await response.text()
-                
-                if response.status == 200:
-                    logger.info(f"OTP email sent successfully to {email}")
-                    return True
-                else:
-                    logger.error(f"EmailJS API error: {response.status} - {response_text}")
-                    # Log OTP as fallback
-                    logger.info(f"🔐 FALLBACK - OTP for {email}: {otp} (Valid for 10 minutes)")
-                    return True
-        
-    except Exception as e:
-        logger.error(f"Failed to send OTP email to {email}: {str(e)}")
-        # Log OTP as fallback
-        logger.info(f"🔐 FALLBACK - OTP for {email}: {otp} (Valid for 10 minutes)")
-        return True
+        async with http_client.session.post(EMAILJS_SEND_URL, json=email_data) as response:
+            response_text = await response.text()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise EmailDeliveryError(f"EmailJS request failed: {type(e).__name__}: {e}")
+    
+    if response.status != 200:
+        # Rate limiting and server errors are transient; anything else needs a config fix
+        raise EmailDeliveryError(
+            f"EmailJS API error: {response.status} - {response_text[:200]}",
+            retryable=response.status == 429 or response.status >= 500
+        )
+
+async def deliver_outbox_email(message: dict):
+    """Email outbox send callback"""
+    await send_emailjs(message["templateParams"])
+
+# OTP and verification emails are written to email_outbox and sent in the background,
+# rate limited toward EmailJS and retried with backoff. The rate limit is per worker
+# process: with N workers EmailJS sees up to N x EMAIL_RATE_PER_SECOND.
+email_outbox = EmailOutbox(
+    db.email_outbox,
+    deliver_outbox_email,
+    rate_per_second=float(os.environ.get('EMAIL_RATE_PER_SECOND', '1')),
+    burst=int(os.environ.get('EMAIL_RATE_BURST', '5')),
+    max_attempts=int(os.environ.get('EMAIL_MAX_ATTEMPTS', '6'))
+)
+
+async def queue_otp_email(user_id: str, email: str, otp: str, name: str, expires_at: datetime) -> dict:
+    return await email_outbox.enqueue(
+        "otp", email, otp_email_params(email, otp, name), idempotency_key=f"otp:{user_id}:{otp}",
+        expires_at=expires_at
+    )
 
-async def send_verification_email(email: str, token: str, name: str):
-    """Send email verification email using EmailJS with SMTP fallback"""
+async def queue_verification_email(user_id: str, email: str, token: str, name: str) -> dict:
+    return await email_outbox.enqueue(
+        "verification", email, verification_email_params(email, token, name),
+        idempotency_key=f"verification:{user_id}:{token}"
+    )
+
+async def send_otp_email(email: str, otp: str, name: str) -> bool:
+    """Send an OTP email immediately, bypassing the outbox (email configuration checks)"""
     try:
-        logger.info(f"Attempting to send verification email to {email} using EmailJS")
-        logger.info(f"EmailJS Config - Service ID: {EMAILJS_SERVICE_ID}, Template ID: {EMAILJS_TEMPLATE_ID}")
-        
-        if not EMAILJS_SERVICE_ID or not EMAILJS_TEMPLATE_ID or not EMAILJS_PUBLIC_KEY:
-            logger.warning("EmailJS credentials not configured, skipping email send")
-            return False
-            
-        verification_link = f"{FRONTEND_URL}/verify-email?token={token}"
-        logger.info(f"Verification link: {verification_link}")
-        
-        # EmailJS API endpoint
-        emailjs_url = "https://api.emailjs.com/api/v1.0/email/send"
-        
-        # Prepare email data for EmailJS
-        email_data = {
-            "service_id": EMAILJS_SERVICE_ID,
-            "template_id": EMAILJS_TEMPLATE_ID,
-            "user_id": EMAILJS_PUBLIC_KEY,
-            "template_params": {
-                "to_email": email,
-                "user_name": name,
-                "verification_link": verification_link,
-                "from_name": "रामा Team",
-                "from_email": FROM_EMAIL
-            }
-        }
-        
-        logger.info("Sending email via EmailJS API...")
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                emailjs_url,
-                json=email_data,
-                headers={
-                    "Content-Type": "application/json"
-                }
-            ) as response:
-                response_text = await response.text()
-                
-                if response.status == 200:
-                    logger.info(f"Verification email sent successfully to {email}")
-                    logger.info(f"EmailJS response: {response_text}")
-                    return True
-                else:
-                    logger.error(f"EmailJS API error: {response.status} - {response_text}")
-                    # Try SMTP fallback
-                    return await send_email_smtp_fallback(email, token, name, verification_link)
-        
-    except aiohttp.ClientError as e:
-        logger.error(f"HTTP client error: {str(e)}")
-        # Try SMTP fallback
-        return await send_email_smtp_fallback(email, token, name, f"{FRONTEND_URL}/verify-email?token={token}")
-    except Exception as e:
-        logger.error(f"Failed to send verification email to {email}: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
+        await send_emailjs(otp_email_params(email, otp, name))
+        logger.info(f"OTP email sent successfully to {email}")
+        return True
+    except EmailDeliveryError as e:
+        logger.error(f"Failed to send OTP email to {email}: {str(e)}")
         return False
 
-async def send_email_smtp_fallback(email: str, token: str, name: str, verification_link: str):
-    """Fallback SMTP email sending"""
+async def send_verification_email(email: str, token: str, name: str) -> bool:
+    """Send a verification email immediately, bypassing the outbox (email configuration checks)"""
     try:
-        logger.info("Trying SMTP fallback for email sending...")
-        
-        # Simple HTML email template
-        html_body = f"""
-        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-            <div style="text-align: center; margin-bottom: 30px;">
-                <h1 style="color: #ff6b35; font-size: 36px; margin: 0;">रामा..!</h1>
-                <p style="color: #666; font-size: 16px;">The Poetic ERP</p>
-            </div>
-            
-            <div style="background: #f9f9f9; padding: 30px; border-radius: 10px;">
-                <h2 style="color: #ff6b35;">Welcome to रामा, {name}!</h2>
-                <p style="color: #333; line-height: 1.6;">
-                    Thank you for joining our poetic community. Please verify your email address to complete your registration.
-                </p>
-                
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{verification_link}" style="background: #ff6b35; color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; font-weight: bold;">
-                        Verify Email Address
-                    </a>
-                </div>
-                
-                <p style="color: #666; font-size: 14px;">
-                    If the button doesn't work, copy and paste this link: {verification_link}
-                </p>
-                
-                <p style="color: #999; font-size: 12px; margin-top: 30px;">
-                    This link will expire in 24 hours. If you didn't create an account, please ignore this email.
-                </p>
-            </div>
-        </div>
-        """
-        
-        # For now, just log the email content (you can implement actual SMTP later)
-        logger.info(f"SMTP Fallback - Would send email to {email}")
-        logger.info(f"Verification link: {verification_link}")
-        
-        # Return True to indicate email was "sent" (logged)
+        await send_emailjs(verification_email_params(email, token, name))
+        logger.info(f"Verification email sent successfully to {email}")
         return True
-        
-    except Exception as e:
-        logger.error(f"SMTP fallback failed: {str(e)}")
+    except EmailDeliveryError as e:
+        logger.error(f"Failed to send verification email to {email}: {str(e)}")
         return False
 
-async def process_shayari_with_gemini(title: str, content: str) -> dict:
-    """Process shayari with Gemini AI to get analysis, suggestions, and enhancements"""
+async def process_shayari_with_ai(title: str, content: str) -> dict:
+    """Analyze a shayari through the AI provider router (Gemini, OpenAI, ...)"""
     try:
-        logger.info("Starting Gemini AI processing...")
-        logger.info(f"genai module available: {genai is not None}")
-        logger.info(f"GEMINI_API_KEY set: {bool(GEMINI_API_KEY)}")
-        
-        gemini_client = get_gemini_client()
-        if not gemini_client:
-            logger.warning("Gemini AI client not available")
-            # Provide a basic fallback analysis
-            return {
-                "success": False,
-                "message": "AI processing not available - client not initialized",
-                "analysis": None,
-                "fallback_analysis": {
-                    "sentiment_analysis": {
-                        "emotion": "भावनात्मक",
-                        "intensity": "5",
-                        "mood": "शायरी में गहरी भावनाएं हैं"
-                    },
-                    "quality_score": {
-                        "overall": "7",
-                        "creativity": "7", 
-                        "language_beauty": "7",
-                        "emotional_impact": "7"
-                    },
-                    "tags": ["शायरी", "कविता", "भावना"],
-                    "appreciation": "यह एक सुंदर शायरी है जिसमें गहरी भावनाएं हैं।"
-                }
-            }
-        
-        # Create a comprehensive prompt for shayari analysis
-        prompt = f"""
-        i give you shayari in hinglish i want you to translate hinglish shayari to hindi and repond just shayari not any modification nothing just shayari from hinglish to hindi 
-        """
-        
-        logger.info("Sending shayari to Gemini AI for analysis...")
-        response = gemini_client.generate_content(prompt)
-        
-        if response and response.text:
-            try:
-                # Parse the JSON response
-                ai_analysis = json.loads(response.text.strip())
-                logger.info("Gemini AI Translation completed successfully")
-                
-                return {
-                    "success": True,
-                    "message": "AI analysis completed",
-                    "analysis": ai_analysis,
-                    "raw_response": response.text
-                }
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Gemini AI response as JSON: {str(e)}")
-                return {
-                    "success": False,
-                    "message": "AI response parsing failed",
-                    "analysis": None,
-                    "raw_response": response.text
-                }
-        else:
-            logger.error("Empty response from Gemini AI")
-            return {
-                "success": False,
-                "message": "Empty AI response",
-                "analysis": None
-            }
-            
+        analysis, provider = await ai_router.analyze(title, content)
     except Exception as e:
-        logger.error(f"Gemini AI processing failed: {str(e)}")
+        logger.error(f"AI processing failed: {str(e)}")
         return {
             "success": False,
             "message": f"AI processing error: {str(e)}",
             "analysis": None
         }
+    
+    if provider == RuleBasedProvider.name:
+        logger.warning("No AI provider available for analysis, using fallback analysis")
+        return {
+            "success": False,
+            "message": "AI processing not available - no healthy AI provider",
+            "analysis": None,
+            "fallback_analysis": analysis
+        }
+    
+    logger.info(f"AI analysis completed successfully via {provider}")
+    return {
+        "success": True,
+        "message": "AI analysis completed",
+        "analysis": analysis,
+        "provider": provider
+    }
 
-async def translate_shayari_with_gemini(content: str, target_language: str = "english") -> dict:
-    """Translate shayari using Gemini AI"""
+async def translate_shayari_with_ai(content: str, target_language: str = "english") -> dict:
+    """Translate shayari through the AI provider router; without AI only Hinglish-to-Devanagari transliteration works"""
     try:
-        logger.info(f"Starting Gemini AI translation to {target_language}...")
-        gemini_client = get_gemini_client()
-        if not gemini_client:
-            logger.warning("Gemini AI client not available for translation")
-            return {
-                "success": False,
-                "message": "AI translation not available - Gemini AI client not initialized. Please check server configuration.",
-                "translated_content": None,
-                "fallback_message": "Translation service is currently unavailable. Please try again later."
-            }
-        
-        # Create translation prompt based on target language
-        if target_language.lower() == "english":
-            prompt = f"""
-            i give you shayari in hinglish i want you to translate hinglish shayari to hindi and repond just shayari not any modification nothing just shayari from hinglish to hindi 
-            Hindi Shayari:
-            {content}
-
-            Instructions:
-            1. Maintain the poetic flow and rhythm as much as possible
-            2. Preserve the emotional depth and meaning
-            4. Keep the essence and soul of the original shayari
-
-            Please provide only the translation, no additional text or explanations.
-            """
-        elif target_language.lower() == "hindi":
-            prompt = f"""
-            आप एक विशेषज्ञ अनुवादक हैं जो अंग्रेजी कविता को हिंदी शायरी में बदलने में माहिर हैं। कृपया निम्नलिखित अंग्रेजी कविता को हिंदी शायरी में अनुवाद करें।
-
-            English Poetry:
-            {content}
-
-            निर्देश:
-            1. शायरी की भावना और अर्थ को बनाए रखें
-            2. हिंदी की काव्यात्मक भाषा का उपयोग करें
-            3. तुकबंदी और छंद का ध्यान रखें
-            4. मूल भावना को बनाए रखते हुए सुंदर हिंदी में अनुवाद करें
-
-            कृपया केवल हिंदी अनुवाद दें, कोई अतिरिक्त text नहीं।
-            """
-        else:
-            return {
-                "success": False,
-                "message": f"Unsupported target language: {target_language}",
-                "translated_content": None
-            }
-        
-        logger.info("Sending translation request to Gemini AI...")
-        response = gemini_client.generate_content(prompt)
-        
-        if response and response.text:
-            translated_text = response.text.strip()
-            logger.info("Gemini AI translation completed successfully")
-            
-            return {
-                "success": True,
-                "message": "Translation completed successfully",
-                "translated_content": translated_text,
-                "target_language": target_language
-            }
-        else:
-            logger.error("Empty response from Gemini AI for translation")
-            return {
-                "success": False,
-                "message": "Empty translation response",
-                "translated_content": None
-            }
-            
+        translated_text, provider = await ai_router.translate(content, target_language)
+    except ValueError as e:
+        return {
+            "success": False,
+            "message": str(e),
+            "translated_content": None
+        }
+    except AllProvidersFailed as e:
+        logger.warning(f"AI translation not available: {str(e)}")
+        return {
+            "success": False,
+            "message": "AI translation not available - Gemini AI client not initialized. Please check server configuration.",
+            "translated_content": None,
+            "fallback_message": "Translation service is currently unavailable. Please try again later."
+        }
     except Exception as e:
-        logger.error(f"Gemini AI translation failed: {str(e)}")
+        logger.error(f"AI translation failed: {str(e)}")
         return {
             "success": False,
             "message": f"Translation error: {str(e)}",
             "translated_content": None
         }
+    
+    return {
+        "success": True,
+        "message": "Translation completed successfully" if provider != RuleBasedProvider.name
+                   else "Converted to Devanagari with rule-based transliteration (AI not available)",
+        "translated_content": translated_text,
+        "target_language": target_language,
+        "method": provider
+    }
 
 class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -655,15 +723,6 @@ class UserActivity(BaseModel):
     metadata: dict = {}
     createdAt: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
-class SearchHistory(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    userId: str
-    query: str
-    filters: dict = {}  # author, tags, etc.
-    resultsCount: int = 0
-    createdAt: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
 class UserPreferences(BaseModel):
     model_config = ConfigDict(extra="ignore")
     userId: str
@@ -797,6 +856,19 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+async def get_token_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    """Verify the bearer token without loading the user, for hot read-only endpoints"""
+    try:
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user_id
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         token = credentials.credentials
@@ -873,15 +945,18 @@ async def register(user_data: UserCreate):
     if doc.get('otpExpiresAt'):
         doc['otpExpiresAt'] = doc['otpExpiresAt'].isoformat()
     
+    doc['nameKeys'] = user_name_keys(doc)
+    
     await db.users.insert_one(doc)
+    autocomplete.set_writer(doc)
     
-    # Send OTP email
-    email_sent = await send_otp_email(user.email, otp, user.firstName)
+    # OTP email is delivered in the background by the outbox sender
+    await queue_otp_email(user.id, user.email, otp, user.firstName, otp_expiry)
     
     return {
         "message": "Registration successful! Please check your email for OTP to verify your account.",
         "email": user.email,
-        "emailSent": email_sent,
+        "emailQueued": True,
         "requiresOTP": True
     }
 
@@ -963,12 +1038,11 @@ async def resend_otp(request: ResendOTPRequest):
         }
     )
     
-    # Send OTP email
-    email_sent = await send_otp_email(request.email, otp, user_doc['firstName'])
+    await queue_otp_email(user_doc['id'], request.email, otp, user_doc['firstName'], otp_expiry)
     
     return {
         "message": "New OTP sent! Please check your email.",
-        "emailSent": email_sent
+        "emailQueued": True
     }
 
 @api_router.post("/auth/verify-email")
@@ -1064,16 +1138,11 @@ async def resend_verification_email(credentials: UserLogin):
         {"$set": {"emailVerificationToken": verification_token}}
     )
     
-    # Send verification email
-    email_sent = await send_verification_email(
-        user_doc['email'], 
-        verification_token, 
-        user_doc['firstName']
-    )
+    await queue_verification_email(user_doc['id'], user_doc['email'], verification_token, user_doc['firstName'])
     
     return {
         "message": "Verification email sent! Please check your inbox.",
-        "emailSent": email_sent
+        "emailQueued": True
     }
 
 @api_router.post("/auth/test-email-debug")
@@ -1191,7 +1260,7 @@ async def create_shayari(shayari_data: ShayariCreate, current_user: User = Depen
     
     # Process shayari with Gemini AI (gracefully handle failures)
     logger.info(f"Processing shayari with Gemini AI: {shayari_data.title}")
-    ai_result = await process_shayari_with_gemini(shayari_data.title, shayari_data.content)
+    ai_result = await process_shayari_with_ai(shayari_data.title, shayari_data.content)
     
     # Extract AI-suggested tags and quality score
     ai_tags = []
@@ -1238,12 +1307,21 @@ async def create_shayari(shayari_data: ShayariCreate, current_user: User = Depen
     doc['createdAt'] = doc['createdAt'].isoformat()
     if doc.get('aiProcessedAt'):
         doc['aiProcessedAt'] = doc['aiProcessedAt'].isoformat()
+    doc['searchKeys'] = search_keys((doc['title'], doc['content']))
+    doc['authorKeys'] = name_keys(doc['authorName'], doc['authorUsername'])
     
     try:
         await db.shayaris.insert_one(doc)
     except Exception as e:
         logger.error(f"Failed to save shayari to database: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to save shayari")
+    search_engine.add(doc)
+    autocomplete.add_shayari(doc)
+    search_cache.invalidate()
+    try:
+        await tag_stats.add_shayari(doc)
+    except Exception as e:
+        logger.error(f"Failed to update tag stats: {str(e)}")
     
     # Log activity
     try:
@@ -1266,19 +1344,9 @@ async def create_shayari(shayari_data: ShayariCreate, current_user: User = Depen
         logger.error(f"Failed to log activity: {str(e)}")
         # Don't fail the request if activity logging fails
     
-    # Notify followers about new shayari
+    # Notify followers about new shayari (in the background, so large followings don't slow publishing)
     try:
-        followers = await db.follows.find({"followingId": current_user.id}, {"_id": 0}).to_list(1000)
-        for follow in followers:
-            await create_notification_helper(
-                user_id=follow['followerId'],
-                message=f"{current_user.firstName} {current_user.lastName} posted a new shayari",
-                notification_type="new_shayari",
-                sender_id=current_user.id,
-                sender_name=f"{current_user.firstName} {current_user.lastName}",
-                shayari_id=shayari.id,
-                shayari_title=shayari.title
-            )
+        notify_followers_of_shayari(current_user, shayari)
     except Exception as e:
         logger.error(f"Error creating follow notifications: {str(e)}")
         # Don't fail the request if notifications fail
@@ -1322,6 +1390,7 @@ async def update_shayari(
         "title": shayari_data.title,
         "content": shayari_data.content,
         "tags": shayari_data.tags,
+        "searchKeys": search_keys((shayari_data.title, shayari_data.content)),
         "updatedAt": datetime.now(timezone.utc).isoformat()
     }
     
@@ -1334,7 +1403,18 @@ async def update_shayari(
         raise HTTPException(status_code=404, detail="Shayari not found")
     
     # Get updated shayari
-    updated_shayari = await db.shayaris.find_one({"id": shayari_id}, {"_id": 0})
+    updated_shayari = await db.shayaris.find_one({"id": shayari_id}, SEARCH_PROJECTION)
+    search_engine.add(updated_shayari)
+    autocomplete.add_shayari(updated_shayari)
+    search_cache.invalidate(shayari_id)
+    try:
+        await tag_stats.adjust(
+            added=updated_shayari.get('tags'),
+            removed=existing_shayari.get('tags'),
+            created_at=existing_shayari.get('createdAt')
+        )
+    except Exception as e:
+        logger.error(f"Failed to update tag stats: {str(e)}")
     
     # Convert datetime strings back to datetime objects if needed
     if isinstance(updated_shayari['createdAt'], str):
@@ -1354,6 +1434,13 @@ async def delete_shayari(shayari_id: str, current_user: User = Depends(get_curre
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.shayaris.delete_one({"id": shayari_id})
+    search_engine.remove(shayari_id)
+    autocomplete.remove_shayari(shayari_id)
+    search_cache.invalidate(shayari_id)
+    try:
+        await tag_stats.remove_shayaris([shayari])
+    except Exception as e:
+        logger.error(f"Failed to update tag stats: {str(e)}")
     return {"message": "Shayari deleted"}
 
 @api_router.get("/users/writers", response_model=List[User])
@@ -1372,6 +1459,56 @@ async def get_readers(admin_user: User = Depends(get_admin_user)):
             r['createdAt'] = datetime.fromisoformat(r['createdAt'])
     return readers
 
+def publish_notifications(notif_docs: List[dict]):
+    """Publish stored notifications to local live streams unless the change stream delivers them"""
+    if notification_watcher and notification_watcher.active:
+        return
+    notification_broker.publish_many(notif_docs)
+
+async def store_notification(notif_doc: dict):
+    """Insert a notification and publish it to the recipient's live streams"""
+    await db.notifications.insert_one(notif_doc)
+    await unread_counters.increment_for([notif_doc])
+    publish_notifications([notif_doc])
+
+async def create_grouped_notification(
+    user_id: str,
+    notification_type: str,
+    actor: User,
+    shayari_id: str = None,
+    shayari_title: str = None
+):
+    """Add an actor to the recipient's coalesced like/follow notification for the current window"""
+    try:
+        grouped = await upsert_grouped(
+            db.notifications,
+            db.notification_group_actors,
+            user_id=user_id,
+            notification_type=notification_type,
+            actor_id=actor.id,
+            actor_name=f"{actor.firstName} {actor.lastName}",
+            now=datetime.now(timezone.utc),
+            window_seconds=NOTIFICATION_GROUP_WINDOW_SECONDS,
+            shayari_id=shayari_id,
+            shayari_title=shayari_title
+        )
+        if grouped is None:
+            # The actor is already counted in this window (e.g. like, unlike, like again)
+            return None
+        before, notif_doc = grouped
+        
+        # Count the group once while it stays unread; it becomes unread again after being read
+        if before is None or not is_unread(before, await unread_counters.read_watermark(user_id)):
+            await unread_counters.increment_for([notif_doc])
+        publish_notifications([notif_doc])
+        # Push once per group and window; later actors only update the inbox row
+        if before is None:
+            send_push_notifications([notif_doc])
+        return notif_doc
+    except Exception as e:
+        logger.error(f"Error creating grouped notification: {str(e)}")
+        return None
+
 # Helper function to create notifications
 async def create_notification_helper(
     user_id: str,
@@ -1400,10 +1537,8 @@ async def create_notification_helper(
         
         notif_doc = notification.model_dump()
         notif_doc['createdAt'] = notif_doc['createdAt'].isoformat()
-        await db.notifications.insert_one(notif_doc)
-        
-        # Send push notification
-        await send_push_notification(user_id, notification)
+        await store_notification(notif_doc)
+        send_push_notifications([notif_doc])
         
         logger.info(f"Created notification for user {user_id}: {notification_type}")
         return notification
@@ -1411,42 +1546,58 @@ async def create_notification_helper(
         logger.error(f"Error creating notification: {str(e)}")
         return None
 
-# Push notification helper
-async def send_push_notification(user_id: str, notification: Notification):
-    """Send push notification to user's devices"""
-    try:
-        # Get user's push subscriptions
-        subscriptions = await db.push_subscriptions.find(
-            {"userId": user_id}, 
-            {"_id": 0}
-        ).to_list(10)
-        
-        if not subscriptions:
-            return
-        
-        # Prepare notification payload
-        payload = {
-            "title": get_notification_title(notification.type),
-            "message": notification.message,
-            "type": notification.type,
-            "url": "/",
-            "timestamp": notification.createdAt.isoformat() if hasattr(notification.createdAt, 'isoformat') else str(notification.createdAt)
-        }
-        
-        # Send to each subscription (in a real app, you'd use a proper push service)
-        for subscription in subscriptions:
-            try:
-                # Here you would use a library like pywebpush to send actual push notifications
-                # For now, we'll just log it
-                logger.info(f"Would send push notification to {subscription['endpoint'][:50]}...")
-                logger.info(f"Payload: {payload}")
-            except Exception as sub_error:
-                logger.error(f"Error sending push to subscription: {str(sub_error)}")
-                # Remove invalid subscription
-                await db.push_subscriptions.delete_one({"id": subscription.get("id")})
-                
-    except Exception as e:
-        logger.error(f"Error sending push notification: {str(e)}")
+def notify_followers_of_shayari(author: User, shayari: Shayari) -> FanoutJob:
+    """Start a background fan-out of a new_shayari notification to every follower"""
+    author_name = f"{author.firstName} {author.lastName}"
+    template = Notification(
+        userId="",
+        senderId=author.id,
+        senderName=author_name,
+        message=f"{author_name} posted a new shayari",
+        type="new_shayari",
+        shayariId=shayari.id,
+        shayariTitle=shayari.title
+    ).model_dump(exclude={"id", "userId", "isRead", "createdAt"})
+
+    followers = db.follows.find(
+        {"followingId": author.id},
+        {"_id": 0, "followerId": 1}
+    ).batch_size(NOTIFICATION_FANOUT_CHUNK_SIZE)
+
+    job = FanoutJob("new_shayari", source_id=shayari.id)
+    return notification_fanout.start(job, fan_out(
+        db.notifications,
+        field_values(followers, "followerId"),
+        template,
+        job,
+        tracker=notification_fanout,
+        chunk_size=NOTIFICATION_FANOUT_CHUNK_SIZE,
+        on_chunk=deliver_notification_chunk
+    ))
+
+async def deliver_notification_chunk(notif_docs: List[dict]):
+    """Deliver a chunk of fanned-out notifications to live streams and push subscriptions"""
+    await unread_counters.increment_for(notif_docs)
+    publish_notifications(notif_docs)
+    send_push_notifications(notif_docs)
+
+def send_push_notifications(notif_docs: List[dict]) -> bool:
+    """Queue Web Push delivery for stored notifications; the push worker looks up subscriptions"""
+    return push_worker.submit({doc["userId"]: push_payload(doc) for doc in notif_docs})
+
+def push_payload(notif_doc: dict) -> dict:
+    """Message shown by the service worker for a notification"""
+    created_at = notif_doc.get("createdAt")
+    return {
+        "id": notif_doc.get("id"),
+        "title": notif_doc.get("title") or get_notification_title(notif_doc["type"]),
+        "message": notif_doc["message"],
+        "type": notif_doc["type"],
+        "senderName": notif_doc.get("senderName"),
+        "shayariId": notif_doc.get("shayariId"),
+        "url": "/",
+        "timestamp": created_at.isoformat() if hasattr(created_at, 'isoformat') else str(created_at)
+    }
 
 def get_notification_title(notification_type: str) -> str:
     """Get notification title based on type"""
@@ -1462,28 +1613,68 @@ def get_notification_title(notification_type: str) -> str:
     }
     return titles.get(notification_type, "New Notification")
 
+def encode_notification_cursor(notification: dict) -> str:
+    """Opaque keyset cursor: the (createdAt, id) of the last notification on a page"""
+    raw = f"{notification['createdAt']}|{notification['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_notification_cursor(cursor: str) -> tuple:
+    try:
+        created_at, notification_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return created_at, notification_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @api_router.get("/notifications")
-async def get_notifications(current_user: User = Depends(get_current_user)):
-    """Get user's notifications with unread count"""
+async def get_notifications(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Get user's notifications with unread count
+    
+    Pages back with `cursor` (the previous page's nextCursor); `since` (the previous
+    response's latest) returns only notifications newer than the last sync.
+    """
+    limit = max(1, min(limit, 100))
+    query = {"userId": current_user.id}
+    if since:
+        query["createdAt"] = {"$gt": since}
+    if cursor:
+        created_at, notification_id = decode_notification_cursor(cursor)
+        query["$or"] = [
+            {"createdAt": {"$lt": created_at}},
+            {"createdAt": created_at, "id": {"$lt": notification_id}}
+        ]
+    
     notifications = await db.notifications.find(
-        {"userId": current_user.id}, 
-        {"_id": 0}
-    ).sort("createdAt", -1).limit(50).to_list(50)
+        query,
+        {"_id": 0, "groupKey": 0, "readAt": 0}
+    ).sort([("createdAt", -1), ("id", -1)]).limit(limit + 1).to_list(limit + 1)
+    
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
+    next_cursor = encode_notification_cursor(notifications[-1]) if has_more else None
+    latest = notifications[0]['createdAt'] if notifications and not cursor else since
+    
+    # Unread count and the read watermark behind "mark all read"
+    state = await unread_counters.get_state(current_user.id)
+    read_up_to = state["notificationsReadUpTo"]
     
-    # Convert datetime strings back to datetime objects if needed
     for n in notifications:
+        n['isRead'] = not is_unread(n, read_up_to)
+        present_notification(n)
+        # Convert datetime strings back to datetime objects if needed
         if isinstance(n['createdAt'], str):
             n['createdAt'] = datetime.fromisoformat(n['createdAt'])
     
-    # Get unread count
-    unread_count = await db.notifications.count_documents({
-        "userId": current_user.id, 
-        "isRead": False
-    })
-    
     return {
         "notifications": notifications,
-        "unreadCount": unread_count
+        "unreadCount": state["unreadCount"],
+        "nextCursor": next_cursor,
+        "hasMore": has_more,
+        "latest": latest
     }
 
 @api_router.post("/notifications")
@@ -1506,36 +1697,51 @@ async def create_notification(
     
     notif_doc = notification.model_dump()
     notif_doc['createdAt'] = notif_doc['createdAt'].isoformat()
-    await db.notifications.insert_one(notif_doc)
+    await store_notification(notif_doc)
     
     return {"message": "Notification created successfully", "id": notification.id}
 
 @api_router.put("/notifications/{notification_id}/read")
 async def mark_notification_read(notification_id: str, current_user: User = Depends(get_current_user)):
     """Mark a notification as read"""
+    query = {"id": notification_id, "userId": current_user.id, "isRead": False}
+    read_up_to = await unread_counters.read_watermark(current_user.id)
+    if read_up_to:
+        # Older notifications are already read through the watermark
+        query["createdAt"] = {"$gt": read_up_to}
+    
     result = await db.notifications.update_one(
-        {"id": notification_id, "userId": current_user.id},
-        {"$set": {"isRead": True}}
+        query,
+        {"$set": {"isRead": True, "readAt": datetime.now(timezone.utc)}}
     )
     if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Notification not found")
+        exists = await db.notifications.count_documents(
+            {"id": notification_id, "userId": current_user.id}, limit=1
+        )
+        if not exists:
+            raise HTTPException(status_code=404, detail="Notification not found")
+        return {"message": "Notification already read"}
+    await unread_counters.decrement(current_user.id)
     return {"message": "Notification marked as read"}
 
 @api_router.put("/notifications/mark-all-read")
 async def mark_all_notifications_read(current_user: User = Depends(get_current_user)):
     """Mark all notifications as read for the current user"""
-    result = await db.notifications.update_many(
-        {"userId": current_user.id, "isRead": False},
-        {"$set": {"isRead": True}}
-    )
-    return {"message": f"Marked {result.modified_count} notifications as read"}
+    # One update to the read watermark, however many notifications are unread
+    marked = await unread_counters.mark_all_read(current_user.id)
+    return {"message": f"Marked {marked} notifications as read"}
 
 @api_router.delete("/notifications/{notification_id}")
 async def delete_notification(notification_id: str, current_user: User = Depends(get_current_user)):
     """Delete a notification"""
-    result = await db.notifications.delete_one({"id": notification_id, "userId": current_user.id})
-    if result.deleted_count == 0:
+    deleted = await db.notifications.find_one_and_delete(
+        {"id": notification_id, "userId": current_user.id},
+        projection={"_id": 0, "isRead": 1, "createdAt": 1}
+    )
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Notification not found")
+    if is_unread(deleted, await unread_counters.read_watermark(current_user.id)):
+        await unread_counters.decrement(current_user.id)
     return {"message": "Notification deleted"}
 
 @api_router.post("/notifications/test")
@@ -1555,17 +1761,10 @@ async def send_test_notification(current_user: User = Depends(get_current_user))
         # Save to database
         notif_doc = test_notification.model_dump()
         notif_doc['createdAt'] = notif_doc['createdAt'].isoformat()
-        await db.notifications.insert_one(notif_doc)
+        await store_notification(notif_doc)
         
-        # Try to send push notification
-        try:
-            await send_push_notification(current_user.id, {
-                "title": "Test Notification",
-                "message": "This is a test notification to verify the system is working!",
-                "type": "test"
-            })
-        except Exception as push_error:
-            logger.warning(f"Push notification failed: {str(push_error)}")
+        # Queue a push to the user's devices (skipped when web push is not configured)
+        send_push_notifications([notif_doc])
         
         return {
             "message": "Test notification sent successfully!",
@@ -1591,6 +1790,9 @@ async def notification_system_health():
             "database": "connected",
             "notifications_collection": "accessible",
             "push_subscriptions_collection": "accessible",
+            "stream": notification_broker.stats(),
+            "push": push_worker.stats(),
+            "changeStream": notification_watcher.stats() if notification_watcher else {"enabled": False},
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
         
@@ -1616,16 +1818,24 @@ async def notification_stream(token: str):
         raise HTTPException(status_code=401, detail="Invalid token")
     
     async def event_generator():
-        try:
-            while True:
-                # Send a heartbeat every 30 seconds to keep connection alive
+        with notification_broker.subscription(user_id) as queue:
+            try:
                 yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now(timezone.utc).isoformat()})}\n\n"
-                await asyncio.sleep(30)
-        except asyncio.CancelledError:
-            return
-        except Exception as e:
-            logger.error(f"Error in notification stream: {str(e)}")
-            return
+                while True:
+                    try:
+                        notification = await asyncio.wait_for(
+                            queue.get(), timeout=NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        # Send a heartbeat when idle to keep connection alive
+                        yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now(timezone.utc).isoformat()})}\n\n"
+                        continue
+                    yield f"id: {notification['id']}\ndata: {json.dumps(notification, default=str)}\n\n"
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error(f"Error in notification stream: {str(e)}")
+                return
     
     return StreamingResponse(
         event_generator(),
@@ -1674,7 +1884,7 @@ async def get_user_stats(current_user: User = Depends(get_current_user)):
     my_creations = await db.shayaris.count_documents({"authorId": current_user.id})
     total_shayaris = await db.shayaris.count_documents({})
     total_writers = await db.users.count_documents({"role": "writer"})
-    unread_notifications = await db.notifications.count_documents({"userId": current_user.id, "isRead": False})
+    unread_notifications = await unread_counters.get(current_user.id)
     
     return {
         "myCreations": my_creations,
@@ -1721,7 +1931,7 @@ async def analyze_shayari_with_ai(shayari_id: str, current_user: User = Depends(
         raise HTTPException(status_code=403, detail="Not authorized to analyze this shayari")
     
     # Process with Gemini AI
-    ai_result = await process_shayari_with_gemini(shayari['title'], shayari['content'])
+    ai_result = await process_shayari_with_ai(shayari['title'], shayari['content'])
     
     if ai_result["success"]:
         # Update shayari with AI analysis
@@ -1740,6 +1950,7 @@ async def analyze_shayari_with_ai(shayari_id: str, current_user: User = Depends(
                 pass
         
         await db.shayaris.update_one({"id": shayari_id}, {"$set": update_data})
+        search_cache.forget(shayari_id)
     
     return {
         "success": ai_result["success"],
@@ -1764,13 +1975,13 @@ async def get_shayari_ai_analysis(shayari_id: str, current_user: User = Depends(
 
 @api_router.post("/shayaris/{shayari_id}/translate")
 async def translate_shayari(shayari_id: str, target_language: str = "english", current_user: User = Depends(get_current_user)):
-    """Translate a shayari using Gemini AI"""
+    """Translate a shayari using the AI provider router"""
     shayari = await db.shayaris.find_one({"id": shayari_id}, {"_id": 0})
     if not shayari:
         raise HTTPException(status_code=404, detail="Shayari not found")
     
     # Translate the shayari content
-    translation_result = await translate_shayari_with_gemini(shayari['content'], target_language)
+    translation_result = await translate_shayari_with_ai(shayari['content'], target_language)
     
     return {
         "shayari_id": shayari_id,
@@ -1778,23 +1989,25 @@ async def translate_shayari(shayari_id: str, target_language: str = "english", c
         "target_language": target_language,
         "success": translation_result["success"],
         "message": translation_result["message"],
-        "translated_content": translation_result.get("translated_content")
+        "translated_content": translation_result.get("translated_content"),
+        "method": translation_result.get("method")
     }
 
 @api_router.post("/translate")
 async def translate_text(content: str, target_language: str = "english", current_user: User = Depends(get_current_user)):
-    """Translate any text using Gemini AI"""
+    """Translate any text using the AI provider router"""
     if not content.strip():
         raise HTTPException(status_code=400, detail="Content cannot be empty")
     
-    translation_result = await translate_shayari_with_gemini(content, target_language)
+    translation_result = await translate_shayari_with_ai(content, target_language)
     
     return {
         "original_content": content,
         "target_language": target_language,
         "success": translation_result["success"],
         "message": translation_result["message"],
-        "translated_content": translation_result.get("translated_content")
+        "translated_content": translation_result.get("translated_content"),
+        "method": translation_result.get("method")
     }
 
 @api_router.get("/health")
@@ -1802,10 +2015,10 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "gemini_available": genai is not None and bool(GEMINI_API_KEY),
-        "gemini_package_imported": genai is not None,
+        "gemini_available": current_gemini_client() is not None,
+        "gemini_package_imported": genai_imported(),
         "gemini_api_key_set": bool(GEMINI_API_KEY),
-        "gemini_client_initialized": get_gemini_client() is not None,
+        "gemini_client_initialized": current_gemini_client() is not None,
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
@@ -1813,9 +2026,9 @@ async def health_check():
 async def debug_gemini():
     """Debug Gemini AI configuration"""
     try:
-        client = get_gemini_client()
+        client = current_gemini_client()
         return {
-            "genai_imported": genai is not None,
+            "genai_imported": genai_imported(),
             "api_key_set": bool(GEMINI_API_KEY),
             "api_key_preview": GEMINI_API_KEY[:10] + "..." if GEMINI_API_KEY else None,
             "client_initialized": client is not None,
@@ -1824,18 +2037,28 @@ async def debug_gemini():
         }
     except Exception as e:
         return {
-            "genai_imported": genai is not None,
+            "genai_imported": genai_imported(),
             "api_key_set": bool(GEMINI_API_KEY),
             "client_initialized": False,
             "error": str(e)
         }
 
+@api_router.get("/debug/ai-providers")
+async def debug_ai_providers():
+    """Circuit breaker state, latency percentiles and counters per AI provider"""
+    return {
+        "order": [p.name for p in ai_router.providers] + [ai_router.terminal.name],
+        "hedging": ai_router.hedge,
+        "providers": ai_router.stats(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
 @api_router.post("/test-gemini")
 async def test_gemini_ai():
     """Test Gemini AI integration for both analysis and translation"""
     try:
         # Check if genai is imported
-        if genai is None:
+        if await asyncio.to_thread(load_genai) is None:
             return {
                 "gemini_available": False,
                 "error": "google.generativeai package not imported",
@@ -1853,7 +2076,7 @@ async def test_gemini_ai():
             }
         
         # Try to get client
-        client = get_gemini_client()
+        client = await asyncio.to_thread(get_gemini_client)
         if not client:
             return {
                 "gemini_available": False,
@@ -1864,13 +2087,13 @@ async def test_gemini_ai():
             }
         
         # Test analysis
-        analysis_result = await process_shayari_with_gemini(
+        analysis_result = await process_shayari_with_ai(
             "प्रेम की पहली बारिश",
             "दिल में बसी है तेरी यादें\nआंखों में तेरे सपने हैं"
         )
         
         # Test translation
-        translation_result = await translate_shayari_with_gemini(
+        translation_result = await translate_shayari_with_ai(
             "दिल में बसी है तेरी यादें\nआंखों में तेरे सपने हैं",
             "english"
         )
@@ -1894,7 +2117,7 @@ async def test_gemini_ai():
         return {
             "gemini_available": False,
             "error": str(e),
-            "genai_imported": genai is not None,
+            "genai_imported": genai_imported(),
             "api_key_set": bool(GEMINI_API_KEY)
         }
 
@@ -1950,6 +2173,7 @@ async def approve_writer_request(request_id: str, admin_user: User = Depends(get
             }
         }
     )
+    await refresh_writer_completion(request['userId'])
     
     await db.writer_requests.update_one(
         {"id": request_id},
@@ -2030,7 +2254,10 @@ async def create_user_by_admin(user_data: UserCreate, admin_user: User = Depends
     doc['password'] = hashed_password
     doc['createdAt'] = doc['createdAt'].isoformat()
     
+    doc['nameKeys'] = user_name_keys(doc)
+    
     await db.users.insert_one(doc)
+    autocomplete.set_writer(doc)
     
     return {"message": "User created successfully", "user": user}
 
@@ -2060,8 +2287,11 @@ async def update_user_by_admin(user_id: str, user_data: dict, admin_user: User =
     for field in allowed_fields:
         if field in user_data:
             update_data[field] = user_data[field]
+    if update_data.keys() & {'firstName', 'lastName', 'username'}:
+        update_data['nameKeys'] = user_name_keys({**existing_user, **update_data})
     
     await db.users.update_one({"id": user_id}, {"$set": update_data})
+    await refresh_writer_completion(user_id)
     
     return {"message": "User updated successfully"}
 
@@ -2078,14 +2308,28 @@ async def delete_user_by_admin(user_id: str, admin_user: User = Depends(get_admi
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     # Delete user's shayaris
+    deleted_shayaris = await db.shayaris.find(
+        {"authorId": user_id}, {"_id": 0, "tags": 1, "createdAt": 1}
+    ).to_list(None)
     await db.shayaris.delete_many({"authorId": user_id})
+    search_engine.remove_author(user_id)
+    autocomplete.remove_author(user_id)
+    search_cache.invalidate()
+    try:
+        await tag_stats.remove_shayaris(deleted_shayaris)
+    except Exception as e:
+        logger.error(f"Failed to update tag stats: {str(e)}")
     
     # Delete user's notifications
     await db.notifications.delete_many({"userId": user_id})
+    await unread_counters.delete(user_id)
     
     # Delete user's writer requests
     await db.writer_requests.delete_many({"userId": user_id})
     
+    # Delete user's search history
+    await search_history.clear(user_id)
+    
     # Delete user
     await db.users.delete_one({"id": user_id})
     
@@ -2114,6 +2358,7 @@ async def change_user_role(user_id: str, role_data: dict, admin_user: User = Dep
             }
         }
     )
+    await refresh_writer_completion(user_id)
     
     # Create notification for user
     await create_notification_helper(
@@ -2214,7 +2459,10 @@ async def create_admin_user(user_data: AdminCreate, admin_user: User = Depends(g
     doc['password'] = hashed_password
     doc['createdAt'] = doc['createdAt'].isoformat()
     
+    doc['nameKeys'] = user_name_keys(doc)
+    
     await db.users.insert_one(doc)
+    autocomplete.set_writer(doc)
     
     return {"message": "Admin created successfully", "user": user}
 
@@ -2412,7 +2660,7 @@ async def add_shayari_to_collection(collection_id: str, shayari_id: str, current
         )
         notif_doc = notif.model_dump()
         notif_doc['createdAt'] = notif_doc['createdAt'].isoformat()
-        await db.notifications.insert_one(notif_doc)
+        await store_notification(notif_doc)
     
     return {"message": "Shayari added to collection"}
 
@@ -2473,12 +2721,10 @@ async def follow_user(user_id: str, current_user: User = Depends(get_current_use
     await db.follows.insert_one(doc)
     
     # Create notification
-    await create_notification_helper(
+    await create_grouped_notification(
         user_id=user_id,
-        message=f"{current_user.firstName} {current_user.lastName} started following you!",
         notification_type="follow",
-        sender_id=current_user.id,
-        sender_name=f"{current_user.firstName} {current_user.lastName}"
+        actor=current_user
     )
     
     # Log activity
@@ -2557,15 +2803,15 @@ async def like_shayari(shayari_id: str, current_user: User = Depends(get_current
             "$inc": {"likes": 1}
         }
     )
+    search_engine.adjust(shayari_id, "likes", 1)
+    search_cache.forget(shayari_id)
     
     # Create notification for author (if not self-like)
     if shayari['authorId'] != current_user.id:
-        await create_notification_helper(
+        await create_grouped_notification(
             user_id=shayari['authorId'],
-            message=f"{current_user.firstName} {current_user.lastName} liked your shayari",
             notification_type="like",
-            sender_id=current_user.id,
-            sender_name=f"{current_user.firstName} {current_user.lastName}",
+            actor=current_user,
             shayari_id=shayari_id,
             shayari_title=shayari['title']
         )
@@ -2596,6 +2842,8 @@ async def unlike_shayari(shayari_id: str, current_user: User = Depends(get_curre
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Like not found")
+    search_engine.adjust(shayari_id, "likes", -1)
+    search_cache.forget(shayari_id)
     
     return {"message": "Shayari unliked successfully"}
 
@@ -2611,6 +2859,8 @@ async def share_shayari(shayari_id: str, current_user: User = Depends(get_curren
         {"id": shayari_id},
         {"$inc": {"shares": 1}}
     )
+    search_engine.adjust(shayari_id, "shares", 1)
+    search_cache.forget(shayari_id)
     
     # Log activity
     activity = UserActivity(
@@ -2633,6 +2883,8 @@ async def view_shayari(shayari_id: str, current_user: User = Depends(get_current
         {"id": shayari_id},
         {"$inc": {"views": 1}}
     )
+    search_engine.adjust(shayari_id, "views", 1)
+    search_cache.forget(shayari_id)
     
     # Log activity (only if not the author viewing their own shayari)
     shayari = await db.shayaris.find_one({"id": shayari_id}, {"_id": 0})
@@ -2728,6 +2980,7 @@ async def feature_shayari(shayari_id: str, admin_user: User = Depends(get_admin_
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Shayari not found")
+    search_cache.forget(shayari_id)
     
     return {"message": "Shayari featured successfully"}
 
@@ -2743,10 +2996,112 @@ async def unfeature_shayari(shayari_id: str, admin_user: User = Depends(get_admi
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Shayari not found")
+    search_cache.forget(shayari_id)
     
     return {"message": "Shayari unfeatured successfully"}
 
 # Search endpoints
+# Relevance = text score from the weighted text index (scripts/create_indexes.py),
+# boosted by log-scaled engagement so popular matches rank above obscure ones
+SEARCH_ENGAGEMENT_WEIGHT = float(os.environ.get('SEARCH_ENGAGEMENT_WEIGHT', '0.25'))
+TEXT_INDEX_MISSING = 27  # IndexNotFound: $text without a text index
+
+# In-process BM25 index (backend/search_engine.py); rebuilt from Mongo on this interval
+SEARCH_ENGINE_ENABLED = os.environ.get('SEARCH_ENGINE_ENABLED', 'true').lower() == 'true'
+SEARCH_ENGINE_REBUILD_SECONDS = float(os.environ.get('SEARCH_ENGINE_REBUILD_SECONDS', '900'))
+
+search_engine = SearchEngine(
+    db.shayaris,
+    engagement_weight=SEARCH_ENGAGEMENT_WEIGHT,
+    rebuild_interval=SEARCH_ENGINE_REBUILD_SECONDS
+)
+autocomplete = Autocomplete(db.users, db.shayaris, rebuild_interval=SEARCH_ENGINE_REBUILD_SECONDS)
+
+# Short-lived result id and document cache for repeated searches (backend/search_cache.py); TTL 0 disables it
+SEARCH_CACHE_TTL_SECONDS = float(os.environ.get('SEARCH_CACHE_TTL_SECONDS', '30'))
+SEARCH_CACHE_MAX_RESULTS = int(os.environ.get('SEARCH_CACHE_MAX_RESULTS', '2000'))
+SEARCH_CACHE_MAX_DOCUMENTS = int(os.environ.get('SEARCH_CACHE_MAX_DOCUMENTS', '10000'))
+
+search_cache = SearchResultCache(
+    ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+    max_results=SEARCH_CACHE_MAX_RESULTS,
+    max_documents=SEARCH_CACHE_MAX_DOCUMENTS
+)
+
+# Popular searches: decayed per-query counters (backend/search_stats.py)
+SEARCH_POPULAR_HALF_LIFE_HOURS = float(os.environ.get('SEARCH_POPULAR_HALF_LIFE_HOURS', '72'))
+SEARCH_POPULAR_WINDOW_DAYS = int(os.environ.get('SEARCH_POPULAR_WINDOW_DAYS', '7'))
+
+search_query_stats = SearchQueryStats(
+    db.search_query_stats,
+    half_life_hours=SEARCH_POPULAR_HALF_LIFE_HOURS,
+    window_days=SEARCH_POPULAR_WINDOW_DAYS
+)
+
+# Recent searches: one capped, deduplicated list per user, written by a background worker (backend/search_history.py)
+SEARCH_HISTORY_MAX_ENTRIES = int(os.environ.get('SEARCH_HISTORY_MAX_ENTRIES', '50'))
+
+search_history = SearchHistoryRecorder(
+    db.user_search_history,
+    db.user_activities,
+    search_query_stats,
+    max_entries=SEARCH_HISTORY_MAX_ENTRIES
+)
+
+# Trending tags: per-tag counters adjusted on shayari writes (backend/tag_stats.py)
+TAG_TRENDING_WINDOW_DAYS = int(os.environ.get('TAG_TRENDING_WINDOW_DAYS', '7'))
+
+tag_stats = TagStats(db.tag_stats, window_days=TAG_TRENDING_WINDOW_DAYS)
+
+async def refresh_writer_completion(user_id: str):
+    """Re-read a user after a name or role change so writer completions follow it"""
+    user = await db.users.find_one({"id": user_id}, Autocomplete.USER_PROJECTION)
+    if user:
+        autocomplete.set_writer(user)
+    else:
+        autocomplete.remove_writer(user_id)
+
+async def find_shayaris_in_engine(q: str, author: str, tag_list: List[str], sort_by: str, limit: int) -> Optional[list]:
+    """Rank with the in-process index and load the hits in one indexed lookup; None until the index is built"""
+    if not search_engine.ready:
+        return None
+    return await hydrate_shayaris(search_engine.search(q, limit, author, tag_list, sort_by))
+
+async def hydrate_shayaris(ids: List[str]) -> list:
+    """Shayaris in `ids` order, from the search document cache and one indexed lookup for the rest"""
+    found = search_cache.get_documents(ids)
+    missing = [shayari_id for shayari_id in ids if shayari_id not in found]
+    if missing:
+        loaded = await db.shayaris.find({"id": {"$in": missing}}, SEARCH_PROJECTION).to_list(len(missing))
+        search_cache.put_documents(loaded)
+        found.update((shayari["id"], shayari) for shayari in loaded)
+    return [found[shayari_id] for shayari_id in ids if shayari_id in found]
+
+async def find_shayaris_by_keys(q: str, filters: dict, sort_by: str, limit: int) -> list:
+    """Spelling- and script-insensitive match on the phonetic searchKeys (one multikey index lookup)"""
+    keys = phonetic_keys(q)
+    if not keys:
+        return []
+    query = and_query(phonetic_shayari_query(keys), filters)
+    return await db.shayaris.find(query, SEARCH_PROJECTION).sort(sort_order(sort_by)).limit(limit).to_list(limit)
+
+async def find_shayaris_by_text(q: str, filters: dict, sort_by: str, limit: int) -> list:
+    try:
+        shayaris = await db.shayaris.aggregate(
+            text_search_pipeline(q, filters, sort_by, limit, SEARCH_ENGAGEMENT_WEIGHT)
+        ).to_list(limit)
+        # Nothing matched as spelled: "dil ki baatein" may be written "दिल की बातें"
+        return shayaris or await find_shayaris_by_keys(q, filters, sort_by, limit)
+    except OperationFailure as e:
+        if e.code != TEXT_INDEX_MISSING:
+            raise
+        logger.warning("⚠️ Shayari text index missing - falling back to regex search (run scripts/create_indexes.py)")
+    shayaris = await find_shayaris_by_keys(q, filters, sort_by, limit)
+    if shayaris:
+        return shayaris
+    query = and_query(regex_shayari_query(q), filters)
+    return await db.shayaris.find(query, SEARCH_PROJECTION).sort(sort_order(sort_by)).limit(limit).to_list(limit)
+
 @api_router.get("/search")
 async def search_content(
     q: str = "",
@@ -2760,39 +3115,58 @@ async def search_content(
     search_term = q.strip()
     
     # Search shayaris
-    shayari_query = {
-        "$or": [
-            {"title": {"$regex": search_term, "$options": "i"}},
-            {"content": {"$regex": search_term, "$options": "i"}},
-            {"authorName": {"$regex": search_term, "$options": "i"}},
-            {"authorUsername": {"$regex": search_term, "$options": "i"}}
-        ]
-    }
-    
-    shayaris_cursor = db.shayaris.find(shayari_query, {"_id": 0}).limit(limit)
-    shayaris = await shayaris_cursor.to_list(length=limit)
-    
-    # Search writers
-    writer_query = {
-        "$or": [
-            {"username": {"$regex": search_term, "$options": "i"}},
-            {"firstName": {"$regex": search_term, "$options": "i"}},
-            {"lastName": {"$regex": search_term, "$options": "i"}}
-        ],
-        "role": {"$in": ["writer", "admin"]}
-    }
-    
-    writers_cursor = db.users.find(
-        writer_query, 
-        {"_id": 0, "password": 0, "emailVerificationToken": 0, "adminSecret": 0}
-    ).limit(limit)
-    writers = await writers_cursor.to_list(length=limit)
+    shayaris = await find_shayaris_in_engine(search_term, "", [], "relevance", limit)
+    if shayaris is None:
+        shayaris = await find_shayaris_by_text(search_term, {}, "relevance", limit)
+    
+    # Search writers (a word of the username or name starting with the term)
+    writers = []
+    writers_filter = writer_query(search_term)
+    if writers_filter:
+        writers_cursor = db.users.find(
+            writers_filter, 
+            {"_id": 0, "password": 0, "emailVerificationToken": 0, "adminSecret": 0, "nameKeys": 0}
+        ).limit(limit)
+        writers = await writers_cursor.to_list(length=limit)
     
     return {
         "shayaris": shayaris,
         "writers": writers
     }
 
+@api_router.get("/search/autocomplete")
+async def search_autocomplete(q: str = "", limit: int = 5, user_id: str = Depends(get_token_user_id)):
+    """Prefix completions for writers, tags and titles, answered from memory on every keystroke"""
+    limit = max(1, min(limit, 10))
+    if autocomplete.ready:
+        completions = autocomplete.complete(q, limit)
+    else:
+        completions = await mongo_completions(q, limit)
+    return {"query": q, "ready": autocomplete.ready, **completions}
+
+async def mongo_completions(q: str, limit: int) -> dict:
+    """Indexed prefix lookups used until the in-memory completion index is built (no titles)"""
+    results = {"writers": [], "tags": [], "titles": []}
+    query = writer_query(q)
+    if not query:
+        return results
+    writers = await db.users.find(
+        query, {"_id": 0, "id": 1, "username": 1, "firstName": 1, "lastName": 1}
+    ).limit(limit).to_list(limit)
+    results["writers"] = [
+        {
+            "id": w["id"],
+            "username": w.get("username"),
+            "name": f"{w.get('firstName') or ''} {w.get('lastName') or ''}".strip()
+        }
+        for w in writers
+    ]
+    tag_prefix = q.strip()[:MAX_TERM_LENGTH]
+    results["tags"] = await db.tag_stats.find(
+        {"tag": {"$regex": "^" + re.escape(tag_prefix)}}, {"_id": 0, "tag": 1, "count": 1}
+    ).sort("count", -1).limit(limit).to_list(limit)
+    return results
+
 @api_router.get("/search/shayaris")
 async def search_shayaris(
     q: str = "",
@@ -2802,45 +3176,32 @@ async def search_shayaris(
     limit: int = 20,
     current_user: User = Depends(get_current_user)
 ):
-    # Build search query
-    search_query = {}
-    
-    if q:
-        search_query["$or"] = [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"content": {"$regex": q, "$options": "i"}},
-            {"authorName": {"$regex": q, "$options": "i"}},
-            {"authorUsername": {"$regex": q, "$options": "i"}}
-        ]
-    
-    if author:
-        search_query["$or"] = [
-            {"authorName": {"$regex": author, "$options": "i"}},
-            {"authorUsername": {"$regex": author, "$options": "i"}}
-        ]
-    
-    if tags:
-        tag_list = [tag.strip() for tag in tags.split(",")]
-        search_query["tags"] = {"$in": tag_list}
-    
-    # Determine sort order
-    sort_order = []
-    if sort_by == "date":
-        sort_order = [("createdAt", -1)]
-    elif sort_by == "likes":
-        sort_order = [("likes", -1)]
-    elif sort_by == "views":
-        sort_order = [("views", -1)]
-    else:  # relevance (default)
-        sort_order = [("likes", -1), ("views", -1), ("createdAt", -1)]
-    
-    shayaris = await db.shayaris.find(search_query, {"_id": 0}).sort(sort_order).limit(limit).to_list(limit)
+    # Build search filters (the text query itself is matched via $text)
+    q = q.strip()
+    tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    search_query = shayari_filters(author, tag_list)
+    
+    # Repeated searches reuse the ranked ids of a recent identical search
+    cache_key = search_cache.key(q, author, tag_list, sort_by, limit)
+    cached_ids = search_cache.get_ids(cache_key)
+    if cached_ids is not None:
+        shayaris = await hydrate_shayaris(cached_ids)
+    else:
+        generation = search_cache.generation
+        if q:
+            shayaris = await find_shayaris_in_engine(q, author, tag_list, sort_by, limit)
+            if shayaris is None:
+                shayaris = await find_shayaris_by_text(q, search_query, sort_by, limit)
+        else:
+            # Without a text query there is no text score; relevance means engagement
+            shayaris = await db.shayaris.find(search_query, SEARCH_PROJECTION).sort(sort_order(sort_by)).limit(limit).to_list(limit)
+        search_cache.put_results(cache_key, shayaris, generation)
     
     for s in shayaris:
         if isinstance(s['createdAt'], str):
             s['createdAt'] = datetime.fromisoformat(s['createdAt'])
     
-    # Log search activity
+    # Log search activity and history (only searches with a query) in the background
     activity = UserActivity(
         userId=current_user.id,
         action="search",
@@ -2850,54 +3211,97 @@ async def search_shayaris(
     )
     activity_doc = activity.model_dump()
     activity_doc['createdAt'] = activity_doc['createdAt'].isoformat()
-    await db.user_activities.insert_one(activity_doc)
-    
-    # Record search history
-    if q:  # Only record if there's an actual search query
-        search_record = SearchHistory(
-            userId=current_user.id,
-            query=q,
-            filters={"author": author, "tags": tags, "sort_by": sort_by},
-            resultsCount=len(shayaris)
-        )
-        search_doc = search_record.model_dump()
-        search_doc['createdAt'] = search_doc['createdAt'].isoformat()
-        await db.search_history.insert_one(search_doc)
+    search_history.submit(
+        activity_doc,
+        current_user.id,
+        q,
+        {"author": author, "tags": tags, "sort_by": sort_by},
+        len(shayaris)
+    )
     
     return shayaris
 
 # Analytics endpoints
+# Per-shayari analytics rows: counters and a content excerpt, never likedBy or AI output
+WRITER_ANALYTICS_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "tags": 1, "createdAt": 1, "isFeatured": 1,
+    "likes": {"$ifNull": ["$likes", 0]},
+    "views": {"$ifNull": ["$views", 0]},
+    "shares": {"$ifNull": ["$shares", 0]},
+    "content": {"$substrCP": [{"$ifNull": ["$content", ""]}, 0, 200]}
+}
+WRITER_ANALYTICS_SORTS = {
+    "date": {"createdAt": -1},
+    "likes": {"likes": -1, "createdAt": -1},
+    "views": {"views": -1, "createdAt": -1},
+    "shares": {"shares": -1, "createdAt": -1},
+    # Same ranking the analytics page used to compute client-side
+    "top": {"score": -1, "createdAt": -1},
+}
+
 @api_router.get("/analytics/writer")
-async def get_writer_analytics(current_user: User = Depends(get_current_user)):
+async def get_writer_analytics(
+    page: int = 1,
+    limit: int = 20,
+    sort_by: str = "date",  # date, likes, views, shares, top
+    current_user: User = Depends(get_current_user)
+):
+    """Writer totals plus one page of the per-shayari breakdown, computed in a single $group/$facet pass"""
     if current_user.role != "writer":
         raise HTTPException(status_code=403, detail="Only writers can access analytics")
     
-    # Get writer's shayaris with analytics
-    shayaris = await db.shayaris.find(
-        {"authorId": current_user.id}, 
-        {"_id": 0}
-    ).sort("createdAt", -1).to_list(1000)
-    
-    total_likes = sum(s.get('likes', 0) for s in shayaris)
-    total_views = sum(s.get('views', 0) for s in shayaris)
-    total_shares = sum(s.get('shares', 0) for s in shayaris)
+    page = max(1, page)
+    limit = max(1, min(limit, 100))
+    if sort_by not in WRITER_ANALYTICS_SORTS:
+        sort_by = "date"
+    
+    breakdown = []
+    if sort_by == "top":
+        breakdown.append({"$addFields": {"score": {"$add": [
+            {"$ifNull": ["$likes", 0]}, {"$multiply": [0.1, {"$ifNull": ["$views", 0]}]}
+        ]}}})
+    breakdown += [
+        {"$sort": WRITER_ANALYTICS_SORTS[sort_by]},
+        {"$skip": (page - 1) * limit},
+        {"$limit": limit},
+        {"$project": WRITER_ANALYTICS_PROJECTION}
+    ]
+    pipeline = [
+        {"$match": {"authorId": current_user.id}},
+        {"$facet": {
+            "totals": [{"$group": {
+                "_id": None,
+                "shayaris": {"$sum": 1},
+                "likes": {"$sum": {"$ifNull": ["$likes", 0]}},
+                "views": {"$sum": {"$ifNull": ["$views", 0]}},
+                "shares": {"$sum": {"$ifNull": ["$shares", 0]}}
+            }}],
+            "shayaris": breakdown
+        }}
+    ]
+    result = (await db.shayaris.aggregate(pipeline).to_list(1))[0]
+    totals = result["totals"][0] if result["totals"] else {"shayaris": 0, "likes": 0, "views": 0, "shares": 0}
     
     # Get follower count
     follower_count = await db.follows.count_documents({"followingId": current_user.id})
     
-    # Get recent activities on writer's content
+    # Get recent activities on writer's content (indexed on metadata.authorId + createdAt)
     recent_activities = await db.user_activities.find(
         {"metadata.authorId": current_user.id},
         {"_id": 0}
     ).sort("createdAt", -1).limit(50).to_list(50)
     
     return {
-        "totalShayaris": len(shayaris),
-        "totalLikes": total_likes,
-        "totalViews": total_views,
-        "totalShares": total_shares,
+        "totalShayaris": totals["shayaris"],
+        "totalLikes": totals["likes"],
+        "totalViews": totals["views"],
+        "totalShares": totals["shares"],
         "followerCount": follower_count,
-        "shayaris": shayaris,
+        "shayaris": result["shayaris"],
+        "page": page,
+        "limit": limit,
+        "sortBy": sort_by,
+        "hasMore": page * limit < totals["shayaris"],
         "recentActivities": recent_activities
     }
 
@@ -2941,50 +3345,31 @@ async def get_reader_analytics(current_user: User = Depends(get_current_user)):
 # Phase 2 Features - Search History and Suggestions
 @api_router.get("/search/history")
 async def get_search_history(current_user: User = Depends(get_current_user)):
-    """Get user's search history"""
-    history = await db.search_history.find(
-        {"userId": current_user.id},
-        {"_id": 0}
-    ).sort("createdAt", -1).limit(20).to_list(20)
-    
-    return history
+    """Get user's search history (most recent first, one entry per query)"""
+    return await search_history.recent(current_user.id)
 
 @api_router.get("/search/suggestions")
 async def get_search_suggestions(current_user: User = Depends(get_current_user)):
     """Get search suggestions based on user's history and popular searches"""
     # Get user's recent searches
-    user_searches = await db.search_history.find(
-        {"userId": current_user.id},
-        {"_id": 0, "query": 1}
-    ).sort("createdAt", -1).limit(10).to_list(10)
+    user_searches = await search_history.recent(current_user.id, 10)
     
-    # Get popular search terms
-    pipeline = [
-        {"$group": {"_id": "$query", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 10}
-    ]
-    popular_searches = await db.search_history.aggregate(pipeline).to_list(10)
-    
-    # Get trending tags
-    tag_pipeline = [
-        {"$unwind": "$tags"},
-        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 10}
-    ]
-    trending_tags = await db.shayaris.aggregate(tag_pipeline).to_list(10)
+    # Get popular search terms (top of the decayed score index)
+    popular_searches = await search_query_stats.popular(10)
+    
+    # Get trending tags (top of the precomputed tag_stats index)
+    trending_tags = await tag_stats.trending(10)
     
     return {
         "recentSearches": [s["query"] for s in user_searches],
-        "popularSearches": [s["_id"] for s in popular_searches],
-        "trendingTags": [t["_id"] for t in trending_tags]
+        "popularSearches": [s["query"] for s in popular_searches],
+        "trendingTags": [t["tag"] for t in trending_tags]
     }
 
 @api_router.delete("/search/history")
 async def clear_search_history(current_user: User = Depends(get_current_user)):
     """Clear user's search history"""
-    await db.search_history.delete_many({"userId": current_user.id})
+    await search_history.clear(current_user.id)
     return {"message": "Search history cleared successfully"}
 
 # Offline Reading Features
@@ -2999,7 +3384,7 @@ async def get_offline_content(current_user: User = Depends(get_current_user)):
     # Get shayaris marked for offline reading
     shayaris = await db.shayaris.find(
         {"id": {"$in": preferences['offlineContent']}},
-        {"_id": 0}
+        SEARCH_PROJECTION
     ).to_list(1000)
     
     for s in shayaris:
@@ -3055,6 +3440,8 @@ async def share_to_whatsapp(shayari_id: str, current_user: User = Depends(get_cu
     
     # Record share
     await db.shayaris.update_one({"id": shayari_id}, {"$inc": {"shares": 1}})
+    search_engine.adjust(shayari_id, "shares", 1)
+    search_cache.forget(shayari_id)
     
     # Log activity
     activity = UserActivity(
@@ -3094,6 +3481,8 @@ async def share_to_social(shayari_id: str, platform: str, current_user: User = D
     
     # Record share
     await db.shayaris.update_one({"id": shayari_id}, {"$inc": {"shares": 1}})
+    search_engine.adjust(shayari_id, "shares", 1)
+    search_cache.forget(shayari_id)
     
     # Log activity
     activity = UserActivity(
@@ -3155,7 +3544,7 @@ async def get_active_spotlights(current_user: User = Depends(get_current_user)):
         if spotlight.get('featuredShayariIds'):
             shayaris = await db.shayaris.find(
                 {"id": {"$in": spotlight['featuredShayariIds']}},
-                {"_id": 0}
+                SEARCH_PROJECTION
             ).to_list(10)
             spotlight['featuredShayaris'] = shayaris
     
@@ -3197,7 +3586,7 @@ async def create_writer_spotlight(spotlight_data: WriterSpotlightCreate, admin_u
     )
     notif_doc = notif.model_dump()
     notif_doc['createdAt'] = notif_doc['createdAt'].isoformat()
-    await db.notifications.insert_one(notif_doc)
+    await store_notification(notif_doc)
     
     return spotlight
 
@@ -3246,7 +3635,7 @@ async def get_all_spotlights(
         if spotlight.get('featuredShayariIds'):
             shayaris = await db.shayaris.find(
                 {"id": {"$in": spotlight['featuredShayariIds']}},
-                {"_id": 0}
+                SEARCH_PROJECTION
             ).to_list(10)
             spotlight['featuredShayaris'] = shayaris
     
@@ -3268,19 +3657,31 @@ async def get_writer_spotlights(
         if spotlight.get('featuredShayariIds'):
             shayaris = await db.shayaris.find(
                 {"id": {"$in": spotlight['featuredShayariIds']}},
-                {"_id": 0}
+                SEARCH_PROJECTION
             ).to_list(10)
             spotlight['featuredShayaris'] = shayaris
     
     return spotlights
 
+@api_router.get("/notifications/vapid-public-key")
+async def get_vapid_public_key():
+    """Application server key browsers subscribe with"""
+    if not push_worker.enabled:
+        raise HTTPException(status_code=503, detail="Web push is not configured")
+    return {"publicKey": push_worker.signer.public_key}
+
 @api_router.post("/notifications/subscribe")
 async def subscribe_to_push(subscription_data: dict, current_user: User = Depends(get_current_user)):
     """Subscribe user to push notifications"""
+    keys = subscription_data.get('keys') or {}
+    if not subscription_data.get('endpoint') or not keys.get('p256dh') or not keys.get('auth'):
+        raise HTTPException(status_code=400, detail="Subscription endpoint and keys are required")
     subscription = PushSubscription(
         userId=current_user.id,
         endpoint=subscription_data['endpoint'],
-        keys=subscription_data['keys']
+        p256dh=keys['p256dh'],
+        auth=keys['auth'],
+        userAgent=subscription_data.get('userAgent')
     )
     
     # Remove existing subscription for this user
@@ -3299,179 +3700,189 @@ async def unsubscribe_from_push(current_user: User = Depends(get_current_user)):
     result = await db.push_subscriptions.delete_many({"userId": current_user.id})
     return {"message": f"Unsubscribed from push notifications ({result.deleted_count} subscriptions removed)"}
 
+@api_router.post("/admin/notifications/reconcile-unread")
+async def reconcile_unread_notification_counts(admin_user: User = Depends(get_admin_user)):
+    """Admin endpoint: recount unread notifications now instead of waiting for the periodic job"""
+    return await unread_counters.reconcile()
+
+@api_router.get("/admin/notifications/fanout")
+async def get_notification_fanout_stats(admin_user: User = Depends(get_admin_user)):
+    """Admin endpoint: progress of running and recent notification fan-outs"""
+    return {"chunkSize": NOTIFICATION_FANOUT_CHUNK_SIZE, **notification_fanout.stats()}
+
+@api_router.get("/admin/email-outbox")
+async def get_email_outbox_stats(admin_user: User = Depends(get_admin_user)):
+    """Admin endpoint: queued, sent and failed transactional emails"""
+    return await email_outbox.stats()
+
+@api_router.get("/admin/http-client")
+async def get_http_client_stats(admin_user: User = Depends(get_admin_user)):
+    """Admin endpoint: outbound HTTP pool usage, connection reuse and latency per host"""
+    return http_client.stats()
+
+@api_router.get("/admin/search-engine")
+async def get_search_engine_stats(admin_user: User = Depends(get_admin_user)):
+    """Admin endpoint: in-process search and autocomplete index sizes and latency, search cache hit rates, history writer"""
+    return {
+        **search_engine.stats(),
+        "autocomplete": autocomplete.stats(),
+        "resultCache": search_cache.stats(),
+        "history": search_history.stats()
+    }
+
+@api_router.post("/admin/search-engine/rebuild")
+async def rebuild_search_engine(admin_user: User = Depends(get_admin_user)):
+    """Admin endpoint: rebuild the in-process search and autocomplete indexes from MongoDB now"""
+    return {**await search_engine.rebuild(), "autocomplete": await autocomplete.rebuild()}
+
 @api_router.post("/admin/notifications/broadcast")
 async def broadcast_notification(notification_data: dict, admin_user: User = Depends(get_admin_user)):
-    """Admin endpoint to broadcast notifications to all users"""
+    """Admin endpoint to broadcast notifications to all users
+    
+    Users are streamed by cursor and written in chunks by a background job; follow its
+    progress with GET /admin/notifications/broadcasts/{id}.
+    """
     message = notification_data.get('message', '')
     notification_type = notification_data.get('type', 'announcement')
     
     if not message:
         raise HTTPException(status_code=400, detail="Message is required")
     
-    # Get all users
-    users = await db.users.find({}, {"_id": 0, "id": 1}).to_list(10000)
-    
-    # Create notifications for all users
-    notifications = []
-    for user in users:
-        notif = Notification(
-            userId=user['id'],
-            message=message,
-            type=notification_type
-        )
-        notif_doc = notif.model_dump()
-        notif_doc['createdAt'] = notif_doc['createdAt'].isoformat()
-        notifications.append(notif_doc)
+    job = FanoutJob("broadcast")
+    estimated_recipients = await db.users.estimated_document_count()
+    now = job.created_at.isoformat()
+    broadcast_doc = {
+        "id": job.id,
+        "message": message,
+        "type": notification_type,
+        "createdBy": admin_user.id,
+        "status": "running",
+        "estimatedRecipients": estimated_recipients,
+        "recipients": 0,
+        "inserted": 0,
+        "failed": 0,
+        "lastRecipientId": None,
+        "heartbeatAt": now,
+        "createdAt": now
+    }
+    await db.broadcasts.insert_one(broadcast_doc)
     
-    if notifications:
-        await db.notifications.insert_many(notifications)
+    start_broadcast(job, broadcast_doc)
     
-    return {"message": f"Broadcast notification sent to {len(notifications)} users"}
+    return {
+        "message": f"Broadcast started for about {estimated_recipients} users",
+        "broadcastId": job.id,
+        "estimatedRecipients": estimated_recipients
+    }
 
-async def translate_with_gemini(text: str, from_lang: str, to_lang: str) -> str:
-    """
-    Translate text using Google Gemini AI with specialized prompts for poetry translation
+def start_broadcast(job: FanoutJob, broadcast: dict):
+    """Fan a broadcast out to the users after its lastRecipientId, in id order"""
+    template = Notification(
+        userId="",
+        message=broadcast["message"],
+        type=broadcast["type"]
+    ).model_dump(exclude={"id", "userId", "isRead", "createdAt"})
+    query = {"id": {"$gt": broadcast["lastRecipientId"]}} if broadcast.get("lastRecipientId") else {}
+    users = db.users.find(query, {"_id": 0, "id": 1}).sort("id", 1).batch_size(NOTIFICATION_FANOUT_CHUNK_SIZE)
+    notification_fanout.start(job, run_broadcast(job, field_values(users, "id"), template))
+
+async def resume_broadcasts() -> int:
+    """Claim and restart broadcasts left behind by a stopped or crashed worker
+
+    They continue after the last saved recipient, so at most the chunk in flight
+    when the worker died is delivered twice.
     """
-    if not GEMINI_API_KEY:
-        raise Exception("Gemini API key not configured")
-    
-    import google.generativeai as genai
-    
-    # Configure Gemini
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-2.0-flash')
-    
-    # Create specialized prompt for poetry translation
-    if from_lang.lower() == "hinglish" and to_lang.lower() == "hindi":
-        prompt = f"""Translate the following Hinglish shayari to Hindi. Do not explain. Return only the translated shayari in Hindi with poetic feel.
-
-"{text}"
-
-Guidelines:
-- Maintain the poetic essence and emotional depth
-- Preserve the rhythm and meter where possible
-- Use appropriate Hindi/Urdu vocabulary for poetry
-- Keep the cultural context intact
-- Convert Roman script to Devanagari script properly"""
-    else:
-        prompt = f"Translate the following text from {from_lang} to {to_lang}. Maintain the tone and cultural context. Return only the translated text:\n\n{text}"
+    resumed = 0
+    while True:
+        now = datetime.now(timezone.utc)
+        stale_before = (now - timedelta(seconds=BROADCAST_STALE_SECONDS)).isoformat()
+        # The heartbeat update is the claim: only one worker can move a given broadcast back to running
+        broadcast = await db.broadcasts.find_one_and_update(
+            {"$or": [
+                {"status": "interrupted"},
+                {"status": "running", "heartbeatAt": {"$lt": stale_before}}
+            ]},
+            {"$set": {"status": "running", "heartbeatAt": now.isoformat()}, "$inc": {"resumeCount": 1}},
+            projection={"_id": 0}
+        )
+        if broadcast is None:
+            return resumed
+        job = FanoutJob("broadcast")
+        job.id = broadcast["id"]
+        job.recipients = broadcast.get("recipients", 0)
+        job.inserted = broadcast.get("inserted", 0)
+        job.failed = broadcast.get("failed", 0)
+        job.last_recipient = broadcast.get("lastRecipientId")
+        start_broadcast(job, broadcast)
+        resumed += 1
+        logger.info(f"📣 Resumed broadcast {job.id} after {job.recipients} recipients")
+
+async def run_broadcast(job: FanoutJob, recipients, template: dict):
+    """Fan a broadcast out in chunks, saving progress and the resume point to its broadcasts document"""
+    async def deliver_and_record(notif_docs: List[dict]):
+        await deliver_notification_chunk(notif_docs)
+        await db.broadcasts.update_one(
+            {"id": job.id},
+            {"$set": {
+                "recipients": job.recipients,
+                "inserted": job.inserted,
+                "failed": job.failed,
+                "lastRecipientId": job.last_recipient,
+                "heartbeatAt": datetime.now(timezone.utc).isoformat()
+            }}
+        )
     
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    
-    except Exception as e:
-        logger.error(f"Gemini translation error: {str(e)}")
-        raise Exception(f"Gemini translation failed: {str(e)}")
+        await fan_out(
+            db.notifications,
+            recipients,
+            template,
+            job,
+            tracker=notification_fanout,
+            chunk_size=NOTIFICATION_FANOUT_CHUNK_SIZE,
+            on_chunk=deliver_and_record
+        )
+    finally:
+        # Cancelled means this worker is shutting down; another worker (or the restart) resumes it
+        await db.broadcasts.update_one(
+            {"id": job.id},
+            {"$set": {
+                "status": "interrupted" if job.status == "cancelled" else job.status,
+                "recipients": job.recipients,
+                "inserted": job.inserted,
+                "failed": job.failed,
+                "lastRecipientId": job.last_recipient,
+                "error": job.error,
+                "durationSeconds": round(job.duration or 0, 3),
+                "completedAt": datetime.now(timezone.utc).isoformat()
+            }}
+        )
 
-async def translate_with_openai(text: str, from_lang: str, to_lang: str) -> str:
-    """
-    Translate text using OpenAI GPT with specialized prompts for poetry translation (fallback)
-    """
-    client = get_openai_client()
-    if not client:
-        raise Exception("OpenAI client not configured")
-    
-    # Create specialized prompt for poetry translation
-    if from_lang.lower() == "hinglish" and to_lang.lower() == "hindi":
-        system_prompt = """You are an expert translator specializing in Hinglish to Hindi translation for poetry and shayari. 
-        Your task is to translate Hinglish text (Hindi written in Roman script mixed with English words) to proper Hindi in Devanagari script.
-        
-        Guidelines:
-        1. Maintain the poetic essence and emotional depth
-        2. Preserve the rhythm and meter where possible
-        3. Use appropriate Hindi/Urdu vocabulary for poetry
-        4. Keep the cultural context intact
-        5. If some words are already in Hindi/Devanagari, keep them as is
-        6. For English words that have Hindi equivalents, use the Hindi version
-        7. For English words commonly used in Hinglish poetry, you may keep them if they add to the poetic effect
-        
-        Return ONLY the translated text, nothing else."""
-        
-        user_prompt = f"Translate this Hinglish poetry/shayari to Hindi:\n\n{text}"
+@api_router.get("/admin/notifications/broadcasts")
+async def get_broadcasts(limit: int = 20, admin_user: User = Depends(get_admin_user)):
+    """Admin endpoint: recent broadcasts with their delivery progress"""
+    broadcasts = await db.broadcasts.find({}, {"_id": 0}).sort("createdAt", -1).limit(limit).to_list(limit)
+    return {"broadcasts": broadcasts}
+
+@api_router.get("/admin/notifications/broadcasts/{broadcast_id}")
+async def get_broadcast_progress(broadcast_id: str, admin_user: User = Depends(get_admin_user)):
+    """Admin endpoint: delivery progress of one broadcast"""
+    broadcast = await db.broadcasts.find_one({"id": broadcast_id}, {"_id": 0})
+    if not broadcast:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    
+    estimated = broadcast.get("estimatedRecipients") or 0
+    if broadcast["status"] == "completed":
+        broadcast["progress"] = 100.0
     else:
-        system_prompt = f"You are a professional translator. Translate the given text from {from_lang} to {to_lang}. Maintain the tone, style, and cultural context. Return ONLY the translated text."
-        user_prompt = f"Translate: {text}"
-    
-    try:
-        response = await client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=500,
-            temperature=0.3,  # Lower temperature for more consistent translations
-            top_p=0.9
-        )
-        
-        return response.choices[0].message.content.strip()
-    
-    except Exception as e:
-        logger.error(f"OpenAI translation error: {str(e)}")
-        raise Exception(f"OpenAI translation failed: {str(e)}")
+        broadcast["progress"] = round(min(99.9, 100.0 * broadcast["recipients"] / estimated), 1) if estimated else 0.0
+    return broadcast
 
 async def fallback_rule_based_translation(text: str) -> str:
     """
-    Enhanced fallback rule-based translation for when OpenAI is not available
+    Rule-based Hinglish to Devanagari transliteration for when no AI provider is available
     """
-    # Enhanced translation mapping for common Hinglish to Hindi words
-    translation_map = {
-        # Common words
-        "dil": "दिल", "pyaar": "प्यार", "mohabbat": "मोहब्बत", "ishq": "इश्क",
-        "zindagi": "जिंदगी", "sapna": "सपना", "khwab": "ख्वाब", "yaad": "याद",
-        "gham": "गम", "khushi": "खुशी", "aansu": "आंसू", "muskaan": "मुस्कान",
-        "hasna": "हंसना", "rona": "रोना", "dekha": "देखा", "suna": "सुना",
-        "kaha": "कहा", "aaya": "आया", "gaya": "गया", "tha": "था",
-        "hai": "है", "hoon": "हूं", "tum": "तुम", "main": "मैं",
-        "woh": "वो", "yeh": "यह", "kya": "क्या", "kaise": "कैसे",
-        "kyun": "क्यों", "kahan": "कहां", "kab": "कब", "kaun": "कौन",
-        "aur": "और", "ya": "या", "lekin": "लेकिन", "par": "पर",
-        "se": "से", "mein": "में", "pe": "पे", "ke": "के",
-        "ki": "की", "ka": "का", "ko": "को", "ne": "ने",
-        "bhi": "भी", "to": "तो", "hi": "ही", "na": "ना",
-        "nahi": "नहीं", "haan": "हां", "ji": "जी", "sahab": "साहब",
-        "baat": "बात", "kaam": "काम", "ghar": "घर", "paani": "पानी",
-        "khana": "खाना", "sona": "सोना", "uthna": "उठना", "jana": "जाना",
-        "aana": "आना", "milna": "मिलना", "samay": "समय", "waqt": "वक्त",
-        "din": "दिन", "raat": "रात", "subah": "सुबह", "shaam": "शाम",
-        "chand": "चांद", "sitare": "सितारे", "suraj": "सूरज", "hawa": "हवा",
-        "baarish": "बारिश", "phool": "फूल", "rang": "रंग", "awaaz": "आवाज",
-        "chehre": "चेहरे", "nazar": "नजर", "nigah": "निगाह", "raah": "राह",
-        "safar": "सफर", "manzil": "मंजिल", "umang": "उमंग", "josh": "जोश",
-        "junoon": "जुनून", "deewana": "दीवाना", "pagal": "पागल", "bewafa": "बेवफा",
-        "wafadar": "वफादार", "sachha": "सच्चा", "jhootha": "झूठा", "accha": "अच्छा",
-        "bura": "बुरा", "sundar": "सुंदर", "khoobsurat": "खूबसूरत",
-        # Additional poetry-specific words
-        "dard": "दर्द", "sukoon": "सुकून", "intezaar": "इंतज़ार", "judaai": "जुदाई",
-        "mulakat": "मुलाकात", "hasrat": "हसरत", "tamanna": "तमन्ना", "arman": "अरमान",
-        "khayaal": "ख्याल", "ehsaas": "एहसास", "jazbaat": "जज्बात", "khamoshi": "खामोशी",
-        "tanhai": "तन्हाई", "udaasi": "उदासी", "pareshani": "परेशानी", "musibat": "मुसीबत",
-        "khwahish": "ख्वाहिश", "arzoo": "आरज़ू", "chahat": "चाहत"
-    }
-    
-    # Simple word-by-word translation with better punctuation handling
-    words = text.split()
-    translated_words = []
-    
-    for word in words:
-        # Extract punctuation
-        punctuation = ""
-        clean_word = word
-        for char in ".,!?;:\"'()[]{}":
-            if word.endswith(char):
-                punctuation = char + punctuation
-                clean_word = clean_word[:-1]
-        
-        # Check if word exists in translation map
-        if clean_word.lower() in translation_map:
-            translated_word = translation_map[clean_word.lower()]
-            translated_words.append(translated_word + punctuation)
-        else:
-            # Keep original word if no translation found
-            translated_words.append(word)
-    
-    return ' '.join(translated_words)
+    return transliterate(text)
 
 # Bookmark Endpoints
 @api_router.post("/bookmarks")
@@ -0,0 +1,147 @@
+"""
+Tag statistics for रामा (Raama) backend
+One document per tag in `tag_stats` holds how many shayaris carry it, a
+per-day bucket of shayaris created with it and `recentCount`, the sum of the
+buckets inside the trending window. The shayari write endpoints adjust the
+counters by tag diff, so trending tags are a top-N read on the
+(recentCount, count) index instead of an $unwind over every shayari.
+
+A periodic rollover takes expired day buckets out of `recentCount`; each step
+only applies while the bucket still holds the value it read, so rollovers from
+several workers never subtract twice. scripts/rebuild_tag_stats.py recomputes
+everything from the shayaris collection.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Union
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+def day_of(created_at: Union[str, datetime, None]) -> Optional[str]:
+    """YYYY-MM-DD bucket for a shayari's createdAt (stored as ISO string or datetime)"""
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo:
+            created_at = created_at.astimezone(timezone.utc)
+        return created_at.strftime("%Y-%m-%d")
+    if isinstance(created_at, str) and len(created_at) >= 10:
+        return created_at[:10]
+    return None
+
+
+def clean_tags(tags: Optional[Iterable[str]]) -> set:
+    return {tag for tag in tags or () if isinstance(tag, str) and tag}
+
+
+class TagStats:
+    """Per-tag counters kept current by the shayari write endpoints"""
+
+    def __init__(self, collection, window_days: int = 7, rollover_interval: float = 3600):
+        self.collection = collection
+        self.window_days = window_days
+        self.rollover_interval = rollover_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def window_start(self, now: Optional[datetime] = None) -> str:
+        now = now or datetime.now(timezone.utc)
+        return (now - timedelta(days=self.window_days - 1)).strftime("%Y-%m-%d")
+
+    async def adjust(self, added: Iterable[str] = (), removed: Iterable[str] = (), created_at=None):
+        """Count `added` tags onto and `removed` tags off one shayari created at `created_at`"""
+        added, removed = clean_tags(added), clean_tags(removed)
+        day = day_of(created_at)
+        deltas = Counter()
+        for tag in added - removed:
+            deltas[(tag, day)] += 1
+        for tag in removed - added:
+            deltas[(tag, day)] -= 1
+        await self._apply(deltas)
+
+    async def add_shayari(self, shayari: dict):
+        await self.adjust(added=shayari.get("tags"), created_at=shayari.get("createdAt"))
+
+    async def remove_shayaris(self, shayaris: Iterable[dict]):
+        """Uncount deleted shayaris in one bulk write"""
+        deltas = Counter()
+        for shayari in shayaris:
+            day = day_of(shayari.get("createdAt"))
+            for tag in clean_tags(shayari.get("tags")):
+                deltas[(tag, day)] -= 1
+        await self._apply(deltas)
+
+    async def _apply(self, deltas: Counter):
+        """$inc the counters for (tag, creation day) deltas; days inside the window also count as recent"""
+        window_start = self.window_start()
+        now = datetime.now(timezone.utc)
+        incs: Dict[str, Counter] = {}
+        for (tag, day), delta in deltas.items():
+            if not delta:
+                continue
+            inc = incs.setdefault(tag, Counter(count=0, recentCount=0))
+            inc["count"] += delta
+            if day is not None and day >= window_start:
+                inc["recentCount"] += delta
+                inc[f"daily.{day}"] += delta
+        if not incs:
+            return
+        await self.collection.bulk_write([
+            UpdateOne({"tag": tag}, {"$inc": dict(inc), "$set": {"updatedAt": now}}, upsert=True)
+            for tag, inc in incs.items()
+        ], ordered=False)
+        emptied = [tag for tag, inc in incs.items() if inc["count"] < 0]
+        if emptied:
+            await self.collection.delete_many({"tag": {"$in": emptied}, "count": {"$lte": 0}})
+
+    async def trending(self, limit: int = 10) -> List[dict]:
+        """Tags with the most new shayaris in the window, then the most shayaris overall"""
+        return await self.collection.find(
+            {}, {"_id": 0, "tag": 1, "count": 1, "recentCount": 1}
+        ).sort([("recentCount", -1), ("count", -1)]).limit(limit).to_list(limit)
+
+    async def roll_over(self, now: Optional[datetime] = None) -> int:
+        """Subtract day buckets that left the window from recentCount; returns buckets expired"""
+        window_start = self.window_start(now)
+        expired = 0
+        async for row in self.collection.find(
+            {"daily": {"$exists": True, "$ne": {}}}, {"_id": 0, "tag": 1, "daily": 1}
+        ):
+            for day, n in (row.get("daily") or {}).items():
+                if day >= window_start:
+                    continue
+                result = await self.collection.update_one(
+                    {"tag": row["tag"], f"daily.{day}": n},
+                    {"$inc": {"recentCount": -n}, "$unset": {f"daily.{day}": ""}}
+                )
+                expired += result.modified_count
+        return expired
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                expired = await self.roll_over()
+                if expired:
+                    logger.info(f"🏷️ Tag stats: {expired} day buckets left the trending window")
+                await asyncio.sleep(self.rollover_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Tag stats rollover failed: {str(e)}")
+                await asyncio.sleep(min(60, self.rollover_interval))
@@ -0,0 +1,243 @@
+"""
+Rule-based Hinglish to Devanagari transliteration for रामा (Raama) backend
+Used when no AI provider is configured, so it has to be fast enough to serve inline.
+Common English words in mixed text are left as written.
+Also derives script-neutral phonetic search keys, so "dil ki baatein" finds
+"दिल की बातें" with one indexed lookup.
+"""
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LEXICON_PATH = Path(__file__).parent / "data" / "hinglish_lexicon.json"
+
+# Single-regex tokenizer: runs of Latin letters (with inner apostrophes/hyphens)
+# are words, everything else (spaces, punctuation, Devanagari, digits) passes through
+TOKEN_RE = re.compile(r"([A-Za-z]+(?:['\-][A-Za-z]+)*)")
+INNER_WORD_RE = re.compile(r"[a-z]+")
+
+# Syllable rules for words missing from the lexicon. Longest Roman cluster wins.
+CONSONANTS = {
+    "chh": "छ", "kh": "ख", "gh": "घ", "ch": "च", "jh": "झ", "th": "थ", "dh": "ध",
+    "ph": "फ", "bh": "भ", "sh": "श", "ng": "ङ",
+    "k": "क", "g": "ग", "c": "क", "j": "ज", "t": "त", "d": "द", "n": "न",
+    "p": "प", "b": "ब", "m": "म", "y": "य", "r": "र", "l": "ल", "v": "व",
+    "w": "व", "s": "स", "h": "ह", "z": "ज़", "f": "फ़", "q": "क़", "x": "क्स",
+}
+VOWELS = {
+    # roman: (independent form, matra)
+    "aa": ("आ", "ा"), "ai": ("ऐ", "ै"), "au": ("औ", "ौ"), "ee": ("ई", "ी"),
+    "ii": ("ई", "ी"), "oo": ("ऊ", "ू"), "uu": ("ऊ", "ू"),
+    "a": ("अ", ""), "i": ("इ", "ि"), "u": ("उ", "ु"), "e": ("ए", "े"), "o": ("ओ", "ो"),
+}
+# Word-final short vowels are long in everyday Hinglish spelling (sapna, zindagi)
+FINAL_VOWELS = {"a": ("आ", "ा"), "i": ("ई", "ी")}
+HALANT = "्"
+SEMIVOWELS = {"y", "r", "v", "w"}
+ANUSVARA = "ं"
+
+_CLUSTER_RE = re.compile(
+    "|".join(sorted((re.escape(k) for k in list(CONSONANTS) + list(VOWELS)), key=len, reverse=True))
+)
+
+
+def _load_lexicon(path: Path) -> Tuple[Dict[str, str], Dict[Tuple[str, ...], str], int, frozenset]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    words = {k.lower(): v for k, v in data.get("words", {}).items()}
+    phrases = {tuple(k.lower().split()): v for k, v in data.get("phrases", {}).items()}
+    max_phrase_len = max((len(p) for p in phrases), default=1)
+    # Hinglish spellings win over English ones ("main", "the", "to")
+    english = frozenset(w.lower() for w in data.get("english", [])) - words.keys()
+    return words, phrases, max_phrase_len, english
+
+
+WORDS, PHRASES, MAX_PHRASE_LEN, ENGLISH_WORDS = _load_lexicon(LEXICON_PATH)
+PHRASE_STARTS = frozenset(p[0] for p in PHRASES)
+
+
+def _needs_halant(previous: str, cluster: str, index: int, last: int) -> bool:
+    """Whether two adjacent consonants form a conjunct instead of keeping the schwa"""
+    return (
+        index == 1  # word-initial cluster: pyaar, khwab
+        or index == last  # word-final cluster: dard, ishq
+        or cluster in SEMIVOWELS  # mitra, satya
+        or previous == cluster or previous + "h" == cluster  # doubled: bachcha, pakka
+    )
+
+
+@lru_cache(maxsize=50000)
+def transliterate_word(word: str) -> str:
+    """Transliterate one lowercase Roman word, lexicon first then syllable rules"""
+    hit = WORDS.get(word)
+    if hit is not None:
+        return hit
+    if not word or word[0] == "\0":
+        # Empty slot or an already-substituted phrase
+        return word[1:]
+    if word in ENGLISH_WORDS or "'" in word:
+        # English, or a contraction (don't, i'm) - leave the word alone
+        return word
+    if "-" in word:
+        return INNER_WORD_RE.sub(lambda m: transliterate_word(m.group(0)), word)
+
+    clusters = _CLUSTER_RE.findall(word)
+    if "".join(clusters) != word:
+        # Characters we have no rule for - leave the word alone
+        return word
+
+    out: List[str] = []
+    pending_consonant = False
+    last = len(clusters) - 1
+    for i, cluster in enumerate(clusters):
+        if cluster in CONSONANTS:
+            next_cluster = clusters[i + 1] if i < last else None
+            # Nasal after a vowel and before a different consonant becomes anusvara (rang -> रंग);
+            # a doubled nasal stays a conjunct (amma -> अम्मा)
+            if (cluster in ("n", "m") and i > 0 and clusters[i - 1] in VOWELS
+                    and next_cluster in CONSONANTS and next_cluster != cluster):
+                out.append(ANUSVARA)
+                pending_consonant = False
+                continue
+            if pending_consonant and _needs_halant(clusters[i - 1], cluster, i, last):
+                out.append(HALANT)
+            out.append(CONSONANTS[cluster])
+            pending_consonant = True
+        else:
+            independent, matra = (FINAL_VOWELS if i == last and i > 0 else VOWELS).get(cluster, VOWELS[cluster])
+            if pending_consonant:
+                out.append(matra)
+            else:
+                out.append(independent)
+            pending_consonant = False
+    return "".join(out)
+
+
+def transliterate(text: str) -> str:
+    """Transliterate Hinglish text to Devanagari, keeping punctuation, spacing and English words"""
+    if not text:
+        return text
+
+    # Words land on odd indices, the separators between them on even indices
+    parts = TOKEN_RE.split(text)
+    originals = parts[1::2]
+    words = [word.lower() for word in originals]
+    parts[1::2] = words
+
+    if not PHRASE_STARTS.isdisjoint(words):
+        _replace_phrases(parts)
+        words = parts[1::2]
+
+    # Words left untouched keep their original case
+    parts[1::2] = [
+        original if word and converted == word else converted
+        for original, word, converted in zip(originals, words, map(transliterate_word, words))
+    ]
+    return "".join(parts)
+
+
+def _replace_phrases(parts: List[str]):
+    """Longest-match multi-word phrases in place; consumed words become empty strings"""
+    n = len(parts)
+    i = 1
+    while i < n:
+        if parts[i] in PHRASE_STARTS:
+            # Collect the following words joined only by whitespace
+            words = [parts[i]]
+            j = i
+            while len(words) < MAX_PHRASE_LEN and j + 2 < n and parts[j + 1].isspace():
+                j += 2
+                words.append(parts[j])
+            while len(words) > 1:
+                phrase = PHRASES.get(tuple(words))
+                if phrase is not None:
+                    end = i + 2 * (len(words) - 1)
+                    parts[i] = "\0" + phrase
+                    for k in range(i + 1, end + 1):
+                        parts[k] = ""
+                    i = end
+                    break
+                words.pop()
+        i += 2
+
+
+def lexicon_stats() -> dict:
+    """Sizes of the loaded lexicon and the syllable-rule cache"""
+    info = transliterate_word.cache_info()
+    return {
+        "words": len(WORDS),
+        "phrases": len(PHRASES),
+        "cache_hits": info.hits,
+        "cache_misses": info.misses,
+        "cache_size": info.currsize,
+    }
+
+
+# Phonetic search keys. Both scripts are reduced to the same loose Roman
+# skeleton: every "a" sound is dropped (Devanagari leaves the schwa unwritten
+# and Hinglish spells it inconsistently), long and short vowels merge,
+# aspiration and nukta are ignored, and doubled letters collapse.
+# बातें / baatein -> "bten", ज़िंदगी / zindagi -> "jindgi".
+DEVANAGARI_KEYS = {
+    "अ": "", "आ": "", "इ": "i", "ई": "i", "उ": "u", "ऊ": "u", "ऋ": "ri",
+    "ए": "e", "ऐ": "e", "ऍ": "e", "ओ": "o", "औ": "o", "ऑ": "o",
+    "ा": "", "ि": "i", "ी": "i", "ु": "u", "ू": "u", "ृ": "ri",
+    "े": "e", "ै": "e", "ॅ": "e", "ो": "o", "ौ": "o", "ॉ": "o",
+    "ं": "n", "ँ": "n", "ः": "", "्": "", "़": "",
+    "क": "k", "ख": "k", "ग": "g", "घ": "g", "ङ": "n",
+    "च": "c", "छ": "c", "ज": "j", "झ": "j", "ञ": "n",
+    "ट": "t", "ठ": "t", "ड": "d", "ढ": "d", "ण": "n",
+    "त": "t", "थ": "t", "द": "d", "ध": "d", "न": "n",
+    "प": "p", "फ": "f", "ब": "b", "भ": "b", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v",
+    "श": "s", "ष": "s", "स": "s", "ह": "h",
+}
+ROMAN_KEYS = {
+    "chh": "c", "ch": "c", "sh": "s", "kh": "k", "gh": "g", "jh": "j", "th": "t",
+    "dh": "d", "ph": "f", "bh": "b",
+    "aa": "", "ai": "e", "ei": "e", "au": "o", "ee": "i", "ii": "i", "oo": "u", "uu": "u",
+    "a": "", "z": "j", "q": "k", "c": "k", "w": "v", "x": "ks",
+}
+_ROMAN_KEY_RE = re.compile("|".join(sorted(map(re.escape, ROMAN_KEYS), key=len, reverse=True)))
+KEY_WORD_RE = re.compile(r"[a-z]+|[\u0900-\u097f]+")
+_REPEATS_RE = re.compile(r"(.)\1+")
+MIN_KEY_LENGTH = 2
+MAX_SEARCH_KEYS = 400
+
+
+@lru_cache(maxsize=50000)
+def phonetic_key(word: str) -> str:
+    """Script-neutral key for one lowercase Roman or Devanagari word ("" when too short to be useful)"""
+    if "\u0900" <= word[0] <= "\u097f":
+        key = "".join(DEVANAGARI_KEYS.get(ch, "") for ch in unicodedata.normalize("NFD", word))
+    else:
+        # Lexicon words go through their Devanagari spelling, which irons out spelling variants
+        devanagari = WORDS.get(word)
+        if devanagari:
+            return phonetic_key(devanagari)
+        key = _ROMAN_KEY_RE.sub(lambda m: ROMAN_KEYS[m.group(0)], word)
+    key = _REPEATS_RE.sub(r"\1", key)
+    return key if len(key) >= MIN_KEY_LENGTH else ""
+
+
+def phonetic_keys(text: str) -> List[str]:
+    """Phonetic keys of the words in `text`, in order, without duplicates"""
+    keys = []
+    for word in KEY_WORD_RE.findall(unicodedata.normalize("NFC", text.lower())):
+        key = phonetic_key(word)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def search_keys(texts: Iterable[Optional[str]]) -> List[str]:
+    """Keys stored on a shayari (multikey indexed) for phonetic search"""
+    keys = set()
+    for text in texts:
+        if text:
+            keys.update(phonetic_keys(text))
+    return sorted(keys)[:MAX_SEARCH_KEYS]
@@ -195,12 +195,12 @@ self.addEventListener('push', (event) => {
         case 'like':
           notificationData.icon = '❤️';
           notificationData.vibrate = [100, 50, 100];
-          notificationData.body = `${pushData.senderName} liked your shayari`;
+          notificationData.body = pushData.message || `${pushData.senderName} liked your shayari`;
           break;
         case 'follow':
           notificationData.icon = '👥';
           notificationData.vibrate = [200, 100, 200];
-          notificationData.body = `${pushData.senderName} started following you`;
+          notificationData.body = pushData.message || `${pushData.senderName} started following you`;
           break;
         case 'feature':
           notificationData.icon = '⭐';
@@ -10,13 +10,28 @@ const NotificationCenter = ({ user }) => {
   const [notifications, setNotifications] = useState([]);
   const [unreadCount, setUnreadCount] = useState(0);
   const dropdownRef = useRef(null);
+  const notificationsRef = useRef([]);
+
+  useEffect(() => {
+    notificationsRef.current = notifications;
+  }, [notifications]);
 
   useEffect(() => {
     if (user) {
       fetchNotifications();
-      // Poll for new notifications every 10 seconds for better responsiveness
-      const interval = setInterval(fetchNotifications, 10000);
-      return () => clearInterval(interval);
+      // New notifications arrive over the notification stream (or its polling fallback)
+      const handleNewNotification = (event) => {
+        const notification = event.detail;
+        if (!notification?.id) return;
+        // Coalesced likes/follows arrive again with the same id as new actors join
+        const existing = notificationsRef.current.find(n => n.id === notification.id);
+        const wasUnread = existing && !existing.isRead;
+        notificationsRef.current = [notification, ...notificationsRef.current.filter(n => n.id !== notification.id)];
+        setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)].slice(0, 50));
+        if (!notification.isRead && !wasUnread) setUnreadCount(prev => prev + 1);
+      };
+      window.addEventListener('new-notification', handleNewNotification);
+      return () => window.removeEventListener('new-notification', handleNewNotification);
     }
   }, [user]);
 
@@ -147,6 +162,12 @@ const NotificationCenter = ({ user }) => {
   };
 
   const getNotificationMessage = (notification) => {
+    // Coalesced likes/follows come with a server-rendered "A, B and N others…" message
+    if (notification.actorCount > 1) {
+      return notification.shayariTitle
+        ? `${notification.message} "${notification.shayariTitle}"`
+        : notification.message;
+    }
     switch (notification.type) {
       case 'like':
         return `${notification.senderName} liked your shayari "${notification.shayariTitle}"`;
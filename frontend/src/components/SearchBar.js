@@ -1,25 +1,24 @@
 import { useState, useEffect, useRef } from 'react';
-import { Search, X, User, BookOpen, Loader2 } from 'lucide-react';
+import { Search, X, User, BookOpen, Hash, Loader2 } from 'lucide-react';
 import axios from 'axios';
 
 const BACKEND_URL = process.env.REACT_APP_API_URL || 'https://raama-backend-srrb.onrender.com';
 const API = `${BACKEND_URL}/api`;
 
+const EMPTY_SUGGESTIONS = { writers: [], tags: [], titles: [] };
+
 export default function SearchBar({ onSearch, onClose }) {
   const [query, setQuery] = useState('');
-  const [suggestions, setSuggestions] = useState({
-    shayaris: [],
-    writers: []
-  });
+  const [suggestions, setSuggestions] = useState(EMPTY_SUGGESTIONS);
   const [loading, setLoading] = useState(false);
   const [showSuggestions, setShowSuggestions] = useState(false);
   const searchRef = useRef(null);
 
   useEffect(() => {
-    if (query.length > 2) {
-      searchContent();
+    if (query.trim().length > 1) {
+      fetchCompletions();
     } else {
-      setSuggestions({ shayaris: [], writers: [] });
+      setSuggestions(EMPTY_SUGGESTIONS);
       setShowSuggestions(false);
     }
   }, [query]);
@@ -35,19 +34,20 @@ export default function SearchBar({ onSearch, onClose }) {
     return () => document.removeEventListener('mousedown', handleClickOutside);
   }, []);
 
-  const searchContent = async () => {
+  // Completions come from an in-memory prefix index, cheap enough for every keystroke
+  const fetchCompletions = async () => {
     setLoading(true);
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.get(`${API}/search?q=${encodeURIComponent(query)}`, {
+      const response = await axios.get(`${API}/search/autocomplete?q=${encodeURIComponent(query)}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       
       setSuggestions(response.data);
       setShowSuggestions(true);
     } catch (error) {
-      console.error('Search error:', error);
-      setSuggestions({ shayaris: [], writers: [] });
+      console.error('Autocomplete error:', error);
+      setSuggestions(EMPTY_SUGGESTIONS);
     } finally {
       setLoading(false);
     }
@@ -67,6 +67,9 @@ export default function SearchBar({ onSearch, onClose }) {
     } else if (type === 'writer') {
       setQuery(item.username);
       handleSearch(item.username);
+    } else if (type === 'tag') {
+      setQuery(item.tag);
+      handleSearch(item.tag);
     }
   };
 
@@ -88,7 +91,7 @@ export default function SearchBar({ onSearch, onClose }) {
             <button
               onClick={() => {
                 setQuery('');
-                setSuggestions({ shayaris: [], writers: [] });
+                setSuggestions(EMPTY_SUGGESTIONS);
                 setShowSuggestions(false);
               }}
               className="p-1 text-gray-400 hover:text-white"
@@ -107,7 +110,7 @@ export default function SearchBar({ onSearch, onClose }) {
         </div>
       </div>
 
-      {showSuggestions && (suggestions.shayaris.length > 0 || suggestions.writers.length > 0) && (
+      {showSuggestions && (suggestions.writers.length > 0 || suggestions.tags.length > 0 || suggestions.titles.length > 0) && (
         <div className="absolute top-full left-0 right-0 mt-2 bg-black/90 backdrop-blur-md border border-gray-700 rounded-lg shadow-xl z-50 max-h-96 overflow-y-auto">
           {suggestions.writers.length > 0 && (
             <div className="p-3 border-b border-gray-700">
@@ -127,7 +130,7 @@ export default function SearchBar({ onSearch, onClose }) {
                     </div>
                     <div>
                       <p className="text-white font-medium">{writer.username}</p>
-                      <p className="text-gray-400 text-sm">{writer.firstName} {writer.lastName}</p>
+                      <p className="text-gray-400 text-sm">{writer.name}</p>
                     </div>
                   </div>
                 </button>
@@ -135,13 +138,33 @@ export default function SearchBar({ onSearch, onClose }) {
             </div>
           )}
 
-          {suggestions.shayaris.length > 0 && (
+          {suggestions.tags.length > 0 && (
+            <div className="p-3 border-b border-gray-700">
+              <h4 className="text-sm font-semibold text-gray-400 mb-2 flex items-center gap-2">
+                <Hash size={14} />
+                Tags
+              </h4>
+              <div className="flex flex-wrap gap-2">
+                {suggestions.tags.map((tag) => (
+                  <button
+                    key={tag.tag}
+                    onClick={() => handleSuggestionClick(tag, 'tag')}
+                    className="px-3 py-1 bg-orange-500/10 hover:bg-orange-500/20 text-orange-400 rounded-full text-sm transition-colors"
+                  >
+                    #{tag.tag} <span className="text-gray-500">{tag.count}</span>
+                  </button>
+                ))}
+              </div>
+            </div>
+          )}
+
+          {suggestions.titles.length > 0 && (
             <div className="p-3">
               <h4 className="text-sm font-semibold text-gray-400 mb-2 flex items-center gap-2">
                 <BookOpen size={14} />
                 Shayaris
               </h4>
-              {suggestions.shayaris.map((shayari) => (
+              {suggestions.titles.map((shayari) => (
                 <button
                   key={shayari.id}
                   onClick={() => handleSuggestionClick(shayari, 'shayari')}
@@ -154,9 +177,6 @@ export default function SearchBar({ onSearch, onClose }) {
                     <div className="flex-1 min-w-0">
                       <p className="text-white font-medium truncate">{shayari.title}</p>
                       <p className="text-gray-400 text-sm">by {shayari.authorName}</p>
-                      <p className="text-gray-500 text-xs line-clamp-2 mt-1">
-                        {shayari.content.substring(0, 100)}...
-                      </p>
                     </div>
                   </div>
                 </button>
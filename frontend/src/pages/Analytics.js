@@ -35,7 +35,8 @@ export default function Analytics({ theme, setTheme }) {
 
   const fetchWriterAnalytics = async () => {
     try {
-      const response = await axios.get(`${API}/analytics/writer`, {
+      // Totals plus the top six shayaris, ranked server-side
+      const response = await axios.get(`${API}/analytics/writer?sort_by=top&limit=6`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       setWriterAnalytics(response.data);
@@ -223,31 +224,28 @@ export default function Analytics({ theme, setTheme }) {
                   Top Performing Shayaris
                 </h3>
                 <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-                  {writerAnalytics.shayaris
-                    .sort((a, b) => (b.likes + b.views * 0.1) - (a.likes + a.views * 0.1))
-                    .slice(0, 6)
-                    .map((shayari) => (
-                      <div key={shayari.id} className="p-4 bg-white/5 rounded-lg">
-                        <h4 className="font-bold text-orange-400 mb-2">{shayari.title}</h4>
-                        <p className="text-sm text-gray-300 mb-3 line-clamp-2">
-                          {shayari.content}
-                        </p>
-                        <div className="flex items-center gap-4 text-xs text-gray-400">
-                          <span className="flex items-center gap-1">
-                            <Heart size={12} className="text-red-400" />
-                            {shayari.likes || 0}
-                          </span>
-                          <span className="flex items-center gap-1">
-                            <Eye size={12} className="text-green-400" />
-                            {shayari.views || 0}
-                          </span>
-                          <span className="flex items-center gap-1">
-                            <Share2 size={12} className="text-blue-400" />
-                            {shayari.shares || 0}
-                          </span>
-                        </div>
+                  {writerAnalytics.shayaris.map((shayari) => (
+                    <div key={shayari.id} className="p-4 bg-white/5 rounded-lg">
+                      <h4 className="font-bold text-orange-400 mb-2">{shayari.title}</h4>
+                      <p className="text-sm text-gray-300 mb-3 line-clamp-2">
+                        {shayari.content}
+                      </p>
+                      <div className="flex items-center gap-4 text-xs text-gray-400">
+                        <span className="flex items-center gap-1">
+                          <Heart size={12} className="text-red-400" />
+                          {shayari.likes || 0}
+                        </span>
+                        <span className="flex items-center gap-1">
+                          <Eye size={12} className="text-green-400" />
+                          {shayari.views || 0}
+                        </span>
+                        <span className="flex items-center gap-1">
+                          <Share2 size={12} className="text-blue-400" />
+                          {shayari.shares || 0}
+                        </span>
                       </div>
-                    ))}
+                    </div>
+                  ))}
                 </div>
               </div>
             </>
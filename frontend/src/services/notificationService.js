@@ -11,6 +11,7 @@ class NotificationService {
     this.maxReconnectAttempts = 5;
     this.reconnectDelay = 1000;
     this.pollingInterval = null;
+    this.lastSyncedAt = null;
   }
 
   // Initialize real-time notifications using Server-Sent Events
@@ -74,17 +75,15 @@ class NotificationService {
     
     this.pollingInterval = setInterval(async () => {
       try {
-        const data = await this.fetchNotifications();
-        // Check for new notifications and show toasts
-        if (data.notifications && data.notifications.length > 0) {
-          const latestNotification = data.notifications[0];
-          const lastNotificationTime = localStorage.getItem('lastNotificationTime');
-          const currentTime = new Date(latestNotification.createdAt).getTime();
-          
-          if (!lastNotificationTime || currentTime > parseInt(lastNotificationTime)) {
-            this.handleNewNotification(latestNotification);
-            localStorage.setItem('lastNotificationTime', currentTime.toString());
-          }
+        // First poll only records where we are; later polls fetch just what is newer
+        const data = await this.fetchNotifications(
+          this.lastSyncedAt ? { since: this.lastSyncedAt } : { limit: 1 }
+        );
+        if (this.lastSyncedAt && data.notifications) {
+          [...data.notifications].reverse().forEach(notification => this.handleNewNotification(notification));
+        }
+        if (data.latest) {
+          this.lastSyncedAt = data.latest;
         }
       } catch (error) {
         console.log('Polling failed:', error);
@@ -114,6 +113,9 @@ class NotificationService {
 
   // Format notification message
   formatNotificationMessage(notification) {
+    if (notification.actorCount > 1) {
+      return notification.message;
+    }
     switch (notification.type) {
       case 'like':
         return `${notification.senderName} liked your shayari`;
@@ -318,8 +320,9 @@ class NotificationService {
       let subscription = await registration.pushManager.getSubscription();
       
       if (!subscription) {
-        // Create new subscription
-        const vapidPublicKey = 'BEl62iUYgUivxIkv69yViEuiBIa40HI80NM9f4LiKqc7WDWN6_MHSd1el_RuQAE2hxbgamdBYrXPVdpXYA5NxQ8'; // You'll need to generate this
+        // Create new subscription with the server's VAPID application key
+        const response = await axios.get(`${API_BASE_URL}/api/notifications/vapid-public-key`);
+        const vapidPublicKey = response.data.publicKey;
         
         subscription = await registration.pushManager.subscribe({
           userVisibleOnly: true,
@@ -386,11 +389,12 @@ class NotificationService {
   }
 
   // Fetch notifications
-  async fetchNotifications() {
+  async fetchNotifications(params = {}) {
     try {
       const token = localStorage.getItem('raama-token');
       const response = await axios.get(`${API_BASE_URL}/api/notifications`, {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: { Authorization: `Bearer ${token}` },
+        params
       });
       return response.data;
     } catch (error) {
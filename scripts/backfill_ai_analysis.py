@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+AI Analysis Backfill Script for रामा (Raama)
+Analyzes shayaris that were published while Gemini was unavailable
+(aiProcessed: False) and writes the results back in batches.
+
+The run streams unprocessed shayaris by _id cursor, analyzes each batch with
+bounded concurrency behind a token-bucket rate limit, persists the batch with
+a single bulk_write and then checkpoints the last _id so an interrupted run
+can resume where it stopped.
+
+Usage:
+    python scripts/backfill_ai_analysis.py run
+    python scripts/backfill_ai_analysis.py run --dry-run --provider stub
+    python scripts/backfill_ai_analysis.py run --concurrency 8 --rate 2 --batch-size 50
+    python scripts/backfill_ai_analysis.py status
+    python scripts/backfill_ai_analysis.py reset
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from ai_providers import GeminiProvider, ProviderRouter, StubProvider  # noqa: E402
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash')
+
+DEFAULT_CHECKPOINT = ROOT_DIR / 'scripts' / '.backfill_ai_checkpoint.json'
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def build_router(provider: str) -> ProviderRouter:
+    """Route through the backend's AI providers; no rule-based terminal so failures stay unprocessed"""
+    if provider == "stub":
+        return ProviderRouter([StubProvider()], hedge=False)
+
+    if not GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY not set - use --provider stub for a local run")
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+    model = genai.GenerativeModel(GEMINI_MODEL)
+    return ProviderRouter([GeminiProvider(lambda: model)], hedge=False)
+
+
+def build_update(shayari: dict, analysis: dict) -> UpdateOne:
+    """Build the same field updates as POST /api/shayaris/{id}/analyze"""
+    update_data = {
+        "aiAnalysis": analysis,
+        "aiProcessed": True,
+        "aiProcessedAt": datetime.now(timezone.utc).isoformat()
+    }
+    try:
+        update_data["qualityScore"] = float(analysis["quality_score"]["overall"])
+    except (ValueError, TypeError, KeyError):
+        pass
+
+    update = {"$set": update_data}
+    ai_tags = [str(tag) for tag in analysis.get("tags", []) if tag] if isinstance(analysis.get("tags"), list) else []
+    if ai_tags:
+        update["$addToSet"] = {"tags": {"$each": ai_tags}}
+
+    # Guard against a concurrent /analyze call having already processed it
+    return UpdateOne({"_id": shayari["_id"], "aiProcessed": {"$ne": True}}, update)
+
+
+def load_checkpoint(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"lastId": None, "processed": 0, "failed": 0, "written": 0}
+
+
+def save_checkpoint(path: Path, checkpoint: dict):
+    checkpoint["updatedAt"] = datetime.now(timezone.utc).isoformat()
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(checkpoint, indent=2))
+    tmp_path.replace(path)
+
+
+async def analyze_batch(batch, analyzer, bucket, semaphore, max_retries):
+    """Analyze a batch concurrently, returning (updates, failed_count)"""
+
+    async def analyze_one(shayari):
+        for attempt in range(max_retries + 1):
+            await bucket.acquire()
+            try:
+                async with semaphore:
+                    analysis, _ = await analyzer.analyze(shayari.get("title", ""), shayari.get("content", ""))
+                return build_update(shayari, analysis)
+            except Exception as e:
+                if attempt == max_retries:
+                    print(f"  ❌ {shayari.get('id')}: {str(e)}")
+                    return None
+                await asyncio.sleep(2 ** attempt)
+
+    results = await asyncio.gather(*(analyze_one(s) for s in batch))
+    updates = [r for r in results if r is not None]
+    return updates, len(results) - len(updates)
+
+
+async def run_backfill(args):
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Database: {DB_NAME}")
+
+    checkpoint_path = Path(args.checkpoint)
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint["lastId"]:
+        print(f"⏩ Resuming after _id {checkpoint['lastId']} ({checkpoint['processed']} already processed)")
+
+    analyzer = build_router(args.provider)
+    bucket = TokenBucket(rate=args.rate, capacity=max(1, int(args.burst)))
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    query = {"aiProcessed": {"$ne": True}}
+    if checkpoint["lastId"]:
+        query["_id"] = {"$gt": ObjectId(checkpoint["lastId"])}
+
+    remaining = await db.shayaris.count_documents(query)
+    print(f"📝 {remaining} unprocessed shayaris to analyze with '{args.provider}'"
+          f"{' (dry run)' if args.dry_run else ''}")
+
+    cursor = db.shayaris.find(
+        query,
+        {"_id": 1, "id": 1, "title": 1, "content": 1}
+    ).sort("_id", 1).batch_size(args.batch_size)
+
+    started_at = time.monotonic()
+    batch = []
+    try:
+        async for shayari in cursor:
+            batch.append(shayari)
+            if len(batch) >= args.batch_size:
+                await process_batch(db, batch, analyzer, bucket, semaphore, checkpoint, checkpoint_path, args)
+                batch = []
+                if args.limit and checkpoint["processed"] >= args.limit:
+                    break
+        if batch:
+            await process_batch(db, batch, analyzer, bucket, semaphore, checkpoint, checkpoint_path, args)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n⏸️  Interrupted - progress is checkpointed, re-run to resume")
+        raise
+    finally:
+        client.close()
+
+    elapsed = time.monotonic() - started_at
+    print(f"\n✨ Backfill finished in {elapsed:.1f}s")
+    print(f"  Processed: {checkpoint['processed']}")
+    print(f"  Written:   {checkpoint['written']}")
+    print(f"  Failed:    {checkpoint['failed']} (left unprocessed, retry with 'reset' then 'run')")
+
+
+async def process_batch(db, batch, analyzer, bucket, semaphore, checkpoint, checkpoint_path, args):
+    updates, failed = await analyze_batch(batch, analyzer, bucket, semaphore, args.max_retries)
+
+    written = 0
+    if updates and not args.dry_run:
+        result = await db.shayaris.bulk_write(updates, ordered=False)
+        written = result.modified_count
+
+    checkpoint["processed"] += len(batch)
+    checkpoint["failed"] += failed
+    checkpoint["written"] += written
+    if not args.dry_run:
+        checkpoint["lastId"] = str(batch[-1]["_id"])
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    print(f"  ✅ Batch of {len(batch)}: {len(updates)} analyzed, {written} written, {failed} failed "
+          f"(total {checkpoint['processed']})")
+
+
+def show_status(args):
+    checkpoint_path = Path(args.checkpoint)
+    if not checkpoint_path.exists():
+        print("No checkpoint found - the next run starts from the beginning.")
+        return
+    print(json.dumps(load_checkpoint(checkpoint_path), indent=2))
+
+
+def reset_checkpoint(args):
+    checkpoint_path = Path(args.checkpoint)
+    if checkpoint_path.exists():
+        checkpoint_path.unlink()
+        print("🗑️  Checkpoint removed - the next run starts from the beginning.")
+    else:
+        print("No checkpoint to remove.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Backfill AI analysis for unprocessed shayaris in रामा')
+    parser.add_argument('action', choices=['run', 'status', 'reset'], help='Action to perform')
+    parser.add_argument('--provider', choices=['gemini', 'stub'], default='gemini',
+                        help='AI provider (stub is deterministic and offline)')
+    parser.add_argument('--dry-run', action='store_true', help='Analyze but do not write results or checkpoint')
+    parser.add_argument('--concurrency', type=int, default=4, help='Maximum in-flight AI requests')
+    parser.add_argument('--rate', type=float, default=1.0, help='AI requests per second (token bucket refill rate)')
+    parser.add_argument('--burst', type=float, default=4, help='Token bucket capacity')
+    parser.add_argument('--batch-size', type=int, default=25, help='Shayaris per bulk_write and checkpoint')
+    parser.add_argument('--max-retries', type=int, default=2, help='Retries per shayari on AI errors')
+    parser.add_argument('--limit', type=int, default=0, help='Stop after roughly this many shayaris (0 = all)')
+    parser.add_argument('--checkpoint', default=str(DEFAULT_CHECKPOINT), help='Checkpoint file path')
+
+    args = parser.parse_args()
+
+    if args.action == 'run':
+        try:
+            asyncio.run(run_backfill(args))
+        except KeyboardInterrupt:
+            sys.exit(130)
+    elif args.action == 'status':
+        show_status(args)
+    elif args.action == 'reset':
+        reset_checkpoint(args)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Search Key Backfill Script for रामा (Raama)
+Computes the phonetic searchKeys (backend/transliteration.py) for shayaris
+written before they existed, so Hinglish queries find Devanagari shayaris and
+vice versa. Also fills in the normalized name keys used by the author and
+writer prefix filters (backend/search_queries.py): authorKeys on shayaris and
+nameKeys on users. New and edited documents get their keys when they are saved.
+
+By default only documents missing keys are touched; pass --all to recompute
+everything after the key rules or the lexicon change. Re-running is safe.
+
+Usage:
+    python scripts/backfill_search_keys.py
+    python scripts/backfill_search_keys.py --all
+    python scripts/backfill_search_keys.py --dry-run
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from search_queries import name_keys, user_name_keys  # noqa: E402
+from transliteration import search_keys  # noqa: E402
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+
+
+async def backfill(recompute_all: bool, dry_run: bool, batch_size: int):
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Database: {DB_NAME}")
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    query = {} if recompute_all else {
+        "$or": [{"searchKeys": {"$exists": False}}, {"authorKeys": {"$exists": False}}]
+    }
+    pending = await db.shayaris.count_documents(query)
+    print(f"\n🔤 {pending} shayaris to key")
+
+    updates = []
+    processed = changed = 0
+    cursor = db.shayaris.find(query, {
+        "_id": 0, "id": 1, "title": 1, "content": 1, "authorName": 1, "authorUsername": 1,
+        "searchKeys": 1, "authorKeys": 1
+    })
+    async for shayari in cursor.batch_size(batch_size):
+        processed += 1
+        keys = {
+            "searchKeys": search_keys((shayari.get("title"), shayari.get("content"))),
+            "authorKeys": name_keys(shayari.get("authorName"), shayari.get("authorUsername")),
+        }
+        if any(keys[field] != shayari.get(field) for field in keys):
+            changed += 1
+            updates.append(UpdateOne({"id": shayari["id"]}, {"$set": keys}))
+
+        if len(updates) >= batch_size:
+            if not dry_run:
+                await db.shayaris.bulk_write(updates, ordered=False)
+            print(f"  ✅ {processed} / {pending} shayaris processed")
+            updates = []
+
+    if updates and not dry_run:
+        await db.shayaris.bulk_write(updates, ordered=False)
+
+    user_query = {} if recompute_all else {"nameKeys": {"$exists": False}}
+    print(f"\n👥 {await db.users.count_documents(user_query)} users to key")
+    updates = []
+    users_processed = users_changed = 0
+    cursor = db.users.find(user_query, {
+        "_id": 0, "id": 1, "username": 1, "firstName": 1, "lastName": 1, "nameKeys": 1
+    })
+    async for user in cursor.batch_size(batch_size):
+        users_processed += 1
+        keys = user_name_keys(user)
+        if keys != user.get("nameKeys"):
+            users_changed += 1
+            updates.append(UpdateOne({"id": user["id"]}, {"$set": {"nameKeys": keys}}))
+        if len(updates) >= batch_size:
+            if not dry_run:
+                await db.users.bulk_write(updates, ordered=False)
+            updates = []
+
+    if updates and not dry_run:
+        await db.users.bulk_write(updates, ordered=False)
+
+    client.close()
+    print(f"\n✨ Backfill {'preview' if dry_run else 'finished'}")
+    print(f"  Shayaris checked:   {processed}")
+    print(f"  Shayaris keyed:     {changed}")
+    print(f"  Users checked:      {users_processed}")
+    print(f"  Users keyed:        {users_changed}")
+    if dry_run:
+        print("  (dry run - nothing was written)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Backfill search keys on रामा shayaris and users')
+    parser.add_argument('--all', action='store_true', help='Recompute keys on every document, not just missing ones')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    parser.add_argument('--batch-size', type=int, default=500, help='Documents per bulk_write')
+
+    args = parser.parse_args()
+    asyncio.run(backfill(args.all, args.dry_run, args.batch_size))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Web Push Benchmark Script for रामा (Raama)
+Load-tests the push delivery worker against the local push stub: inserts
+temporary subscriptions (a share of them pointing at "gone" endpoints), queues
+one push per subscribed user the way notification fan-out does, and reports
+throughput, latency and whether gone subscriptions were pruned. Every payload
+is decrypted by the stub, so the run also checks the encryption end to end.
+
+The temporary subscriptions are removed afterwards.
+
+Usage:
+    python scripts/benchmark_push.py
+    python scripts/benchmark_push.py --subscriptions 20000 --concurrency 100 --latency-ms 50
+    python scripts/benchmark_push.py --concurrency 1 --subscriptions 500
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from aiohttp import web
+from cryptography.hazmat.primitives.asymmetric import ec
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from push_delivery import (  # noqa: E402
+    PushDeliveryWorker, VapidSigner, b64url_encode, generate_vapid_keys, public_key_bytes
+)
+from push_stub_server import create_app  # noqa: E402
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+
+
+async def wait_until_idle(worker: PushDeliveryWorker):
+    await worker.queue.join()
+    while worker.stats()["inFlight"]:
+        await asyncio.sleep(0.01)
+
+
+async def benchmark(args):
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Database: {DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    # One browser key pair for every test subscription, so the stub can decrypt
+    ua_key = ec.generate_private_key(ec.SECP256R1())
+    auth_secret = os.urandom(16)
+    p256dh = b64url_encode(public_key_bytes(ua_key.public_key()))
+    auth = b64url_encode(auth_secret)
+
+    app = create_app(args.latency_ms, ua_key, auth_secret)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+    base_url = f"http://127.0.0.1:{args.port}/push"
+
+    run_id = f"bench-{uuid.uuid4().hex[:8]}"
+    gone_every = round(1 / args.gone_ratio) if args.gone_ratio else 0
+    subscriptions = []
+    for i in range(args.subscriptions):
+        sub_id = f"{run_id}-{i}"
+        if gone_every and i % gone_every == 0:
+            sub_id = f"gone-{sub_id}"
+        subscriptions.append({
+            "id": sub_id,
+            "userId": f"{run_id}-user-{i}",
+            "endpoint": f"{base_url}/{sub_id}",
+            "p256dh": p256dh,
+            "auth": auth
+        })
+    gone_total = sum(1 for sub in subscriptions if sub["id"].startswith("gone-"))
+
+    try:
+        print(f"\n📝 Inserting {len(subscriptions)} test subscriptions ({gone_total} gone)...")
+        await db.push_subscriptions.insert_many(subscriptions, ordered=False)
+
+        signer = VapidSigner(generate_vapid_keys()[0], "mailto:benchmark@raama.local")
+        worker = PushDeliveryWorker(db.push_subscriptions, signer, concurrency=args.concurrency)
+        worker.start()
+
+        print(f"🚀 Sending with concurrency {args.concurrency} ({args.latency_ms:g} ms simulated latency)...")
+        started = time.perf_counter()
+        for offset in range(0, len(subscriptions), args.chunk_size):
+            chunk = subscriptions[offset:offset + args.chunk_size]
+            payloads = {
+                sub["userId"]: {"title": "Benchmark", "message": f"Push {sub['id']}", "type": "test", "url": "/"}
+                for sub in chunk
+            }
+            while not worker.submit(payloads):
+                await asyncio.sleep(0.01)
+        await wait_until_idle(worker)
+        elapsed = time.perf_counter() - started
+
+        stats = worker.stats()
+        await worker.stop()
+        remaining_gone = await db.push_subscriptions.count_documents(
+            {"id": {"$regex": f"^gone-{run_id}-"}}
+        )
+    finally:
+        await db.push_subscriptions.delete_many({"id": {"$regex": f"^(gone-)?{run_id}-"}})
+        await runner.cleanup()
+        client.close()
+
+    counts = worker.counts
+    stub = app["stats"]
+    print("\n📈 Results")
+    print(f"  Pushes:           {stub['received']} in {elapsed:.2f}s ({stub['received'] / elapsed:,.0f}/s)")
+    print(f"  Delivered:        {counts['sent']} (stub decrypted {stub['decrypted']})")
+    print(f"  Gone:             {counts['gone']} (pruned {counts['pruned']}, left {remaining_gone})")
+    print(f"  Failed:           {counts['failed']} (stub rejected {stub['rejected']})")
+    print(f"  Latency p50/p95:  {stats['latencyP50Ms']} / {stats['latencyP95Ms']} ms")
+
+    ok = (
+        stub["received"] == len(subscriptions)
+        and stub["decrypted"] == len(subscriptions) - gone_total
+        and stub["rejected"] == 0 and stub["undecryptable"] == 0
+        and remaining_gone == 0
+    )
+    if not ok:
+        print("\n❌ Push benchmark found delivery problems")
+        sys.exit(1)
+    print("\n✨ All pushes delivered and gone subscriptions pruned")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark रामा web push delivery against a local push stub')
+    parser.add_argument('--subscriptions', type=int, default=5000, help='Test subscriptions to create')
+    parser.add_argument('--gone-ratio', type=float, default=0.1, help='Share of subscriptions that answer 410 Gone')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent push requests')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Simulated push service latency')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Users per queued push job')
+    parser.add_argument('--port', type=int, default=8765, help='Port for the push stub')
+
+    args = parser.parse_args()
+    asyncio.run(benchmark(args))
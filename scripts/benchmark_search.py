@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Search Benchmark Script for रामा (Raama)
+Compares the old regex search against the weighted text index on a large
+synthetic shayari collection (1M documents by default).
+
+The data goes into a separate database (<DB_NAME>_search_bench) so production
+collections are never touched. Seeding is skipped when that database already
+holds enough documents; pass --reseed to start over or --drop to remove it.
+
+For each query the script runs both shapes from backend/search_queries.py and
+reports latency (p50/p95 over --repeat runs) and the documents examined
+according to explain().
+
+Usage:
+    python scripts/benchmark_search.py
+    python scripts/benchmark_search.py --documents 200000 --repeat 5
+    python scripts/benchmark_search.py --drop
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+sys.path.insert(0, str(ROOT_DIR / 'scripts'))
+
+from search_queries import regex_shayari_query, text_search_pipeline  # noqa: E402
+from create_indexes import create_shayari_text_index  # noqa: E402
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+BENCH_DB_NAME = f"{DB_NAME}_search_bench"
+
+HINGLISH_WORDS = [
+    "dil", "ishq", "mohabbat", "zindagi", "yaadein", "raat", "chaand", "sapne", "dard", "khushi",
+    "intezaar", "safar", "baarish", "tanhai", "aansu", "mehfil", "shaam", "sitare", "dhadkan", "wafa",
+    "judai", "khwab", "roshni", "saahil", "hawa", "nazar", "baatein", "pyaar", "kahani", "manzil"
+]
+DEVANAGARI_WORDS = [
+    "दिल", "इश्क", "मोहब्बत", "ज़िंदगी", "यादें", "रात", "चाँद", "सपने", "दर्द", "खुशी",
+    "इंतज़ार", "सफर", "बारिश", "तन्हाई", "आँसू", "महफ़िल", "शाम", "सितारे", "धड़कन", "वफ़ा"
+]
+FILLER_WORDS = ["ki", "ka", "ke", "mein", "hai", "se", "ko", "aur", "की", "का", "में", "है", "से", "और"]
+TAGS = ["love", "life", "sad", "nature", "friendship", "motivation", "ghazal", "romantic", "philosophy"]
+QUERIES = ["mohabbat", "dil", "tanhai", "इश्क", "ज़िंदगी", "baarish raat", "khwab manzil", "wafa"]
+
+
+def random_line(rng: random.Random, words: int) -> str:
+    vocabulary = rng.choice((HINGLISH_WORDS, DEVANAGARI_WORDS))
+    return " ".join(
+        rng.choice(FILLER_WORDS) if rng.random() < 0.3 else rng.choice(vocabulary) for _ in range(words)
+    )
+
+
+def make_shayari(rng: random.Random, authors: list, now: datetime) -> dict:
+    author_id, author_name, author_username = rng.choice(authors)
+    return {
+        "id": str(uuid.uuid4()),
+        "authorId": author_id,
+        "authorName": author_name,
+        "authorUsername": author_username,
+        "title": random_line(rng, rng.randint(2, 4)),
+        "content": "\n".join(random_line(rng, rng.randint(5, 9)) for _ in range(4)),
+        "tags": rng.sample(TAGS, rng.randint(1, 3)),
+        "likes": int(rng.paretovariate(1.5)) - 1,
+        "views": int(rng.paretovariate(1.2) * 10),
+        "shares": int(rng.paretovariate(2.5)) - 1,
+        "createdAt": (now - timedelta(minutes=rng.randint(0, 525600))).isoformat()
+    }
+
+
+async def seed(db, documents: int, batch_size: int):
+    existing = await db.shayaris.estimated_document_count()
+    if existing >= documents:
+        print(f"♻️  Reusing {existing:,} seeded shayaris")
+        return
+    rng = random.Random(42 + existing)
+    authors = [
+        (str(uuid.uuid4()), f"Shayar {i}", f"shayar_{i}") for i in range(2000)
+    ]
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    print(f"🌱 Seeding {documents - existing:,} shayaris...")
+    for inserted in range(existing, documents, batch_size):
+        batch = [make_shayari(rng, authors, now) for _ in range(min(batch_size, documents - inserted))]
+        await db.shayaris.insert_many(batch, ordered=False)
+        done = inserted + len(batch)
+        if done % (batch_size * 10) == 0 or done == documents:
+            print(f"  ✅ {done:,} / {documents:,} ({time.perf_counter() - started:.0f}s)")
+
+
+async def timed(run, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def docs_examined(explain: dict) -> int:
+    """totalDocsExamined from find or aggregate explain output"""
+    if "executionStats" in explain:
+        return explain["executionStats"].get("totalDocsExamined", 0)
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"].get("executionStats", {}).get("totalDocsExamined", 0)
+    return -1
+
+
+async def benchmark(args):
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Benchmark database: {BENCH_DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URL)
+
+    if args.drop:
+        await client.drop_database(BENCH_DB_NAME)
+        print("🗑️  Benchmark database dropped")
+        client.close()
+        return
+
+    db = client[BENCH_DB_NAME]
+    if args.reseed:
+        await db.shayaris.drop()
+    await seed(db, args.documents, args.batch_size)
+
+    print("\n🔎 Ensuring text index...")
+    started = time.perf_counter()
+    await create_shayari_text_index(db)
+    print(f"  ⏱️  {time.perf_counter() - started:.1f}s")
+
+    print(f"\n{'query':<16}{'regex p50':>11}{'p95':>9}{'examined':>11}   {'text p50':>9}{'p95':>9}{'examined':>11}")
+    speedups = []
+    for q in QUERIES:
+        regex_query = regex_shayari_query(q)
+        pipeline = text_search_pipeline(q, {}, "relevance", args.limit)
+
+        async def run_regex():
+            await db.shayaris.find(regex_query, {"_id": 0}).sort(
+                [("likes", -1), ("views", -1), ("createdAt", -1)]
+            ).limit(args.limit).to_list(args.limit)
+
+        async def run_text():
+            await db.shayaris.aggregate(pipeline).to_list(args.limit)
+
+        regex_ms = await timed(run_regex, args.repeat)
+        text_ms = await timed(run_text, args.repeat)
+
+        regex_explain = await db.command(
+            "explain", {"find": "shayaris", "filter": regex_query, "limit": args.limit},
+            verbosity="executionStats"
+        )
+        text_explain = await db.command(
+            "explain", {"aggregate": "shayaris", "pipeline": pipeline, "cursor": {}},
+            verbosity="executionStats"
+        )
+
+        def p95(values):
+            return sorted(values)[max(0, int(len(values) * 0.95) - 1)]
+
+        regex_p50, text_p50 = statistics.median(regex_ms), statistics.median(text_ms)
+        speedups.append(regex_p50 / text_p50 if text_p50 else 0)
+        print(
+            f"{q:<16}{regex_p50:>9.1f}ms{p95(regex_ms):>7.1f}ms{docs_examined(regex_explain):>11,}   "
+            f"{text_p50:>7.1f}ms{p95(text_ms):>7.1f}ms{docs_examined(text_explain):>11,}"
+        )
+
+    print(f"\n📈 Median speedup of $text over regex: {statistics.median(speedups):.1f}x")
+    client.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark रामा regex search against the weighted text index')
+    parser.add_argument('--documents', type=int, default=1_000_000, help='Shayaris to seed')
+    parser.add_argument('--batch-size', type=int, default=10_000, help='Documents per insert_many while seeding')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per query and search shape')
+    parser.add_argument('--limit', type=int, default=20, help='Results per search')
+    parser.add_argument('--reseed', action='store_true', help='Drop and reseed the benchmark collection')
+    parser.add_argument('--drop', action='store_true', help='Drop the benchmark database and exit')
+
+    args = parser.parse_args()
+    asyncio.run(benchmark(args))
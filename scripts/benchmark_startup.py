@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark Script for रामा (Raama)
+Measures how long the backend takes to import and to answer its first request,
+so cold starts on Render stay under a budget.
+
+Two measurements:
+  1. `python -X importtime -c "import server"` - total import time and the
+     slowest modules (cumulative), parsed from the importtime report.
+  2. Time-to-first-request - spawn uvicorn and poll /health until it answers.
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --budget 3.0 --top 15
+    python scripts/benchmark_startup.py --skip-server
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+BACKEND_DIR = ROOT_DIR / 'backend'
+
+
+def measure_import(top: int):
+    """Run `import server` under -X importtime and return (total_seconds, slowest modules)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print("❌ Importing server failed:")
+        print(result.stderr[-2000:])
+        sys.exit(1)
+
+    modules = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    server_entry = next((m for m in modules if m[2].strip() == "server"), None)
+    total_us = server_entry[0] if server_entry else sum(m[1] for m in modules)
+    slowest = sorted((m for m in modules if m[2].strip() != "server"), reverse=True)[:top]
+    return total_us / 1e6, slowest
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(timeout: float) -> float:
+    """Spawn uvicorn and return seconds until GET /health succeeds"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"}
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                print("❌ uvicorn exited before serving a request:")
+                print(process.stderr.read()[-2000:])
+                sys.exit(1)
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass
+            time.sleep(0.02)
+        print(f"❌ No response from {url} within {timeout:.0f}s")
+        sys.exit(1)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(args):
+    print(f"🐍 {sys.executable} ({sys.version.split()[0]})")
+
+    import_seconds, slowest = measure_import(args.top)
+    print(f"\n📦 import server: {import_seconds:.3f}s")
+    print(f"  {'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, name in slowest:
+        print(f"  {cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+
+    worst = import_seconds
+    if not args.skip_server:
+        first_request = measure_first_request(args.timeout)
+        print(f"\n🚀 Time to first request (uvicorn → /health): {first_request:.3f}s")
+        worst = max(worst, first_request)
+
+    if args.budget:
+        if worst > args.budget:
+            print(f"\n❌ Over budget: {worst:.3f}s > {args.budget:.3f}s")
+            sys.exit(1)
+        print(f"\n✅ Within budget: {worst:.3f}s <= {args.budget:.3f}s")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark रामा backend cold start')
+    parser.add_argument('--budget', type=float, default=0,
+                        help='Fail (exit 1) if import or first request takes longer, in seconds')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list')
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for the first request')
+    parser.add_argument('--skip-server', action='store_true', help='Only measure the import')
+
+    main(parser.parse_args())
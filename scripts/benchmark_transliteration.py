@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Transliteration Throughput Benchmark for रामा (Raama)
+Compares the precompiled rule-based transliterator (backend/transliteration.py)
+against the legacy per-call dictionary implementation on a synthetic corpus.
+
+Usage:
+    python scripts/benchmark_transliteration.py
+    python scripts/benchmark_transliteration.py --lines 200000 --unknown-ratio 0.3
+"""
+
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from transliteration import PHRASES, WORDS, transliterate, transliterate_word, lexicon_stats  # noqa: E402
+
+PUNCTUATION = [",", ".", "!", "?", "...", ""]
+SYLLABLES = ["ka", "kha", "ga", "cha", "ja", "ta", "da", "na", "pa", "ba", "ma", "ya", "ra", "la",
+             "va", "sa", "sha", "ha", "ri", "mi", "lo", "tu", "ke", "dee", "noo", "ai", "au"]
+
+
+def legacy_translate(text: str) -> str:
+    """The previous fallback_rule_based_translation: map rebuilt on every call"""
+    translation_map = dict(WORDS)
+    words = text.split()
+    translated_words = []
+    for word in words:
+        punctuation = ""
+        clean_word = word
+        for char in ".,!?;:\"'()[]{}":
+            if word.endswith(char):
+                punctuation = char + punctuation
+                clean_word = clean_word[:-1]
+        if clean_word.lower() in translation_map:
+            translated_words.append(translation_map[clean_word.lower()] + punctuation)
+        else:
+            translated_words.append(word)
+    return ' '.join(translated_words)
+
+
+def build_corpus(lines: int, words_per_line: int, unknown_ratio: float, seed: int):
+    rng = random.Random(seed)
+    vocabulary = list(WORDS)
+    phrases = [" ".join(p) for p in PHRASES]
+    corpus = []
+    for _ in range(lines):
+        parts = []
+        while len(parts) < words_per_line:
+            roll = rng.random()
+            if roll < unknown_ratio:
+                word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+            elif roll < unknown_ratio + 0.05 and phrases:
+                word = rng.choice(phrases)
+            else:
+                word = rng.choice(vocabulary)
+            if rng.random() < 0.2:
+                word = word.capitalize()
+            parts.append(word + rng.choice(PUNCTUATION))
+        corpus.append(" ".join(parts))
+    return corpus
+
+
+def run(name, func, corpus, words):
+    latencies = []
+    started = time.perf_counter()
+    for line in corpus:
+        t0 = time.perf_counter()
+        func(line)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e6
+    print(f"  {name:<12} {elapsed:8.2f}s  {len(corpus) / elapsed:>12,.0f} lines/s  "
+          f"{words / elapsed:>12,.0f} words/s  p50 {p50:7.1f}µs  p99 {p99:7.1f}µs")
+    return elapsed
+
+
+def main(args):
+    print(f"📚 Lexicon: {len(WORDS)} words, {len(PHRASES)} phrases")
+    corpus = build_corpus(args.lines, args.words_per_line, args.unknown_ratio, args.seed)
+    words = sum(len(line.split()) for line in corpus)
+    size_mb = sum(len(line.encode('utf-8')) for line in corpus) / 1024 / 1024
+    print(f"📝 Corpus: {len(corpus):,} lines, {words:,} words, {size_mb:.1f} MB "
+          f"({args.unknown_ratio:.0%} out-of-lexicon words)\n")
+
+    print("⏱️  Throughput")
+    legacy = run("legacy", legacy_translate, corpus, words)
+    transliterate_word.cache_clear()
+    cold = run("engine-cold", transliterate, corpus, words)
+    warm = run("engine-warm", transliterate, corpus, words)
+
+    print(f"\n🚀 Speedup vs legacy: {legacy / cold:.1f}x cold, {legacy / warm:.1f}x warm")
+    print(f"🧠 Cache: {lexicon_stats()}")
+
+    sample = corpus[0]
+    print(f"\n🔤 Sample\n  in:  {sample}\n  out: {transliterate(sample)}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the रामा Hinglish transliterator')
+    parser.add_argument('--lines', type=int, default=100000, help='Corpus size in lines')
+    parser.add_argument('--words-per-line', type=int, default=12, help='Words per line')
+    parser.add_argument('--unknown-ratio', type=float, default=0.25,
+                        help='Fraction of words missing from the lexicon (syllable rules)')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed for the corpus')
+
+    main(parser.parse_args())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Notification Change Stream Check Script for रामा (Raama)
+Verifies cross-worker notification delivery against a real MongoDB replica set:
+a notification inserted through one client must reach a subscriber whose
+watcher uses a different client, and a notification inserted while the watcher
+is stopped must be delivered after it restarts from the saved resume token.
+
+Change streams need a replica set. For a local single-node one:
+    mongod --replSet rs0 --dbpath /tmp/raama-rs --port 27017
+    mongosh --eval 'rs.initiate()'
+
+Usage:
+    MONGO_URL="mongodb://localhost:27017/?replicaSet=rs0" python scripts/check_notification_stream.py
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from notification_broker import NotificationBroker  # noqa: E402
+from notification_watcher import NotificationChangeWatcher  # noqa: E402
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+
+
+def make_notification(user_id: str, message: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "userId": user_id,
+        "message": message,
+        "type": "test",
+        "isRead": False,
+        "createdAt": datetime.now(timezone.utc).isoformat()
+    }
+
+
+async def wait_for_active(watcher, timeout: float = 10):
+    for _ in range(int(timeout * 10)):
+        if watcher.active or watcher.unavailable_reason:
+            return
+        await asyncio.sleep(0.1)
+
+
+async def main():
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Database: {DB_NAME}")
+
+    # Separate clients stand in for two workers
+    writer_client = AsyncIOMotorClient(MONGO_URL)
+    watcher_client = AsyncIOMotorClient(MONGO_URL)
+    writer_db = writer_client[DB_NAME]
+    watcher_db = watcher_client[DB_NAME]
+
+    watcher_id = f"check-{uuid.uuid4().hex[:8]}"
+    user_id = f"stream-check-{uuid.uuid4().hex[:8]}"
+    broker = NotificationBroker()
+    queue = broker.subscribe(user_id)
+    ok = True
+
+    def new_watcher():
+        return NotificationChangeWatcher(
+            watcher_db.notifications, watcher_db.notification_stream_state, broker, watcher_id,
+            save_interval=0
+        )
+
+    try:
+        watcher = new_watcher()
+        watcher.start()
+        await wait_for_active(watcher)
+        if not watcher.active:
+            print(f"❌ Change stream not available: {watcher.unavailable_reason or 'timed out'}")
+            print("   Run against a replica set (see the instructions at the top of this script)")
+            await watcher.stop()
+            sys.exit(1)
+        print("✅ Change stream active")
+
+        # 1. Cross-client delivery
+        first = make_notification(user_id, "cross-worker delivery")
+        await writer_db.notifications.insert_one(first)
+        try:
+            event = await asyncio.wait_for(queue.get(), timeout=10)
+            delivered = event["id"] == first["id"]
+        except asyncio.TimeoutError:
+            delivered = False
+        print(f"{'✅' if delivered else '❌'} Insert from another client delivered")
+        ok &= delivered
+
+        # 2. Resume after restart
+        await watcher.stop()
+        second = make_notification(user_id, "delivered after restart")
+        await writer_db.notifications.insert_one(second)
+
+        watcher = new_watcher()
+        watcher.start()
+        try:
+            event = await asyncio.wait_for(queue.get(), timeout=10)
+            resumed = event["id"] == second["id"]
+        except asyncio.TimeoutError:
+            resumed = False
+        print(f"{'✅' if resumed else '❌'} Insert made while stopped delivered after resume")
+        ok &= resumed
+
+        await watcher.stop()
+        print(f"📈 Watcher stats: {watcher.stats()}")
+    finally:
+        await writer_db.notifications.delete_many({"userId": user_id})
+        await writer_db.notification_stream_state.delete_one({"_id": watcher_id})
+        writer_client.close()
+        watcher_client.close()
+
+    if not ok:
+        sys.exit(1)
+    print("\n✨ Notification change stream check passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
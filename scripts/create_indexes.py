@@ -17,6 +17,81 @@ load_dotenv(ROOT_DIR / 'backend' / '.env')
 
 MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
 DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+NOTIFICATION_READ_TTL_DAYS = int(os.environ.get('NOTIFICATION_READ_TTL_DAYS', '90'))
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.environ.get('EMAIL_OUTBOX_RETENTION_DAYS', '7'))
+SEARCH_STATS_RETENTION_DAYS = int(os.environ.get('SEARCH_STATS_RETENTION_DAYS', '30'))
+
+# Indexes replaced by newer ones; create_index() cannot redefine an index under an
+# existing name, so the old definitions are dropped first
+SUPERSEDED_NOTIFICATION_INDEXES = [
+    "idx_notifications_user_read",     # legacy 'read' flag, renamed to isRead
+    "idx_notifications_user_unread",   # (userId, isRead) -> idx_notifications_user_unread_created
+    "idx_notifications_user_created",  # (userId, createdAt) -> idx_notifications_user_created_id
+]
+
+async def drop_superseded_indexes(collection, names):
+    """Drop the named indexes if they exist"""
+    existing = {idx['name'] for idx in await collection.list_indexes().to_list(None)}
+    for name in names:
+        if name in existing:
+            await collection.drop_index(name)
+            print(f"  🗑️  Dropped superseded index {name}")
+
+async def create_notification_ttl_index(db):
+    """Expire notifications NOTIFICATION_READ_TTL_DAYS after they were read (0 keeps them forever)"""
+    ttl_seconds = NOTIFICATION_READ_TTL_DAYS * 86400
+    existing = {
+        idx['name']: idx for idx in await db.notifications.list_indexes().to_list(None)
+    }.get("idx_notifications_read_ttl")
+    
+    if not ttl_seconds:
+        if existing:
+            await db.notifications.drop_index("idx_notifications_read_ttl")
+            print("  🗑️  Read-notification TTL disabled")
+        return
+    
+    if existing and existing.get('expireAfterSeconds') != ttl_seconds:
+        # Changing a TTL only needs collMod, not a rebuild
+        await db.command("collMod", "notifications", index={
+            "name": "idx_notifications_read_ttl",
+            "expireAfterSeconds": ttl_seconds
+        })
+        print(f"  ♻️  Read-notification TTL changed to {NOTIFICATION_READ_TTL_DAYS} days")
+    elif not existing:
+        await db.notifications.create_index(
+            "readAt",
+            expireAfterSeconds=ttl_seconds,
+            partialFilterExpression={"readAt": {"$exists": True}},
+            name="idx_notifications_read_ttl"
+        )
+        print(f"  ⏳ Read notifications expire after {NOTIFICATION_READ_TTL_DAYS} days")
+
+SHAYARI_TEXT_WEIGHTS = {
+    "title": 10,
+    "authorName": 5,
+    "authorUsername": 5,
+    "tags": 4,
+    "content": 2
+}
+
+async def create_shayari_text_index(db):
+    """Weighted text index for /api/search; a collection can only have one, so a different one is replaced"""
+    for idx in await db.shayaris.list_indexes().to_list(None):
+        if "_fts" not in idx.get('key', {}):
+            continue
+        if idx['name'] == "idx_shayaris_text" and idx.get('weights') == SHAYARI_TEXT_WEIGHTS:
+            return
+        await db.shayaris.drop_index(idx['name'])
+        print(f"  🗑️  Replaced text index {idx['name']}")
+    await db.shayaris.create_index(
+        [(field, "text") for field in SHAYARI_TEXT_WEIGHTS],
+        weights=SHAYARI_TEXT_WEIGHTS,
+        # Hindi/Urdu/Hinglish: no stemming or stop words
+        default_language="none",
+        language_override="textLanguage",
+        name="idx_shayaris_text"
+    )
+    print("  🔎 Weighted text index created")
 
 async def create_indexes():
     """Create all necessary database indexes for optimal performance"""
@@ -35,11 +110,15 @@ async def create_indexes():
         
         # User Collection Indexes
         print("👥 Creating user indexes...")
+        # Broadcasts stream users in id order and resume after the last one reached
+        await db.users.create_index("id", unique=True, name="idx_users_id")
         await db.users.create_index("email", unique=True, name="idx_users_email")
         await db.users.create_index("username", unique=True, name="idx_users_username")
         await db.users.create_index("role", name="idx_users_role")
         await db.users.create_index("createdAt", name="idx_users_created")
         await db.users.create_index("emailVerified", name="idx_users_verified")
+        # Normalized word-start keys for writer search (prefix matches from backend/search_queries.py)
+        await db.users.create_index("nameKeys", name="idx_users_name_keys")
         print("  ✅ User indexes created")
         
         # Shayari Collection Indexes
@@ -50,16 +129,51 @@ async def create_indexes():
         await db.shayaris.create_index("isFeatured", name="idx_shayaris_featured")
         await db.shayaris.create_index([("authorId", 1), ("createdAt", -1)], name="idx_shayaris_author_created")
         await db.shayaris.create_index("likedBy", name="idx_shayaris_liked_by")
+        # Phonetic and author keys (scripts/backfill_search_keys.py fills them in for older shayaris)
+        await db.shayaris.create_index("searchKeys", name="idx_shayaris_search_keys")
+        await db.shayaris.create_index("authorKeys", name="idx_shayaris_author_keys")
+        await create_shayari_text_index(db)
         print("  ✅ Shayari indexes created")
         
         # Notification Collection Indexes
         print("🔔 Creating notification indexes...")
+        await drop_superseded_indexes(db.notifications, SUPERSEDED_NOTIFICATION_INDEXES)
         await db.notifications.create_index("userId", name="idx_notifications_user")
-        await db.notifications.create_index([("userId", 1), ("read", 1)], name="idx_notifications_user_read")
-        await db.notifications.create_index([("userId", 1), ("createdAt", -1)], name="idx_notifications_user_created")
+        await db.notifications.create_index([("userId", 1), ("isRead", 1), ("createdAt", -1)], name="idx_notifications_user_unread_created")
+        await db.notifications.create_index([("userId", 1), ("createdAt", -1), ("id", -1)], name="idx_notifications_user_created_id")
         await db.notifications.create_index("type", name="idx_notifications_type")
+        await db.notifications.create_index(
+            [("userId", 1), ("groupKey", 1)],
+            unique=True,
+            partialFilterExpression={"groupKey": {"$exists": True}},
+            name="idx_notifications_group"
+        )
+        # Actors counted per notification group (backend/notification_groups.py), expired after their window
+        await db.notification_group_actors.create_index(
+            [("userId", 1), ("groupKey", 1), ("actorId", 1)], unique=True, name="idx_group_actors_unique"
+        )
+        await db.notification_group_actors.create_index("expiresAt", expireAfterSeconds=0, name="idx_group_actors_ttl")
+        await db.notification_state.create_index("userId", unique=True, name="idx_notification_state_user")
+        await create_notification_ttl_index(db)
         print("  ✅ Notification indexes created")
         
+        # Push Subscription Indexes (push delivery looks subscriptions up by user, pruning by id)
+        print("📲 Creating push subscription indexes...")
+        await db.push_subscriptions.create_index("userId", name="idx_push_subscriptions_user")
+        await db.push_subscriptions.create_index("id", name="idx_push_subscriptions_id")
+        print("  ✅ Push subscription indexes created")
+        
+        # Email Outbox Indexes
+        print("📧 Creating email outbox indexes...")
+        await db.email_outbox.create_index("idempotencyKey", unique=True, name="idx_email_outbox_idempotency")
+        await db.email_outbox.create_index([("status", 1), ("nextAttemptAt", 1)], name="idx_email_outbox_due")
+        await db.email_outbox.create_index(
+            "completedAt",
+            expireAfterSeconds=EMAIL_OUTBOX_RETENTION_DAYS * 86400,
+            name="idx_email_outbox_completed_ttl"
+        )
+        print("  ✅ Email outbox indexes created")
+        
         # Follow Collection Indexes
         print("👥 Creating follow indexes...")
         await db.follows.create_index("followerId", name="idx_follows_follower")
@@ -97,15 +211,34 @@ async def create_indexes():
         await db.user_activities.create_index("action", name="idx_activities_action")
         await db.user_activities.create_index("targetType", name="idx_activities_target_type")
         await db.user_activities.create_index([("userId", 1), ("createdAt", -1)], name="idx_activities_user_created")
+        # Writer analytics: recent activity on a writer's shayaris
+        await db.user_activities.create_index(
+            [("metadata.authorId", 1), ("createdAt", -1)], name="idx_activities_author_created"
+        )
         print("  ✅ User activity indexes created")
         
-        # Search History Collection Indexes
+        # Search History Collection Indexes (one capped list per user; scripts/migrate_search_history.py folds in old rows)
         print("🔍 Creating search history indexes...")
-        await db.search_history.create_index("userId", name="idx_search_user")
-        await db.search_history.create_index([("userId", 1), ("createdAt", -1)], name="idx_search_user_created")
-        await db.search_history.create_index("query", name="idx_search_query")
+        await db.user_search_history.create_index("userId", unique=True, name="idx_search_history_user")
         print("  ✅ Search history indexes created")
         
+        # Popular-search counters: one document per normalized query, ranked by decayed score
+        print("📈 Creating search query stats indexes...")
+        await db.search_query_stats.create_index("key", unique=True, name="idx_search_stats_key")
+        await db.search_query_stats.create_index([("generation", 1), ("score", -1)], name="idx_search_stats_score")
+        await db.search_query_stats.create_index(
+            "lastSearchedAt",
+            expireAfterSeconds=SEARCH_STATS_RETENTION_DAYS * 86400,
+            name="idx_search_stats_idle_ttl"
+        )
+        print("  ✅ Search query stats indexes created")
+        
+        # Tag statistics: one document per tag, trending tags read from the top of the recent index
+        print("🏷️ Creating tag stats indexes...")
+        await db.tag_stats.create_index("tag", unique=True, name="idx_tag_stats_tag")
+        await db.tag_stats.create_index([("recentCount", -1), ("count", -1)], name="idx_tag_stats_trending")
+        print("  ✅ Tag stats indexes created")
+        
         # User Preferences Collection Indexes
         print("⚙️ Creating user preferences indexes...")
         await db.user_preferences.create_index("userId", unique=True, name="idx_preferences_user")
@@ -116,9 +249,9 @@ async def create_indexes():
         
         # List indexes for verification
         collections = [
-            'users', 'shayaris', 'notifications', 'follows', 
+            'users', 'shayaris', 'notifications', 'notification_state', 'notification_group_actors', 'push_subscriptions', 'email_outbox', 'follows', 
             'collections', 'bookmarks', 'writer_requests', 
-            'user_activities', 'search_history', 'user_preferences'
+            'user_activities', 'user_search_history', 'search_query_stats', 'tag_stats', 'user_preferences'
         ]
         
         for collection_name in collections:
@@ -160,9 +293,9 @@ async def drop_all_indexes():
     db = client[DB_NAME]
     
     collections = [
-        'users', 'shayaris', 'notifications', 'follows', 
+        'users', 'shayaris', 'notifications', 'notification_state', 'notification_group_actors', 'push_subscriptions', 'email_outbox', 'follows', 
         'collections', 'bookmarks', 'writer_requests', 
-        'user_activities', 'search_history', 'user_preferences'
+        'user_activities', 'user_search_history', 'search_query_stats', 'tag_stats', 'user_preferences'
     ]
     
     for collection_name in collections:
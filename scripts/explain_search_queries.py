@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Search Query Plan Check Script for रामा (Raama)
+Runs explain() on every query shape compiled by backend/search_queries.py and
+checks that MongoDB answers it from the intended index: writer and author
+prefix filters from nameKeys/authorKeys, phonetic search from searchKeys and
+text search from the weighted text index. The unindexed regex fallback is
+reported for comparison only.
+
+Create the indexes (scripts/create_indexes.py) and backfill the keys
+(scripts/backfill_search_keys.py) first. Exits with status 1 when a shape is
+not answered from its index. Nothing is written.
+
+Usage:
+    python scripts/explain_search_queries.py
+    python scripts/explain_search_queries.py --term dil --author shayar --tag love
+    python scripts/explain_search_queries.py --database raama_production_search_bench
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from search_queries import (  # noqa: E402
+    and_query, phonetic_shayari_query, regex_shayari_query, shayari_filters, sort_order,
+    text_search_pipeline, writer_query
+)
+from transliteration import phonetic_keys  # noqa: E402
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+
+
+def plan_summary(explain) -> tuple:
+    """(stages, index names) of every winning plan in find or aggregate explain output"""
+    stages, indexes = [], []
+
+    def walk_plan(node):
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.append(node["stage"])
+            if "indexName" in node:
+                indexes.append(node["indexName"])
+            for value in node.values():
+                walk_plan(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk_plan(value)
+
+    def find_plans(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "winningPlan":
+                    walk_plan(value)
+                else:
+                    find_plans(value)
+        elif isinstance(node, list):
+            for value in node:
+                find_plans(value)
+
+    find_plans(explain)
+    return stages, indexes
+
+
+def execution_counts(explain) -> tuple:
+    """(keys examined, documents examined) summed over find or aggregate explain output"""
+    keys = docs = 0
+    stack = [explain]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "executionStats" in node and isinstance(node["executionStats"], dict):
+                keys += node["executionStats"].get("totalKeysExamined", 0)
+                docs += node["executionStats"].get("totalDocsExamined", 0)
+            else:
+                stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return keys, docs
+
+
+async def check_plans(args) -> bool:
+    database = args.database or DB_NAME
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Database: {database}")
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[database]
+
+    relevance = dict(sort_order("relevance"))
+    filters = shayari_filters(args.author, [args.tag])
+    shapes = [
+        # (name, collection, command body, indexes that may answer it; None = unindexed by design)
+        ("writer prefix", "users",
+         {"filter": writer_query(args.author), "limit": args.limit},
+         {"idx_users_name_keys"}),
+        ("author filter", "shayaris",
+         {"filter": shayari_filters(args.author), "sort": relevance, "limit": args.limit},
+         {"idx_shayaris_author_keys"}),
+        ("author + tag", "shayaris",
+         {"filter": filters, "sort": relevance, "limit": args.limit},
+         {"idx_shayaris_author_keys", "idx_shayaris_tags"}),
+        ("tag browse", "shayaris",
+         {"filter": shayari_filters("", [args.tag]), "sort": relevance, "limit": args.limit},
+         {"idx_shayaris_tags"}),
+        ("phonetic + filters", "shayaris",
+         {"filter": and_query(phonetic_shayari_query(phonetic_keys(args.term)), filters),
+          "sort": relevance, "limit": args.limit},
+         {"idx_shayaris_search_keys", "idx_shayaris_author_keys", "idx_shayaris_tags"}),
+        ("text + filters", "shayaris",
+         {"pipeline": text_search_pipeline(args.term, filters, "relevance", args.limit), "cursor": {}},
+         {"idx_shayaris_text"}),
+        ("regex fallback", "shayaris",
+         {"filter": regex_shayari_query(args.term), "sort": relevance, "limit": args.limit},
+         None),
+    ]
+
+    ok = True
+    print(f"\n{'shape':<20}{'plan':<34}{'keys':>9}{'docs':>9}   index")
+    for name, collection, body, expected in shapes:
+        command = "aggregate" if "pipeline" in body else "find"
+        explain = await db.command(
+            "explain", {command: collection, **body}, verbosity="executionStats"
+        )
+        stages, indexes = plan_summary(explain)
+        keys, docs = execution_counts(explain)
+        if expected is None:
+            status = "ℹ️ "
+        elif expected & set(indexes) and "COLLSCAN" not in stages:
+            status = "✅"
+        else:
+            status = "❌"
+            ok = False
+        plan = " > ".join(dict.fromkeys(stages))[:32]
+        print(f"{status} {name:<17}{plan:<34}{keys:>9,}{docs:>9,}   {', '.join(dict.fromkeys(indexes)) or '-'}")
+
+    client.close()
+    if ok:
+        print("\n✨ Every indexed search shape uses its index")
+    else:
+        print("\n⚠️ Some shapes are not answered from their index - run scripts/create_indexes.py "
+              "and scripts/backfill_search_keys.py")
+    return ok
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check the query plans of रामा search query shapes')
+    parser.add_argument('--term', default='dil', help='Search text for the phonetic, text and regex shapes')
+    parser.add_argument('--author', default='sh', help='Author / writer prefix')
+    parser.add_argument('--tag', default='love', help='Tag filter')
+    parser.add_argument('--limit', type=int, default=20, help='Results per query')
+    parser.add_argument('--database', help='Database to explain against (default: DB_NAME)')
+
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(check_plans(args)) else 1)
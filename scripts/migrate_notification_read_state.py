@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Notification Read-State Migration Script for रामा (Raama)
+Moves existing per-notification isRead flags onto the read watermark model.
+
+For every user with notifications, notification_state.notificationsReadUpTo is
+set to the newest createdAt that has no unread notification at or before it
+(the newest notification when everything is read). Later "mark all read" calls
+then only move the watermark. unreadCount is recounted against the watermark.
+The legacy `read` field written by older seed data is renamed to `isRead`.
+
+The migration only ever moves a watermark forward and can be re-run safely.
+
+Usage:
+    python scripts/migrate_notification_read_state.py
+    python scripts/migrate_notification_read_state.py --dry-run
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+
+
+async def user_watermark(db, user_id: str, oldest_unread, newest):
+    """Newest createdAt with no unread notification at or before it"""
+    if oldest_unread is None:
+        return newest
+    newest_read_before = await db.notifications.find_one(
+        {"userId": user_id, "isRead": True, "createdAt": {"$lt": oldest_unread}},
+        {"_id": 0, "createdAt": 1},
+        sort=[("createdAt", -1)]
+    )
+    return newest_read_before["createdAt"] if newest_read_before else None
+
+
+async def migrate(dry_run: bool, batch_size: int):
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Database: {DB_NAME}")
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    legacy = await db.notifications.count_documents({"read": {"$exists": True}})
+    print(f"\n🔤 {legacy} notifications use the legacy 'read' field")
+    if legacy and not dry_run:
+        # Where both fields exist isRead wins; elsewhere the legacy field is renamed
+        await db.notifications.update_many(
+            {"read": {"$exists": True}, "isRead": {"$exists": True}},
+            {"$unset": {"read": ""}}
+        )
+        result = await db.notifications.update_many(
+            {"read": {"$exists": True}},
+            {"$rename": {"read": "isRead"}}
+        )
+        print(f"  ✅ Renamed on {result.modified_count} notifications")
+
+    states = {}
+    async for state in db.notification_state.find({}, {"_id": 0, "userId": 1, "notificationsReadUpTo": 1}):
+        states[state["userId"]] = state.get("notificationsReadUpTo")
+
+    print("\n🔔 Computing read watermarks...")
+    per_user = db.notifications.aggregate([
+        {"$group": {
+            "_id": "$userId",
+            "oldestUnread": {"$min": {"$cond": [{"$eq": ["$isRead", True]}, None, "$createdAt"]}},
+            "newest": {"$max": "$createdAt"}
+        }}
+    ], allowDiskUse=True)
+
+    now = datetime.now(timezone.utc).isoformat()
+    updates = []
+    users = advanced = unread_total = 0
+    async for row in per_user:
+        users += 1
+        user_id = row["_id"]
+        watermark = await user_watermark(db, user_id, row["oldestUnread"], row["newest"])
+        current = states.get(user_id)
+        if current and (watermark is None or current >= watermark):
+            watermark = current
+        elif watermark is not None:
+            advanced += 1
+
+        query = {"userId": user_id, "isRead": False}
+        if watermark:
+            query["createdAt"] = {"$gt": watermark}
+        unread = await db.notifications.count_documents(query)
+        unread_total += unread
+
+        fields = {"unreadCount": unread, "updatedAt": now}
+        if watermark:
+            fields["notificationsReadUpTo"] = watermark
+        updates.append(UpdateOne({"userId": user_id}, {"$set": fields}, upsert=True))
+
+        if len(updates) >= batch_size:
+            if not dry_run:
+                await db.notification_state.bulk_write(updates, ordered=False)
+            print(f"  ✅ {users} users processed")
+            updates = []
+
+    if updates and not dry_run:
+        await db.notification_state.bulk_write(updates, ordered=False)
+
+    client.close()
+    print(f"\n✨ Migration {'preview' if dry_run else 'finished'}")
+    print(f"  Users:              {users}")
+    print(f"  Watermarks moved:   {advanced}")
+    print(f"  Unread after:       {unread_total}")
+    if dry_run:
+        print("  (dry run - nothing was written)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Migrate रामा notification isRead flags to read watermarks')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    parser.add_argument('--batch-size', type=int, default=500, help='Users per bulk_write')
+
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run, args.batch_size))
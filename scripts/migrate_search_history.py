@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Search History Migration Script for रामा (Raama)
+Folds the old one-row-per-search `search_history` collection into the
+per-user lists in `user_search_history` (backend/search_history.py): the
+newest SEARCH_HISTORY_MAX_ENTRIES searches per user, one per normalized query.
+Searches already recorded in the new lists stay ahead of migrated ones.
+
+Re-running is safe. Pass --drop-legacy to drop the old collection afterwards.
+
+Usage:
+    python scripts/migrate_search_history.py
+    python scripts/migrate_search_history.py --dry-run
+    python scripts/migrate_search_history.py --drop-legacy
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from search_autocomplete import completion_key  # noqa: E402
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+SEARCH_HISTORY_MAX_ENTRIES = int(os.environ.get('SEARCH_HISTORY_MAX_ENTRIES', '50'))
+
+
+def merge_entries(current: list, legacy_rows: list) -> list:
+    """Current entries first, then legacy rows newest first, one per normalized query"""
+    entries, seen = [], set()
+    legacy = [
+        {
+            "query": " ".join(row["query"].split()),
+            "key": completion_key(row["query"]),
+            "filters": row.get("filters") or {},
+            "resultsCount": row.get("resultsCount", 0),
+            "createdAt": row.get("createdAt"),
+        }
+        for row in legacy_rows if row.get("query")
+    ]
+    for entry in [*current, *legacy]:
+        if entry["key"] and entry["key"] not in seen:
+            seen.add(entry["key"])
+            entries.append(entry)
+    return entries[:SEARCH_HISTORY_MAX_ENTRIES]
+
+
+async def migrate(dry_run: bool, drop_legacy: bool, batch_size: int):
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Database: {DB_NAME}")
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    user_ids = await db.search_history.distinct("userId")
+    print(f"\n🔍 {len(user_ids)} users with legacy search history")
+
+    updates = []
+    migrated = entries_written = 0
+    for user_id in user_ids:
+        # Newest rows only: enough to fill the capped list even when queries repeat
+        rows = await db.search_history.find(
+            {"userId": user_id}, {"_id": 0, "query": 1, "filters": 1, "resultsCount": 1, "createdAt": 1}
+        ).sort("createdAt", -1).limit(SEARCH_HISTORY_MAX_ENTRIES * 4).to_list(None)
+        existing = await db.user_search_history.find_one({"userId": user_id}, {"_id": 0, "entries": 1})
+        entries = merge_entries((existing or {}).get("entries") or [], rows)
+        migrated += 1
+        entries_written += len(entries)
+        updates.append(UpdateOne(
+            {"userId": user_id},
+            {"$set": {"entries": entries, "updatedAt": datetime.now(timezone.utc)}},
+            upsert=True
+        ))
+        if len(updates) >= batch_size:
+            if not dry_run:
+                await db.user_search_history.bulk_write(updates, ordered=False)
+            print(f"  ✅ {migrated} / {len(user_ids)} users migrated")
+            updates = []
+
+    if updates and not dry_run:
+        await db.user_search_history.bulk_write(updates, ordered=False)
+
+    if drop_legacy and not dry_run:
+        await db.search_history.drop()
+        print("🗑️  Legacy search_history collection dropped")
+
+    client.close()
+    print(f"\n✨ Migration {'preview' if dry_run else 'finished'}")
+    print(f"  Users migrated:     {migrated}")
+    print(f"  History entries:    {entries_written}")
+    if dry_run:
+        print("  (dry run - nothing was written)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Migrate रामा search history to capped per-user lists')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be migrated without writing')
+    parser.add_argument('--drop-legacy', action='store_true', help='Drop the old search_history collection afterwards')
+    parser.add_argument('--batch-size', type=int, default=500, help='Users per bulk_write')
+
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run, args.drop_legacy, args.batch_size))
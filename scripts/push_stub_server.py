@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Web Push Stub Server Script for रामा (Raama)
+A local stand-in for browser push services, for testing the push delivery
+worker and load benchmarks without sending anything to real browsers.
+
+It accepts POST /push/{subscription_id} and checks each request the way a push
+service would: a valid ES256 VAPID token for this origin, aes128gcm content
+encoding and a TTL header. Subscription ids starting with "gone-" answer 410
+Gone so pruning can be exercised. When created with a subscription's private
+key (see benchmark_push.py) it also decrypts the payloads. GET /stats returns
+counters.
+
+Usage:
+    python scripts/push_stub_server.py --port 8765 --latency-ms 20
+    python scripts/push_stub_server.py --generate-keys
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import jwt
+from aiohttp import web
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from push_delivery import hkdf_sha256, b64url_decode, generate_vapid_keys, public_key_bytes  # noqa: E402
+
+
+def decrypt_payload(body: bytes, ua_key: ec.EllipticCurvePrivateKey, auth_secret: bytes) -> bytes:
+    """Reverse of push_delivery.encrypt_payload, done with the subscription's private key"""
+    salt = body[:16]
+    key_length = body[20]
+    as_public = body[21:21 + key_length]
+    ciphertext = body[21 + key_length:]
+
+    shared_secret = ua_key.exchange(
+        ec.ECDH(), ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), as_public)
+    )
+    ua_public = public_key_bytes(ua_key.public_key())
+    ikm = hkdf_sha256(auth_secret, b"WebPush: info\x00" + ua_public + as_public, 32, shared_secret)
+    cek = hkdf_sha256(salt, b"Content-Encoding: aes128gcm\x00", 16, ikm)
+    nonce = hkdf_sha256(salt, b"Content-Encoding: nonce\x00", 12, ikm)
+
+    plaintext = AESGCM(cek).decrypt(nonce, ciphertext, None).rstrip(b"\x00")
+    if not plaintext.endswith(b"\x02"):
+        raise ValueError("Missing last-record delimiter")
+    return plaintext[:-1]
+
+
+def verify_vapid(request: web.Request) -> Optional[str]:
+    """Problem with the request's VAPID authorization, or None when it is valid"""
+    header = request.headers.get("Authorization", "")
+    if not header.startswith("vapid "):
+        return "missing vapid authorization"
+    params = dict(
+        part.strip().split("=", 1) for part in header[len("vapid "):].split(",") if "=" in part
+    )
+    if "t" not in params or "k" not in params:
+        return "vapid authorization needs t and k"
+    try:
+        public_key = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), b64url_decode(params["k"]))
+        claims = jwt.decode(params["t"], public_key, algorithms=["ES256"], audience=str(request.url.origin()))
+    except (ValueError, jwt.InvalidTokenError) as e:
+        return f"invalid vapid token: {e}"
+    if not claims.get("sub"):
+        return "vapid token has no subject"
+    return None
+
+
+def create_app(
+    latency_ms: float = 0,
+    ua_key: Optional[ec.EllipticCurvePrivateKey] = None,
+    auth_secret: Optional[bytes] = None,
+) -> web.Application:
+    stats = {"received": 0, "accepted": 0, "rejected": 0, "gone": 0, "decrypted": 0, "undecryptable": 0}
+
+    async def push(request: web.Request) -> web.Response:
+        stats["received"] += 1
+        body = await request.read()
+
+        problem = verify_vapid(request)
+        if problem is None and request.headers.get("Content-Encoding") != "aes128gcm":
+            problem = "content encoding must be aes128gcm"
+        if problem is None and "TTL" not in request.headers:
+            problem = "missing TTL header"
+        if problem:
+            stats["rejected"] += 1
+            return web.json_response({"error": problem}, status=401 if "vapid" in problem else 400)
+
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        if request.match_info["subscription_id"].startswith("gone-"):
+            stats["gone"] += 1
+            return web.Response(status=410)
+
+        if ua_key is not None:
+            try:
+                json.loads(decrypt_payload(body, ua_key, auth_secret))
+                stats["decrypted"] += 1
+            except Exception:
+                stats["undecryptable"] += 1
+                return web.json_response({"error": "payload could not be decrypted"}, status=400)
+
+        stats["accepted"] += 1
+        return web.Response(status=201)
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_post("/push/{subscription_id}", push)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local stand-in push service for रामा web push testing')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Simulated push service latency per request')
+    parser.add_argument('--generate-keys', action='store_true', help='Print a new VAPID key pair and exit')
+
+    args = parser.parse_args()
+    if args.generate_keys:
+        private_key, public_key = generate_vapid_keys()
+        print(f'VAPID_PRIVATE_KEY="{private_key}"')
+        print(f'# Public key (served to browsers at /api/notifications/vapid-public-key): {public_key}')
+    else:
+        print(f"📮 Push stub listening on http://{args.host}:{args.port}/push/<subscription_id>")
+        web.run_app(create_app(args.latency_ms), host=args.host, port=args.port, print=None)
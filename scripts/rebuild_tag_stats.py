@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tag Stats Rebuild Script for रामा (Raama)
+Recomputes the tag_stats counters (backend/tag_stats.py) from the shayaris
+collection: how many shayaris carry each tag and how many were created with it
+in each day of the trending window. Run it once after deploying tag stats,
+and to repair drift (e.g. writes made while the counters failed to update).
+
+Tags no shayari carries any more are removed. Shayari writes made while the
+script runs can be overwritten, so prefer a quiet period; re-running is safe.
+
+Usage:
+    python scripts/rebuild_tag_stats.py
+    python scripts/rebuild_tag_stats.py --dry-run
+"""
+
+import asyncio
+import os
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / 'backend' / '.env')
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from tag_stats import TagStats, clean_tags, day_of  # noqa: E402
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'raama_production')
+TAG_TRENDING_WINDOW_DAYS = int(os.environ.get('TAG_TRENDING_WINDOW_DAYS', '7'))
+
+
+async def rebuild(dry_run: bool, batch_size: int):
+    print(f"🔗 Connecting to MongoDB: {MONGO_URL}")
+    print(f"📊 Database: {DB_NAME}")
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+    window_start = TagStats(db.tag_stats, window_days=TAG_TRENDING_WINDOW_DAYS).window_start()
+
+    # Count with the same tag cleanup and day bucketing as the live counters
+    counts = Counter()
+    daily = defaultdict(Counter)
+    scanned = 0
+    cursor = db.shayaris.find({}, {"_id": 0, "tags": 1, "createdAt": 1})
+    async for shayari in cursor.batch_size(batch_size):
+        scanned += 1
+        day = day_of(shayari.get("createdAt"))
+        for tag in clean_tags(shayari.get("tags")):
+            counts[tag] += 1
+            if day is not None and day >= window_start:
+                daily[tag][day] += 1
+    print(f"\n🏷️ {len(counts)} tags across {scanned} shayaris (window starts {window_start})")
+
+    now = datetime.now(timezone.utc)
+    updates = [
+        UpdateOne(
+            {"tag": tag},
+            {"$set": {
+                "count": count,
+                "recentCount": sum(daily[tag].values()),
+                "daily": dict(daily[tag]),
+                "updatedAt": now,
+            }},
+            upsert=True
+        )
+        for tag, count in counts.items()
+    ]
+    stale = await db.tag_stats.count_documents({"tag": {"$nin": list(counts)}})
+
+    if not dry_run:
+        for start in range(0, len(updates), batch_size):
+            await db.tag_stats.bulk_write(updates[start:start + batch_size], ordered=False)
+        await db.tag_stats.delete_many({"tag": {"$nin": list(counts)}})
+
+    print("\n🔥 Trending tags:")
+    trending = sorted(counts, key=lambda tag: (sum(daily[tag].values()), counts[tag]), reverse=True)[:10]
+    for tag in trending:
+        print(f"  #{tag}: {sum(daily[tag].values())} recent, {counts[tag]} total")
+
+    client.close()
+    print(f"\n✨ Rebuild {'preview' if dry_run else 'finished'}")
+    print(f"  Tags written:       {len(updates)}")
+    print(f"  Stale tags removed: {stale}")
+    if dry_run:
+        print("  (dry run - nothing was written)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rebuild रामा tag statistics from the shayaris collection')
+    parser.add_argument('--dry-run', action='store_true', help='Report the recomputed counters without writing')
+    parser.add_argument('--batch-size', type=int, default=500, help='Shayaris per cursor batch and tags per bulk_write')
+
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.dry_run, args.batch_size))
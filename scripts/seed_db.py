@@ -17,6 +17,7 @@ async def seed_database():
     await db.users.delete_many({})
     await db.shayaris.delete_many({})
     await db.notifications.delete_many({})
+    await db.notification_state.delete_many({})
     
     writer_id = str(uuid.uuid4())
     reader_id = str(uuid.uuid4())
@@ -89,7 +90,7 @@ async def seed_database():
             "userId": writer_id,
             "message": "Welcome to Raama, Kabir! Start your poetic journey.",
             "type": "welcome",
-            "read": False,
+            "isRead": False,
             "createdAt": datetime.now(timezone.utc).isoformat()
         },
         {
@@ -97,12 +98,16 @@ async def seed_database():
             "userId": reader_id,
             "message": "Welcome to Raama, Rahim! Start your poetic journey.",
             "type": "welcome",
-            "read": False,
+            "isRead": False,
             "createdAt": datetime.now(timezone.utc).isoformat()
         }
     ]
     
     await db.notifications.insert_many(notifications)
+    await db.notification_state.insert_many([
+        {"userId": writer_id, "unreadCount": 1},
+        {"userId": reader_id, "unreadCount": 1}
+    ])
     print("✅ Notifications created")
     
     client.close()